@@ -0,0 +1,150 @@
+"""
+Замер физики монет: обычный путь (Coin.update по одной монете + SpatialHash)
+против пакетного NumpyCoinPhysics на разном количестве монет.
+
+Запуск из корня проекта:
+    python -m benchmarks.coin_physics_sweep [кадров] [кол-во монет ...]
+"""
+import os
+import sys
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from logic.assets.spatial_hash import SpatialHash
+from logic.world.coin import Coin
+from logic.world.bronze_coin import BronzeCoin
+from logic.world.silver_coin import SilverCoin
+from logic.world.gold_coin import GoldCoin
+from logic.world.coin_physics import NumpyCoinPhysics, HAS_NUMPY
+
+WORLD_WIDTH = 1420
+WORLD_HEIGHT = 1080
+DT = 1.0 / 60.0
+FRAME_BUDGET_MS = 1000.0 / 60.0
+
+# Больше стольких монет на стандартное поле не помещается без сплошных наложений,
+# поэтому для больших количеств поле растет и плотность остается игровой
+BOARD_CAPACITY = 300
+
+
+def world_size(count: int) -> tuple:
+    if count <= BOARD_CAPACITY:
+        return WORLD_WIDTH, WORLD_HEIGHT
+    k = (count / BOARD_CAPACITY) ** 0.5
+    return int(WORLD_WIDTH * k), int(WORLD_HEIGHT * k)
+
+
+def make_sprites(color) -> dict:
+    surface = pygame.Surface((100, 100), pygame.SRCALPHA)
+    pygame.draw.circle(surface, color, (50, 50), 48)
+    frames = [surface] * 6
+    sprites = {"heads": surface, "tails": surface}
+    for key in ["up", "down", "left", "right", "up_left", "up_right", "down_left", "down_right"]:
+        sprites[key] = frames
+    return sprites
+
+
+def make_coins(count: int, seed: int, width: int, height: int) -> list:
+    rng = random.Random(seed)
+    kinds = [
+        (BronzeCoin, make_sprites((181, 166, 66)), 0.7),
+        (SilverCoin, make_sprites((192, 192, 192)), 0.9),
+        (GoldCoin, make_sprites((255, 215, 0)), 1.2),
+    ]
+    coins = []
+    for _ in range(count):
+        cls, sprites, scale = rng.choice(kinds)
+        x = rng.uniform(50, width - 50)
+        y = rng.uniform(50, height - 50)
+        coin = cls(x, y, sprites, scale=scale)
+        coins.append(coin)
+    return coins
+
+
+def flip_some(coins: list, rng: random.Random) -> None:
+    """Имитируем клики и авто-переворот: каждый кадр подкидываем пару монет"""
+    for coin in rng.sample(coins, min(2, len(coins))):
+        if not coin.is_moving:
+            coin.hit(rng.randint(-50, 50), rng.randint(-50, 50))
+
+
+def run_python(count: int, frames: int, width: int, height: int) -> float:
+    coins = make_coins(count, count, width, height)
+    spatial_hash = SpatialHash(cell_size=SpatialHash.cell_size_for([c.radius for c in coins]))
+    for coin in coins:
+        spatial_hash.insert(coin)
+    rng = random.Random(1)
+    elapsed = 0.0
+    for _ in range(frames):
+        flip_some(coins, rng)
+        start = time.perf_counter()
+        for coin in coins:
+            coin.update(DT, width, height)
+            spatial_hash.move(coin)
+            coin.check_land_event()
+        contacts = Coin.collect_contacts(spatial_hash.candidate_pairs(), [])
+        Coin.resolve_contacts(contacts)
+        for a, b, _, _, _ in contacts:
+            spatial_hash.move(a)
+            spatial_hash.move(b)
+        elapsed += time.perf_counter() - start
+    return elapsed * 1000.0 / frames
+
+
+def run_numpy(count: int, frames: int, width: int, height: int) -> float:
+    coins = make_coins(count, count, width, height)
+    physics = NumpyCoinPhysics(capacity=count)
+    for coin in coins:
+        physics.attach(coin)
+    rng = random.Random(1)
+    elapsed = 0.0
+    for _ in range(frames):
+        flip_some(coins, rng)
+        start = time.perf_counter()
+        for coin in physics.step(DT, width, height):
+            coin.update_gameplay(DT)
+            coin.check_land_event()
+        elapsed += time.perf_counter() - start
+    return elapsed * 1000.0 / frames
+
+
+def main() -> None:
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 120
+    counts = [int(a) for a in sys.argv[2:]] or [50, 200, 500, 1000, 2000, 5000]
+
+    pygame.init()
+    if not HAS_NUMPY:
+        print("numpy not installed - only the python path will be measured")
+
+    print(f"{'coins':>6} | {'world':>9} | {'python ms':>10} | {'numpy ms':>9} | {'speedup':>7} | 60 FPS budget")
+    py_ms = 0.0
+    for count in counts:
+        width, height = world_size(count)
+        # Обычный путь растет сверхлинейно - дальше 10 бюджетов кадра его не гоняем
+        if py_ms is not None and py_ms < FRAME_BUDGET_MS * 10:
+            py_ms = run_python(count, frames, width, height)
+        else:
+            py_ms = None
+        py_str = f"{py_ms:>10.2f}" if py_ms is not None else f"{'skipped':>10}"
+        world_str = f"{width}x{height}"
+
+        if not HAS_NUMPY:
+            print(f"{count:>6} | {world_str:>9} | {py_str} | {'-':>9} | {'-':>7} |")
+            continue
+
+        np_ms = run_numpy(count, frames, width, height)
+        speedup = f"{py_ms / np_ms:>6.1f}x" if py_ms is not None else f"{'-':>7}"
+        if py_ms is not None and py_ms < FRAME_BUDGET_MS:
+            fits = "both"
+        else:
+            fits = "numpy" if np_ms < FRAME_BUDGET_MS else "-"
+        print(f"{count:>6} | {world_str:>9} | {py_str} | {np_ms:>9.2f} | {speedup} | {fits}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Замер стратегий вывода холста 1920x1080 в окно (OutputScaler) на разных размерах окна.
+Считается только present: масштаб + flip. На dummy-драйвере flip почти бесплатный,
+поэтому "sdl_scaled" (и любой режим при окне 1920x1080 - там холст и есть дисплей) здесь показывают
+нижнюю границу - реальную цену даст запуск с окном.
+
+Запуск из корня проекта:
+    python -m benchmarks.output_scaler [кадров] [ШxВ ...]
+"""
+import os
+import sys
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from logic.assets.output_scaler import OutputScaler
+
+VIRTUAL_SIZE = (1920, 1080)
+DEFAULT_SIZES = [(1280, 720), (1536, 864), (1920, 1080), (2560, 1440)]
+
+
+def fill_canvas(canvas: pygame.Surface) -> None:
+    """Похожая на игру картинка: белый фон, много кружков, панель справа"""
+    rng = random.Random(1)
+    canvas.fill((255, 255, 255))
+    for _ in range(300):
+        color = (rng.randint(80, 255), rng.randint(80, 200), rng.randint(0, 120))
+        pygame.draw.circle(canvas, color, (rng.randint(0, 1420), rng.randint(0, 1080)), rng.randint(20, 45))
+    pygame.draw.rect(canvas, (200, 200, 200), (1420, 0, 500, 1080))
+
+
+def measure(mode: str, size, frames: int) -> tuple:
+    scaler = OutputScaler(mode, VIRTUAL_SIZE, size)
+    fill_canvas(scaler.canvas)
+    scaler.present()
+    start = time.perf_counter()
+    for _ in range(frames):
+        scaler.present()
+    elapsed = (time.perf_counter() - start) * 1000.0 / frames
+    return scaler.mode, elapsed
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    sizes = [tuple(int(v) for v in arg.split("x")) for arg in sys.argv[2:]] or DEFAULT_SIZES
+
+    pygame.init()
+    print(f"present(), мс на кадр, {frames} кадров, драйвер {pygame.display.get_driver()}")
+    header = f"{'окно':>11}" + "".join(f"{mode:>18}" for mode in OutputScaler.MODES)
+    print(header)
+    for size in sizes:
+        row = f"{size[0]:>5}x{size[1]:<5}"
+        for mode in OutputScaler.MODES:
+            actual, ms = measure(mode, size, frames)
+            cell = f"{ms:.2f}" if actual == mode else f"{ms:.2f} ({actual})"
+            row += f"{cell:>18}"
+        print(row)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+class Camera:
+    """
+    Перевод логических координат (y вверх) в экранные (y вниз) для очереди отрисовки.
+    Тряска и прокрутка - это смещение камеры: объекты при отрисовке не сдвигаются и не трогаются.
+    x, y - логическая точка, которая попадает в левый нижний угол экрана
+    (0, 0 - поле целиком на экране; пригодится для поля больше экрана).
+    """
+
+    def __init__(self, screen_height: int = 0):
+        self.screen_height = screen_height
+        self.x = 0.0
+        self.y = 0.0
+        self.shake_x = 0.0
+        self.shake_y = 0.0
+
+    def set_shake(self, shake_x: float, shake_y: float) -> None:
+        self.shake_x = shake_x
+        self.shake_y = shake_y
+
+    @property
+    def offset_x(self) -> float:
+        """Сдвиг логического x на экране"""
+        return self.shake_x - self.x
+
+    @property
+    def offset_y(self) -> float:
+        """Сдвиг логического y на экране (в логическом направлении, вверх)"""
+        return self.shake_y - self.y
+
+    def to_screen(self, x: float, y: float) -> tuple:
+        return x + self.shake_x - self.x, self.screen_height - (y + self.shake_y - self.y)
+
+    def top_left(self, center_x: float, center_y: float, width: float, height: float) -> tuple:
+        """Экранный левый верхний угол (целые пиксели) прямоугольника с логическим центром"""
+        return (int(center_x + self.shake_x - self.x - width / 2),
+                int(self.screen_height - (center_y + self.shake_y - self.y + height / 2)))
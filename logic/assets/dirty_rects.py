@@ -0,0 +1,62 @@
+import pygame
+
+
+class DirtyRectTracker:
+    """
+    Грязные прямоугольники кадра для режима частичной перерисовки.
+    Каждый кадр объекты сообщают, где они рисуются. Перерисовать нужно и эти места,
+    и места прошлого кадра (там остался старый след), поэтому прошлые прямоугольники запоминаются.
+    Если грязная площадь больше full_ratio от холста - выгоднее перерисовать все (collect вернет None).
+    """
+
+    def __init__(self, size, full_ratio: float = 0.5):
+        self.bounds = pygame.Rect((0, 0), size)
+        self.full_ratio = full_ratio
+        self._prev = []
+        self._full = True
+
+    def request_full(self) -> None:
+        """Следующий кадр - полная перерисовка (смена экрана, размер окна, первый кадр)"""
+        self._full = True
+
+    def collect(self, rects):
+        """
+        rects - прямоугольники текущего кадра (None - объект просит полную перерисовку).
+        Возвращает список прямоугольников для перерисовки или None для полной.
+        """
+        bounds = self.bounds
+        current = [] if rects is None else [r.clip(bounds) for r in rects if r.colliderect(bounds)]
+        previous = self._prev
+        self._prev = current
+
+        if rects is None or self._full:
+            self._full = False
+            return None
+
+        merged = self.merge(previous + current)
+        area = sum(r.width * r.height for r in merged)
+        if area > self.full_ratio * bounds.width * bounds.height:
+            return None
+        return merged
+
+    @staticmethod
+    def merge(rects: list) -> list:
+        """Сливает пересекающиеся прямоугольники, чтобы одно место не перерисовывалось дважды"""
+        merged = []
+        for rect in rects:
+            rect = pygame.Rect(rect)
+            if not rect.width or not rect.height:
+                continue
+            i = rect.collidelist(merged)
+            while i != -1:
+                rect.union_ip(merged.pop(i))
+                i = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
+
+    @staticmethod
+    def clip_for(rects):
+        """Один прямоугольник отсечения, покрывающий все грязные области (None - весь холст)"""
+        if not rects:
+            return None
+        return rects[0].unionall(rects[1:])
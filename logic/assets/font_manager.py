@@ -0,0 +1,71 @@
+import os
+
+import pygame
+
+
+class FontManager:
+    """
+    Общий кэш шрифтов по ключу (путь, размер, жирный, курсив).
+    pygame.font.Font читает файл, а SysFont еще и перебирает системные шрифты,
+    поэтому каждый шрифт создается один раз и дальше берется из словаря.
+    Путь None, "Arial" или несуществующий файл - системный Arial, и ключ у них один (SYSTEM_FONT):
+    иначе один и тот же шрифт создавался бы по разу на каждое написание, а кэши текста
+    и атлас символов делились бы между разными объектами шрифта.
+    """
+
+    SYSTEM_FONT = "Arial"
+
+    def __init__(self):
+        self._fonts = {}
+        # путь как его передали -> путь-ключ (проверка файла на диске один раз)
+        self._paths = {}
+        # Сколько шрифтов было создано (для проверки, что в кадре новых не появляется)
+        self.created = 0
+
+    def resolve(self, path) -> str:
+        """Путь-ключ шрифта: существующий файл или SYSTEM_FONT"""
+        resolved = self._paths.get(path)
+        if resolved is None:
+            if path and path != self.SYSTEM_FONT and os.path.exists(path):
+                resolved = os.path.normpath(path)
+            else:
+                resolved = self.SYSTEM_FONT
+            self._paths[path] = resolved
+        return resolved
+
+    def get(self, path=None, size: int = 20, bold: bool = False, italic: bool = False) -> pygame.font.Font:
+        size = int(size)
+        key = (self.resolve(path), size, bold, italic)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._create(key[0], size, bold, italic)
+            self._fonts[key] = font
+            self.created += 1
+        return font
+
+    def get_quantized(self, path, size: float, step: int = 2, bold: bool = False) -> pygame.font.Font:
+        """Шрифт ближайшего размера, кратного step (для пульсирующих надписей - несколько размеров на все кадры)"""
+        size = max(step, int(round(size / step)) * step)
+        return self.get(path, size, bold)
+
+    def _create(self, path, size, bold, italic) -> pygame.font.Font:
+        if path != self.SYSTEM_FONT:
+            try:
+                font = pygame.font.Font(path, size)
+                font.bold = bold
+                font.italic = italic
+                return font
+            except Exception as e:
+                print(f"FontManager: не удалось загрузить {path} ({e}), используется {self.SYSTEM_FONT}")
+        return pygame.font.SysFont(self.SYSTEM_FONT, size, bold=bold, italic=italic)
+
+    def __len__(self):
+        return len(self._fonts)
+
+    def clear(self):
+        self._fonts.clear()
+        self._paths.clear()
+
+
+# Один кэш на весь процесс: его используют main, контроллеры и объекты карты
+fonts = FontManager()
@@ -0,0 +1,103 @@
+import pygame
+
+from logic.assets.lru_cache import LruCache
+from logic.assets.text_cache import TextCache, texts
+
+
+class GlyphAtlas:
+    """
+    Атлас символов для быстро меняющихся чисел (баланс, комбо, всплывающие "+1.2K", "x5").
+    Кэш по строке тут бесполезен - почти каждая строка новая, поэтому цифры, суффиксы
+    из UIController._format_number, знаки и пунктуация рендерятся один раз на шрифт
+    белыми в одну полосу, а число собирается блитами клеток этой полосы (одним Surface.blits).
+    Цвет и прозрачность - тонированные копии полосы, LRU по (шрифт, цвет, уровень прозрачности).
+    Строка с символом не из набора рисуется целиком через общий кэш текста.
+    """
+
+    SUFFIXES = ('K', 'M', 'B', 'T', 'Qa', 'Qi', 'Sx', 'Sp', 'Oc', 'No', 'Dc')
+    CHARSET = "0123456789.,+-x%()/: " + "".join(sorted(set("".join(SUFFIXES))))
+
+    def __init__(self, capacity: int = 128):
+        # шрифт -> (белая полоса, {символ: клетка}, высота)
+        self._layouts = {}
+        self._tinted = LruCache(capacity)
+
+    def supports(self, text: str) -> bool:
+        charset = self.CHARSET
+        return all(ch in charset for ch in text)
+
+    def _layout(self, font):
+        layout = self._layouts.get(font)
+        if layout is not None:
+            return layout
+
+        rendered = [(ch, font.render(ch, True, (255, 255, 255))) for ch in self.CHARSET]
+        width = sum(surf.get_width() for _, surf in rendered)
+        height = max(surf.get_height() for _, surf in rendered)
+        strip = pygame.Surface((max(1, width), height), pygame.SRCALPHA)
+        strip.fill((255, 255, 255, 0))
+        # Готовые клетки (x, 0, ширина, высота) - они же area для блита
+        cells = {}
+        x = 0
+        for ch, surf in rendered:
+            strip.blit(surf, (x, 0))
+            cells[ch] = (x, 0, surf.get_width(), height)
+            x += surf.get_width()
+
+        layout = (strip, cells, height)
+        self._layouts[font] = layout
+        return layout
+
+    def _strip(self, font, color, bucket: int) -> pygame.Surface:
+        key = (font, color, bucket)
+        strip = self._tinted.get(key)
+        if strip is not None:
+            return strip
+
+        strip = self._layout(font)[0].copy()
+        strip.fill((color[0], color[1], color[2], 255), special_flags=pygame.BLEND_RGBA_MULT)
+        strip.set_alpha(bucket)
+        self._tinted.put(key, strip)
+        return strip
+
+    def size(self, font, text: str) -> tuple:
+        if not self.supports(text):
+            return texts.render(font, text).get_size()
+        _, cells, height = self._layout(font)
+        return sum(cells[ch][2] for ch in text), height
+
+    def blits(self, font, text: str, position, color=(255, 255, 255), alpha: int = 255) -> list:
+        """
+        (полоса, позиция, клетка) на каждый символ; position - левый верхний угол строки.
+        Готово для Surface.blits и RenderQueue.submit_batch.
+        """
+        x, y = int(position[0]), int(position[1])
+        color = tuple(color[:3])
+        cells = self._layout(font)[1]
+        strip = self._strip(font, color, TextCache.alpha_bucket(alpha))
+        result = []
+        for ch in text:
+            cell = cells.get(ch)
+            if cell is None:
+                # Символ не из набора - строка целиком через кэш текста
+                return [(texts.render(font, text, color, alpha=alpha), (int(position[0]), y), None)]
+            result.append((strip, (x, y), cell))
+            x += cell[2]
+        return result
+
+    def draw(self, surface, font, text: str, position, color=(255, 255, 255), alpha: int = 255) -> pygame.Rect:
+        """Рисует строку сразу на surface, возвращает занятый прямоугольник"""
+        batch = self.blits(font, text, position, color, alpha)
+        surface.blits(batch, doreturn=False)
+        return pygame.Rect((int(position[0]), int(position[1])), self.size(font, text))
+
+    def __len__(self):
+        return len(self._tinted)
+
+    def clear(self):
+        self._layouts.clear()
+        self._tinted.clear()
+
+
+# Один атлас на весь процесс (как fonts и texts)
+glyphs = GlyphAtlas()
@@ -0,0 +1,31 @@
+from collections import OrderedDict
+
+
+class LruCache:
+    """
+    Маленький LRU-словарь, общий для всех кэшей поверхностей (текст, символы, повороты, масштаб, частицы).
+    get освежает запись, put вытесняет самую давно использованную при переполнении.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._items = OrderedDict()
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value) -> None:
+        items = self._items
+        items[key] = value
+        items.move_to_end(key)
+        if len(items) > self.capacity:
+            items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+    def clear(self):
+        self._items.clear()
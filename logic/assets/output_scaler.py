@@ -0,0 +1,120 @@
+import math
+
+import pygame
+
+
+class OutputScaler:
+    """
+    Вывод виртуального холста (1920x1080) в окно.
+    Стратегии:
+      "smooth"  - smoothscale всего холста каждый кадр (как было, самое дорогое)
+      "nearest" - transform.scale (ближайший пиксель, заметно дешевле, но с "лесенкой")
+      "sdl_scaled" - флаг SCALED: окно логически размером с холст, масштабирует SDL (на GPU, если есть)
+      "smooth_on_resize" - smoothscale только в кадре после смены размера окна, остальные кадры - scale
+    В любом режиме окно размером ровно с холст (браузер: всегда 1920x1080) и есть холст:
+    рисуем прямо в поверхность дисплея, без копии и масштаба.
+    Замер стоимости стратегий: python -m benchmarks.output_scaler
+    """
+
+    MODES = ("smooth", "nearest", "sdl_scaled", "smooth_on_resize")
+
+    def __init__(self, mode: str, virtual_size, window_size, resizable: bool = True):
+        if mode not in self.MODES:
+            print(f"OutputScaler: неизвестный режим {mode}, используется smooth")
+            mode = "smooth"
+        self.mode = mode
+        self.virtual_size = tuple(virtual_size)
+        self.resizable = resizable
+        self.screen = None
+        self.canvas = None
+        self._own_canvas = None
+        self._resized = True
+        self.set_window_size(window_size)
+
+    def _flags(self) -> int:
+        return pygame.RESIZABLE if self.resizable else 0
+
+    def set_window_size(self, window_size) -> None:
+        """Создает окно нужного размера (и при старте, и на VIDEORESIZE)"""
+        window_size = (int(window_size[0]), int(window_size[1]))
+        if self.mode == "sdl_scaled":
+            if self.screen is None:
+                # Размер окна дальше меняет сам SDL, логический размер всегда равен холсту
+                try:
+                    self.screen = pygame.display.set_mode(self.virtual_size, pygame.SCALED | self._flags())
+                except pygame.error as e:
+                    print(f"OutputScaler: SCALED недоступен ({e}), используется smooth")
+                    self.mode = "smooth"
+                    self.set_window_size(window_size)
+                    return
+        else:
+            self.screen = pygame.display.set_mode(window_size, self._flags())
+
+        if self.mode == "sdl_scaled" or self.screen.get_size() == self.virtual_size:
+            self.canvas = self.screen
+        else:
+            if self._own_canvas is None:
+                self._own_canvas = pygame.Surface(self.virtual_size)
+            self.canvas = self._own_canvas
+        self._resized = True
+
+    @property
+    def window_size(self):
+        """Размер, в котором приходят координаты мыши (для SCALED - логический, т.е. размер холста)"""
+        return self.screen.get_size()
+
+    @property
+    def direct(self) -> bool:
+        """Холст и есть поверхность дисплея - копировать нечего"""
+        return self.canvas is self.screen
+
+    def _smooth(self) -> bool:
+        if self.mode == "nearest":
+            return False
+        if self.mode == "smooth_on_resize":
+            return self._resized
+        return True
+
+    def present(self, rects=None) -> None:
+        """Выводит кадр: rects=None - весь холст, иначе только эти области холста"""
+        canvas = self.canvas
+        screen = self.screen
+        if rects is None:
+            if not self.direct:
+                if canvas.get_size() == screen.get_size():
+                    screen.blit(canvas, (0, 0))
+                elif self._smooth():
+                    pygame.transform.smoothscale(canvas, screen.get_size(), screen)
+                else:
+                    pygame.transform.scale(canvas, screen.get_size(), screen)
+            self._resized = False
+            pygame.display.flip()
+            return
+
+        if self.direct:
+            pygame.display.update(rects)
+            return
+
+        cw, ch = canvas.get_size()
+        sw, sh = screen.get_size()
+        if (sw, sh) == (cw, ch):
+            for rect in rects:
+                screen.blit(canvas, rect, rect)
+            pygame.display.update(rects)
+            return
+
+        scale = pygame.transform.smoothscale if self._smooth() else pygame.transform.scale
+        kx = sw / cw
+        ky = sh / ch
+        screen_rects = []
+        for rect in rects:
+            left = int(rect.x * kx)
+            top = int(rect.y * ky)
+            width = int(math.ceil(rect.right * kx)) - left
+            height = int(math.ceil(rect.bottom * ky)) - top
+            if width <= 0 or height <= 0:
+                continue
+            patch = scale(canvas.subsurface(rect), (width, height))
+            screen.blit(patch, (left, top))
+            screen_rects.append(pygame.Rect(left, top, width, height))
+        pygame.display.update(screen_rects)
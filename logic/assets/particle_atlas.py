@@ -0,0 +1,87 @@
+import pygame
+
+from logic.assets.lru_cache import LruCache
+
+
+class ParticleAtlas:
+    """
+    Атлас мягких кружков для частиц.
+    На каждый (квантованный) цвет один раз печется полоса: столбцы - радиусы 1..MAX_RADIUS,
+    строки - ALPHA_LEVELS уровней прозрачности. Частица рисуется блитом своей клетки (area),
+    поэтому затухание настоящее, а вся пачка частиц уходит одним Surface.blits.
+    """
+
+    MAX_RADIUS = 12
+    ALPHA_LEVELS = 16
+    # Шаг квантования канала цвета: близкие цвета делят одну полосу
+    COLOR_STEP = 16
+    # Во сколько раз больше рисуется кружок перед уменьшением (мягкий край)
+    SUPERSAMPLE = 4
+
+    def __init__(self, capacity: int = 64):
+        self._strips = LruCache(capacity)
+        self.cell_height = self.MAX_RADIUS * 2 + 2
+        # Левый край столбца радиуса r (клетка шириной 2r + 2)
+        self._column_x = [0] * (self.MAX_RADIUS + 2)
+        for radius in range(1, self.MAX_RADIUS + 1):
+            self._column_x[radius + 1] = self._column_x[radius] + radius * 2 + 2
+        self.strip_width = self._column_x[self.MAX_RADIUS + 1]
+        # areas[radius][level] - готовые прямоугольники клеток
+        self.areas = [[None] * self.ALPHA_LEVELS]
+        for radius in range(1, self.MAX_RADIUS + 1):
+            size = radius * 2 + 2
+            self.areas.append([(self._column_x[radius], level * self.cell_height, size, size)
+                               for level in range(self.ALPHA_LEVELS)])
+
+    @classmethod
+    def color_key(cls, color) -> tuple:
+        step = cls.COLOR_STEP
+        return tuple(min(255, (int(c) // step) * step + step // 2) for c in color[:3])
+
+    @classmethod
+    def alpha_level(cls, life: float) -> int:
+        """Уровень прозрачности по остатку жизни (1.0 и больше - непрозрачная)"""
+        return max(0, min(cls.ALPHA_LEVELS - 1, int(life * cls.ALPHA_LEVELS)))
+
+    def strip(self, key) -> pygame.Surface:
+        """Полоса кружков для уже квантованного цвета key"""
+        strip = self._strips.get(key)
+        if strip is not None:
+            return strip
+
+        strip = self._bake(key)
+        self._strips.put(key, strip)
+        return strip
+
+    def _bake(self, color) -> pygame.Surface:
+        levels = self.ALPHA_LEVELS
+        cell_height = self.cell_height
+        strip = pygame.Surface((self.strip_width, cell_height * levels), pygame.SRCALPHA)
+        # Прозрачные пиксели тоже нашего цвета: иначе smoothscale даст темную кайму
+        strip.fill((color[0], color[1], color[2], 0))
+
+        # Непрозрачная строка - последняя (уровень ALPHA_LEVELS - 1)
+        opaque_y = (levels - 1) * cell_height
+        k = self.SUPERSAMPLE
+        for radius in range(1, self.MAX_RADIUS + 1):
+            size = radius * 2 + 2
+            big = pygame.Surface((size * k, size * k), pygame.SRCALPHA)
+            big.fill((color[0], color[1], color[2], 0))
+            pygame.draw.circle(big, (color[0], color[1], color[2], 255), (size * k // 2, size * k // 2), radius * k)
+            strip.blit(pygame.transform.smoothscale(big, (size, size)), (self._column_x[radius], opaque_y))
+
+        # Остальные строки - ее копии с умноженной альфой
+        opaque_row = strip.subsurface((0, opaque_y, self.strip_width, cell_height)).copy()
+        for level in range(levels - 1):
+            row = pygame.Rect(0, level * cell_height, self.strip_width, cell_height)
+            strip.fill((color[0], color[1], color[2], 0), row)
+            strip.blit(opaque_row, row)
+            alpha = (level + 1) * 255 // levels
+            strip.fill((255, 255, 255, alpha), row, special_flags=pygame.BLEND_RGBA_MULT)
+        return strip
+
+    def __len__(self):
+        return len(self._strips)
+
+    def clear(self):
+        self._strips.clear()
@@ -0,0 +1,79 @@
+class RegionIndex:
+    """
+    Сетка прямоугольных областей-множителей (зоны x2/x5, кратер метеорита).
+    Область записана во все ячейки, которые задевает ее AABB (нужны left, right, bottom, top и multiplier).
+    Поиск по точке смотрит одну ячейку, поэтому не зависит от общего числа областей.
+    """
+
+    def __init__(self, cell_size: int):
+        self.cell_size = cell_size
+        self.grid = {}
+        self._cells_of = {}  # область -> (min_cx, min_cy, max_cx, max_cy)
+
+    def _cell_range(self, region):
+        cell_size = self.cell_size
+        return (int(region.left // cell_size), int(region.bottom // cell_size),
+                int(region.right // cell_size), int(region.top // cell_size))
+
+    def _write(self, region, cell_range, add: bool):
+        min_cx, min_cy, max_cx, max_cy = cell_range
+        grid = self.grid
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                key = (cx, cy)
+                if add:
+                    grid.setdefault(key, []).append(region)
+                else:
+                    cell = grid[key]
+                    cell.remove(region)
+                    if not cell:
+                        del grid[key]
+
+    def update(self, region) -> bool:
+        """Добавляет область или перекладывает ее, если она сдвинулась/выросла. True - набор ячеек сменился"""
+        cell_range = self._cell_range(region)
+        old_range = self._cells_of.get(region)
+        if old_range == cell_range:
+            return False
+        if old_range is not None:
+            self._write(region, old_range, add=False)
+        self._write(region, cell_range, add=True)
+        self._cells_of[region] = cell_range
+        return True
+
+    def remove(self, region) -> None:
+        old_range = self._cells_of.pop(region, None)
+        if old_range is not None:
+            self._write(region, old_range, add=False)
+
+    def sync(self, regions) -> None:
+        """Приводит индекс к списку активных областей: новые добавляет, исчезнувшие убирает, сдвинутые обновляет"""
+        active = set(regions)
+        for region in [r for r in self._cells_of if r not in active]:
+            self.remove(region)
+        for region in active:
+            self.update(region)
+
+    def regions_at(self, x: float, y: float) -> list:
+        """Области, в которые попадает точка (границы включительно)"""
+        cell = self.grid.get((int(x // self.cell_size), int(y // self.cell_size)))
+        if not cell:
+            return []
+        return [r for r in cell if r.left <= x <= r.right and r.bottom <= y <= r.top]
+
+    def multiplier_at(self, x: float, y: float) -> float:
+        """Произведение множителей всех областей над точкой (1.0 - ни одной)"""
+        total = 1.0
+        for region in self.regions_at(x, y):
+            total *= region.multiplier
+        return total
+
+    def __contains__(self, region):
+        return region in self._cells_of
+
+    def __len__(self):
+        return len(self._cells_of)
+
+    def clear(self):
+        self.grid = {}
+        self._cells_of = {}
@@ -0,0 +1,85 @@
+class RenderQueue:
+    """
+    Очередь отрисовки кадра.
+    Объекты не блитят сами, а кладут (поверхность, позиция, слой) через submit.
+    flush сортирует очередь по слою один раз (внутри слоя - порядок добавления)
+    и выводит подряд идущие обычные блиты одним Surface.blits.
+    Элементы с прозрачностью (общая текстура, set_alpha на время блита) и вызовы
+    (pygame.draw и т.п.) выполняются по одному, но на своем месте в порядке слоев.
+    """
+
+    # === СЛОИ (снизу вверх) ===
+    LAYER_ZONES = 0
+    LAYER_GROUND = 10  # жук, кратер
+    LAYER_STATIC = 20  # запеченный слой спящих монет
+    LAYER_RESTING = 30  # лежащие (но не спящие) монеты
+    LAYER_SHADOWS = 40  # тени летящих монет
+    LAYER_FLYING = 50
+    LAYER_EFFECTS = 60  # огоньки, взрывы, торнадо, метеорит
+    LAYER_PARTICLES = 70
+    LAYER_TEXT = 80
+    LAYER_OVERLAY = 90
+
+    def __init__(self):
+        # (слой, порядковый номер, элемент); элемент - (поверхность, позиция, область, альфа),
+        # список готовых блитов или вызов
+        self._items = []
+        # Статистика последнего flush
+        self.items = 0
+        self.draw_calls = 0
+
+    def submit(self, surface, position, layer: int, area=None, alpha: int = 255) -> None:
+        self._items.append((layer, len(self._items), (surface, position, area, alpha)))
+
+    def submit_batch(self, blits: list, layer: int) -> None:
+        """Готовый список (поверхность, позиция, область) без прозрачности - например, частицы из атласа"""
+        if blits:
+            self._items.append((layer, len(self._items), blits))
+
+    def submit_call(self, func, layer: int) -> None:
+        """Произвольная отрисовка func(surface) на своем слое (pygame.draw и т.п.)"""
+        self._items.append((layer, len(self._items), func))
+
+    def flush(self, surface) -> None:
+        items = self._items
+        items.sort(key=lambda item: item[0])
+        self._items = []
+
+        draw_calls = 0
+        batch = []
+        for _, _, item in items:
+            if type(item) is tuple and item[3] >= 255:
+                batch.append(item[:3])
+                continue
+            if type(item) is list:
+                batch.extend(item)
+                continue
+
+            if batch:
+                surface.blits(batch, doreturn=False)
+                draw_calls += 1
+                batch = []
+
+            if type(item) is tuple:
+                # Поверхность может быть общей (кэш): прозрачность только на время блита
+                image, position, area, alpha = item
+                old_alpha = image.get_alpha()
+                image.set_alpha(alpha)
+                surface.blit(image, position, area)
+                image.set_alpha(old_alpha)
+            else:
+                item(surface)
+            draw_calls += 1
+
+        if batch:
+            surface.blits(batch, doreturn=False)
+            draw_calls += 1
+
+        self.items = sum(len(item[2]) if type(item[2]) is list else 1 for item in items)
+        self.draw_calls = draw_calls
+
+    def clear(self) -> None:
+        self._items = []
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,47 @@
+import math
+
+import pygame
+
+from logic.assets.lru_cache import LruCache
+
+
+class RotationCache:
+    """
+    Повернутые текстуры с квантованием угла: угол округляется до одного из steps шагов,
+    каждая (текстура, масштаб, шаг) рендерится один раз и дальше просто блитится.
+    Старые повороты вытесняются по LRU, когда их больше capacity.
+    """
+
+    def __init__(self, steps: int = 64, capacity: int = 1024):
+        self.steps = steps
+        self._step_degrees = 360.0 / steps
+        self._cache = LruCache(capacity)
+
+    def step_of(self, angle_radians: float) -> int:
+        """Ближайший шаг для угла в радианах"""
+        return int(round(math.degrees(angle_radians) / self._step_degrees)) % self.steps
+
+    def get(self, sprite, angle_radians: float) -> pygame.Surface:
+        """
+        Текстура спрайта (уже отмасштабированная), повернутая на ближайший шаг.
+        Ключ - сырая текстура и масштаб, а не сама отмасштабированная поверхность:
+        она пересоздается при каждой смене кадра, а сырые кадры общие у всех монет одного типа.
+        """
+        step = self.step_of(angle_radians)
+        key = (sprite.raw_image, sprite.scale, step)
+        rotated = self._cache.get(key)
+        if rotated is not None:
+            return rotated
+
+        rotated = pygame.transform.rotate(sprite.texture, step * self._step_degrees)
+        # Поверхность общая для многих монет: прозрачность затухания сюда не запекаем.
+        # Именно 255, а не None: None у поверхности с попиксельной альфой отключает смешивание
+        rotated.set_alpha(255)
+        self._cache.put(key, rotated)
+        return rotated
+
+    def __len__(self):
+        return len(self._cache)
+
+    def clear(self):
+        self._cache.clear()
@@ -0,0 +1,31 @@
+import pygame
+
+from logic.assets.lru_cache import LruCache
+
+
+class ScaledTextureCache:
+    """
+    Общие отмасштабированные текстуры (flyweight) для всех спрайтов.
+    Ключ - исходная поверхность и целевой размер: одинаковые кадры одного масштаба
+    у всех монет - одна поверхность, смена кадра анимации - поиск в словаре вместо smoothscale.
+    Выдаваемые поверхности общие, поэтому их нельзя менять (set_alpha и т.п.) без возврата назад.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self._cache = LruCache(capacity)
+
+    def get(self, raw: pygame.Surface, size: tuple) -> pygame.Surface:
+        key = (raw, size)
+        scaled = self._cache.get(key)
+        if scaled is not None:
+            return scaled
+
+        scaled = pygame.transform.smoothscale(raw, size)
+        self._cache.put(key, scaled)
+        return scaled
+
+    def __len__(self):
+        return len(self._cache)
+
+    def clear(self):
+        self._cache.clear()
@@ -1,32 +1,231 @@
+import math
+
+
 class SpatialHash:
+    """
+    Постоянная сетка для поиска соседей.
+    Хранит сами монеты (нужны center_x, center_y и radius), поэтому запросы сразу возвращают монеты.
+    Объект перекладывается в другую ячейку только когда пересекает ее границу,
+    пустые ячейки не удаляются сразу - они переиспользуются и чистятся пачкой.
+    """
+
+    # Чистим пустые ячейки, когда их больше этого числа и больше половины сетки
+    COMPACT_MIN_EMPTY = 64
+
     def __init__(self, cell_size: int):
         self.cell_size = cell_size
         self.grid = {}
+        self._cell_of = {}  # объект -> ключ его текущей ячейки
+        self._empty_cells = 0
+
+    @staticmethod
+    def cell_size_for(radii, min_size: int = 1):
+        """
+        Размер ячейки по радиусам монет: любой контакт (r1 + r2 <= 2 * max_r)
+        должен попадать в соседние 3x3 ячейки. None, если радиусов нет.
+        """
+        if not radii:
+            return None
+        return max(min_size, int(math.ceil(2 * max(radii))))
 
     def _get_key(self, position):
         x, y = position
-        return (int(x / self.cell_size), int(y / self.cell_size))
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def _add_to_cell(self, key, item):
+        cell = self.grid.get(key)
+        if cell is None:
+            self.grid[key] = [item]
+        else:
+            if not cell:
+                self._empty_cells -= 1
+            cell.append(item)
+
+    def _remove_from_cell(self, key, item):
+        cell = self.grid[key]
+        cell.remove(item)
+        if not cell:
+            self._empty_cells += 1
+
+    def insert(self, item):
+        if item in self._cell_of:
+            self.move(item)
+            return
+        key = self._get_key((item.center_x, item.center_y))
+        self._cell_of[item] = key
+        self._add_to_cell(key, item)
+
+    # Старое имя, чтобы не ломать вызовы
+    add = insert
+
+    def remove(self, item):
+        key = self._cell_of.pop(item, None)
+        if key is None:
+            return
+        self._remove_from_cell(key, item)
+        self._maybe_compact()
+
+    def move(self, item) -> bool:
+        """Проверяет позицию объекта. Возвращает True, если объект сменил ячейку"""
+        old_key = self._cell_of.get(item)
+        if old_key is None:
+            self.insert(item)
+            return True
+
+        cell_size = self.cell_size
+        key = (int(item.center_x // cell_size), int(item.center_y // cell_size))
+        if key == old_key:
+            return False
+
+        self._remove_from_cell(old_key, item)
+        self._add_to_cell(key, item)
+        self._cell_of[item] = key
+        self._maybe_compact()
+        return True
+
+    def _maybe_compact(self):
+        if self._empty_cells > self.COMPACT_MIN_EMPTY and self._empty_cells * 2 > len(self.grid):
+            self.grid = {key: cell for key, cell in self.grid.items() if cell}
+            self._empty_cells = 0
 
-    def add(self, sprite):
-        key = self._get_key((sprite.center_x, sprite.center_y))
-        if key not in self.grid:
-            self.grid[key] = []
-        self.grid[key].append(sprite)
+    def rebuild(self, cell_size: int):
+        """Меняет размер ячейки и раскладывает все объекты заново"""
+        items = list(self._cell_of)
+        self.cell_size = cell_size
+        self.grid = {}
+        self._cell_of = {}
+        self._empty_cells = 0
+        for item in items:
+            self.insert(item)
 
     def get_sprites_near_point(self, position):
-        """Возвращает список спрайтов в той же и соседних ячейках"""
-        cx, cy = position
-        cx_idx = int(cx / self.cell_size)
-        cy_idx = int(cy / self.cell_size)
+        """Возвращает список объектов в той же и соседних ячейках"""
+        cx_idx, cy_idx = self._get_key(position)
 
         nearby = []
         # Проверяем 3x3 область вокруг точки
         for x in range(cx_idx - 1, cx_idx + 2):
             for y in range(cy_idx - 1, cy_idx + 2):
-                key = (x, y)
-                if key in self.grid:
-                    nearby.extend(self.grid[key])
+                cell = self.grid.get((x, y))
+                if cell:
+                    nearby.extend(cell)
         return nearby
 
+    def query_point(self, position):
+        """
+        Монеты, в круг которых попадает точка (клик, захват).
+        Ячейка не меньше 2 * max radius (cell_size_for), так что хватает соседей 3x3.
+        """
+        x, y = position
+        found = []
+        for item in self.get_sprites_near_point(position):
+            dx = x - item.center_x
+            dy = y - item.center_y
+            radius = item.radius
+            if dx * dx + dy * dy < radius * radius:
+                found.append(item)
+        return found
+
+    def query_radius(self, position, radius, exact: bool = True):
+        """
+        Объекты, чей центр строго внутри круга: перебираются только ячейки под его AABB.
+        exact=False - без проверки расстояния (все объекты этих ячеек), если вызывающий
+        все равно считает расстояние сам, например векторно.
+        """
+        x, y = position
+        cell_size = self.cell_size
+        min_cx = int((x - radius) // cell_size)
+        max_cx = int((x + radius) // cell_size)
+        min_cy = int((y - radius) // cell_size)
+        max_cy = int((y + radius) // cell_size)
+        radius_sq = radius * radius
+
+        grid = self.grid
+        found = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                cell = grid.get((cx, cy))
+                if not cell:
+                    continue
+                if not exact:
+                    found.extend(cell)
+                    continue
+                for item in cell:
+                    dx = item.center_x - x
+                    dy = item.center_y - y
+                    if dx * dx + dy * dy < radius_sq:
+                        found.append(item)
+        return found
+
+    def query_aabb(self, left, bottom, right, top):
+        """Объекты, чей центр внутри прямоугольника (границы включительно)"""
+        cell_size = self.cell_size
+        grid = self.grid
+        found = []
+        for cx in range(int(left // cell_size), int(right // cell_size) + 1):
+            for cy in range(int(bottom // cell_size), int(top // cell_size) + 1):
+                cell = grid.get((cx, cy))
+                if not cell:
+                    continue
+                for item in cell:
+                    if left <= item.center_x <= right and bottom <= item.center_y <= top:
+                        found.append(item)
+        return found
+
+    # Половина соседей 3x3: вторую половину пара увидит со стороны другой ячейки
+    _FORWARD_NEIGHBOURS = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+    def candidate_pairs(self):
+        """Все пары объектов из соседних ячеек, каждая пара ровно один раз"""
+        grid = self.grid
+        forward = self._FORWARD_NEIGHBOURS
+        for (kx, ky), cell in grid.items():
+            count = len(cell)
+            if not count:
+                continue
+            for i in range(count - 1):
+                first = cell[i]
+                for j in range(i + 1, count):
+                    yield first, cell[j]
+            for dx, dy in forward:
+                other = grid.get((kx + dx, ky + dy))
+                if other:
+                    for first in cell:
+                        for second in other:
+                            yield first, second
+
+    def candidate_pairs_for(self, active):
+        """
+        Пары из соседних ячеек, где хотя бы один объект входит в множество active.
+        Пару двух активных отдает только сторона с меньшим id, так что каждая пара один раз.
+        """
+        grid = self.grid
+        cell_of = self._cell_of
+        for item in active:
+            key = cell_of.get(item)
+            if key is None:
+                continue
+            kx, ky = key
+            own_id = id(item)
+            for x in range(kx - 1, kx + 2):
+                for y in range(ky - 1, ky + 2):
+                    cell = grid.get((x, y))
+                    if not cell:
+                        continue
+                    for other in cell:
+                        if other is item:
+                            continue
+                        if other in active and id(other) < own_id:
+                            continue
+                        yield item, other
+
+    def __contains__(self, item):
+        return item in self._cell_of
+
+    def __len__(self):
+        return len(self._cell_of)
+
     def clear(self):
-        self.grid = {}
\ No newline at end of file
+        self.grid = {}
+        self._cell_of = {}
+        self._empty_cells = 0
@@ -1,12 +1,18 @@
 import pygame
 
+from logic.assets.scaled_texture_cache import ScaledTextureCache
+
 
 class PygameSprite:
     """
     Обертка вокруг pygame.Surface.
     Работает с RAW (сырыми) текстурами и применяет масштаб динамически.
+    Отмасштабированные кадры берутся из общего кэша и не принадлежат спрайту.
     """
 
+    # Один кэш на процесс: одинаковые (кадр, размер) у всех спрайтов - одна поверхность
+    scaled_textures = ScaledTextureCache()
+
     def __init__(self, image=None, scale: float = 1.0):
         self._raw_image = image  # Текущая "сырая" текстура (кадр анимации)
         self._image = None  # Отмасштабированная текстура (что рисуем)
@@ -31,7 +37,7 @@ class PygameSprite:
         if self._raw_image:
             w = int(self._raw_image.get_width() * self._scale)
             h = int(self._raw_image.get_height() * self.scale)
-            self._image = pygame.transform.smoothscale(self._raw_image, (w, h))
+            self._image = self.scaled_textures.get(self._raw_image, (w, h))
 
             self._width_cache = self._image.get_width()
             self._height_cache = self._image.get_height()
@@ -53,6 +59,11 @@ class PygameSprite:
         # Сразу пересчитываем размер с текущим масштабом
         self._apply_scale()
 
+    @property
+    def raw_image(self):
+        """Исходный (не отмасштабированный) кадр - общий у всех спрайтов одного типа"""
+        return self._raw_image
+
     @property
     def scale(self):
         return self._scale
@@ -105,14 +116,35 @@ class PygameSprite:
     def height(self):
         return self._height_cache
 
+    def screen_rect(self, screen_height: int) -> pygame.Rect:
+        """Прямоугольник, который займет спрайт на экране (для грязных областей)"""
+        return pygame.Rect(int(self.center_x - self.width / 2), int(screen_height - (self.center_y + self.height / 2)),
+                           self.width + 1, self.height + 1)
+
     def draw(self, surface: pygame.Surface, screen_height: int) -> None:
         if not self._image:
             return
 
-        if self.alpha < 255:
-            self._image.set_alpha(self.alpha)
-
         draw_x = int(self.center_x - self.width / 2)
         draw_y = int(screen_height - (self.center_y + self.height / 2))
 
-        surface.blit(self._image, (draw_x, draw_y))
\ No newline at end of file
+        if self.alpha < 255:
+            # Текстура общая (кэш масштаба): прозрачность только на время блита
+            image = self._image
+            old_alpha = image.get_alpha()
+            image.set_alpha(self.alpha)
+            surface.blit(image, (draw_x, draw_y))
+            image.set_alpha(old_alpha)
+        else:
+            surface.blit(self._image, (draw_x, draw_y))
+
+    def submit(self, queue, camera, layer: int, center=None) -> None:
+        """
+        То же, что draw, но через очередь отрисовки (RenderQueue) и камеру.
+        center - логический центр, если рисовать нужно не в текущей позиции (интерполяция)
+        """
+        if not self._image:
+            return
+        center_x, center_y = center if center is not None else (self.center_x, self.center_y)
+        position = camera.top_left(center_x, center_y, self.width, self.height)
+        queue.submit(self._image, position, layer, alpha=self.alpha)
\ No newline at end of file
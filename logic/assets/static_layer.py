@@ -0,0 +1,147 @@
+import pygame
+
+
+class StaticCoinLayer:
+    """
+    Запеченный слой спящих монет.
+    Спящая монета не двигается и не крутится, поэтому рисуется в слой один раз, когда засыпает.
+    Проснувшаяся или удаленная монета стирается из слоя: очищается только ее прямоугольник,
+    и в нем заново рисуются запеченные соседи. Каждый кадр слой выводится одним блитом,
+    так что цена отрисовки зависит от числа изменений, а не от числа монет.
+    """
+
+    # Размер ячейки сетки, по которой ищутся соседи стираемой монеты
+    CELL_SIZE = 128
+    # Сколько измененных прямоугольников копится до слияния в один
+    MAX_CHANGES = 256
+
+    def __init__(self, width: int, height: int):
+        self.surface = pygame.Surface((int(width), int(height)), pygame.SRCALPHA)
+        self.height = int(height)
+        # монета -> (порядок наложения, поверхность, прямоугольник на слое)
+        self._baked = {}
+        # (cx, cy) -> монеты, чьи прямоугольники задевают ячейку
+        self._cells = {}
+        self._order = 0
+        # Область слоя, где что-то нарисовано
+        self._bounds = None
+        # Прямоугольники, измененные с прошлого pop_changes (для режима грязных областей)
+        self._changes = []
+
+    def _cell_keys(self, rect):
+        cell = self.CELL_SIZE
+        for cx in range(rect.left // cell, (rect.right - 1) // cell + 1):
+            for cy in range(rect.top // cell, (rect.bottom - 1) // cell + 1):
+                yield (cx, cy)
+
+    @property
+    def size(self):
+        return self.surface.get_size()
+
+    def add(self, coin) -> None:
+        """Запекает монету в текущей позиции (уже запеченная перерисовывается)"""
+        if coin in self._baked:
+            self.remove(coin)
+
+        texture = coin.get_ground_texture()
+        rect = texture.get_rect()
+        rect.center = (coin.sprite.center_x, self.height - coin.sprite.center_y)
+        self._order += 1
+        self._baked[coin] = (self._order, texture, rect)
+        cells = self._cells
+        for key in self._cell_keys(rect):
+            cells.setdefault(key, []).append(coin)
+        self._bounds = rect.copy() if self._bounds is None else self._bounds.union(rect)
+        self.surface.blit(texture, rect)
+        self._note_change(rect)
+
+    def remove(self, coin) -> None:
+        """Стирает монету: очищает ее прямоугольник и дорисовывает в нем соседей"""
+        entry = self._baked.pop(coin, None)
+        if entry is None:
+            return
+        rect = entry[2]
+
+        # Соседи по ячейкам, которые задевает прямоугольник
+        baked = self._baked
+        cells = self._cells
+        neighbours = {}
+        for key in self._cell_keys(rect):
+            cell = cells[key]
+            cell.remove(coin)
+            if not cell:
+                del cells[key]
+                continue
+            for other in cell:
+                neighbours[other] = baked[other]
+
+        surface = self.surface
+        surface.fill((0, 0, 0, 0), rect)
+        surface.set_clip(rect)
+        # Соседи дорисовываются в том порядке, в котором были запечены
+        for _, texture, other_rect in sorted(neighbours.values(), key=lambda e: e[0]):
+            if rect.colliderect(other_rect):
+                surface.blit(texture, other_rect)
+        surface.set_clip(None)
+        self._note_change(rect)
+
+    def prune(self, awake_coins) -> None:
+        """Убирает из слоя монеты, которые проснулись"""
+        baked = self._baked
+        for coin in [c for c in awake_coins if c in baked]:
+            self.remove(coin)
+
+    def _note_change(self, rect) -> None:
+        # Если изменения никто не забирает (режим грязных областей выключен), список не растет:
+        # много мелких прямоугольников заменяются одним на всю нарисованную область
+        changes = self._changes
+        changes.append(rect.copy())
+        if len(changes) > self.MAX_CHANGES:
+            self._changes = [changes[0].unionall(changes[1:])]
+
+    def pop_changes(self) -> list:
+        """Прямоугольники слоя, измененные с прошлого вызова"""
+        changes = self._changes
+        self._changes = []
+        return changes
+
+    def rebuild(self, coins, width: int, height: int) -> None:
+        """Новый размер слоя: запекает заново все переданные монеты"""
+        if self._bounds is not None:
+            self._note_change(self._bounds)
+        self.surface = pygame.Surface((int(width), int(height)), pygame.SRCALPHA)
+        self.height = int(height)
+        self._baked = {}
+        self._cells = {}
+        self._bounds = None
+        for coin in coins:
+            self.add(coin)
+
+    def clear(self) -> None:
+        if self._bounds is not None:
+            self._note_change(self._bounds)
+        self.surface.fill((0, 0, 0, 0))
+        self._baked = {}
+        self._cells = {}
+        self._bounds = None
+
+    def draw(self, surface, offset=(0, 0)) -> None:
+        if self._bounds is None or not self._baked:
+            return
+        bounds = self._bounds
+        surface.blit(self.surface, (bounds.x + offset[0], bounds.y + offset[1]), bounds)
+
+    def submit(self, queue, camera) -> None:
+        """То же, что draw, но через очередь отрисовки: слой двигается вместе с камерой"""
+        if self._bounds is None or not self._baked:
+            return
+        bounds = self._bounds
+        # Слой хранится в экранных координатах несдвинутой камеры: его строка by - логический y = height - by
+        x, y = camera.to_screen(bounds.x, self.height - bounds.y)
+        queue.submit(self.surface, (int(x), int(y)), queue.LAYER_STATIC, area=bounds)
+
+    def __contains__(self, coin):
+        return coin in self._baked
+
+    def __len__(self):
+        return len(self._baked)
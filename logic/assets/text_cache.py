@@ -0,0 +1,83 @@
+import pygame
+
+from logic.assets.lru_cache import LruCache
+
+
+class TextCache:
+    """
+    Общий LRU-кэш отрендеренного текста.
+    Ключ - (шрифт, текст, цвет, обводка, уровень прозрачности): одна и та же надпись
+    рендерится один раз и дальше просто блитится. Надпись с обводкой собирается
+    в одну поверхность (8 копий обводки + текст) тоже один раз.
+    Прозрачность квантуется до ALPHA_STEP, чтобы затухающий текст не плодил сотни записей.
+    hits / misses - попадания и промахи (для проверки, что в кадре почти все берется из кэша).
+    """
+
+    ALPHA_STEP = 16
+
+    def __init__(self, capacity: int = 512):
+        self._cache = LruCache(capacity)
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def alpha_bucket(cls, alpha) -> int:
+        alpha = max(0, min(255, int(alpha)))
+        if alpha >= 255:
+            return 255
+        return (alpha // cls.ALPHA_STEP) * cls.ALPHA_STEP
+
+    def render(self, font, text: str, color=(255, 255, 255), outline=None, outline_width: int = 1,
+               alpha: int = 255) -> pygame.Surface:
+        """
+        Поверхность надписи. С обводкой (outline - ее цвет) поверхность больше на outline_width
+        с каждой стороны: блитить ее нужно в (x - outline_width, y - outline_width).
+        Поверхность общая - менять ее (set_alpha и т.п.) нельзя, прозрачность задается через alpha.
+        """
+        color = tuple(color[:3])
+        if outline is not None:
+            outline = (tuple(outline[:3]), outline_width)
+        bucket = self.alpha_bucket(alpha)
+        key = (font, text, color, outline, bucket)
+
+        surf = self._cache.get(key)
+        if surf is not None:
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        if outline is None:
+            surf = font.render(text, True, color)
+        else:
+            surf = self._compose_outline(font, text, color, outline[0], outline_width)
+        # Уровень прозрачности входит в ключ: поверхность одна на уровень и больше не меняется
+        surf.set_alpha(bucket)
+        self._cache.put(key, surf)
+        return surf
+
+    @staticmethod
+    def _compose_outline(font, text, color, outline_color, width) -> pygame.Surface:
+        text_surf = font.render(text, True, color)
+        outline_surf = font.render(text, True, outline_color)
+        w, h = text_surf.get_size()
+        surf = pygame.Surface((w + width * 2, h + width * 2), pygame.SRCALPHA)
+        for dx in (-width, 0, width):
+            for dy in (-width, 0, width):
+                if dx != 0 or dy != 0:
+                    surf.blit(outline_surf, (width + dx, width + dy))
+        surf.blit(text_surf, (width, width))
+        return surf
+
+    def __len__(self):
+        return len(self._cache)
+
+    def clear(self):
+        self._cache.clear()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+
+# Один кэш на весь процесс: меню, HUD, панель улучшений и надписи на поле
+texts = TextCache()
@@ -7,14 +7,26 @@ import time
 import sys
 from browser_saver import BrowserStorage
 from logic.economy.prestige import PrestigeManager
+from logic.economy.offline_progress import OfflineProgress
 from logic.world.gold_coin import GoldCoin
 from logic.world.bronze_coin import BronzeCoin
 from logic.world.silver_coin import SilverCoin
+from logic.world.coin import Coin
 from logic.world.map_activities.wisp import Wisp
 from logic.world.map_activities.multiply_zone import MultiplyZone
 from logic.assets.asset_manager import AssetManager
 from logic.assets.sound_manager import SoundManager
 from logic.assets.spatial_hash import SpatialHash
+from logic.assets.region_index import RegionIndex
+from logic.assets.static_layer import StaticCoinLayer
+from logic.assets.render_queue import RenderQueue
+from logic.assets.camera import Camera
+from logic.assets.particle_atlas import ParticleAtlas
+from logic.assets.font_manager import fonts
+from logic.assets.text_cache import texts
+from logic.assets.glyph_atlas import glyphs
+from logic.world.coin_physics import NumpyCoinPhysics, HAS_NUMPY, choose_backend
+from logic.world.particles import ParticleSystem, NumpyParticleSystem
 from logic.economy.balance import Balance
 from logic.world.map_activities.beetle import Beetle
 from logic.world.map_activities.crater import Crater
@@ -27,21 +39,36 @@ from logic.world.cursed_coin import CursedCoin
 
 class GameController:
     def __init__(self, asset_manager: AssetManager, ui_controller, sound_manager: SoundManager,
-                 world_width: int, world_height: int, scale_factor: float):
+                 world_width: int, world_height: int, scale_factor: float, physics_backend: str = "python",
+                 storage=None):
         self.assets = asset_manager
         self.balance = Balance()
         self.ui = ui_controller
+        # Баланс сам сообщает UI об изменениях: пересчитываются только пересеченные пороги цен
+        self.balance.subscribe(self.ui.on_balance_changed)
         self.sound_manager = sound_manager
         self.coins = []
-        self.particles = []
+        # Сколько монет каждого типа на поле (ведется при добавлении/удалении)
+        self.coin_counts = {"bronze": 0, "silver": 0, "gold": 0}
+        # Последнее отправленное в UI состояние (None - отправить заново)
+        self._ui_state = None
+        self._ui_coin_counts = None
+        self._ui_prestige_gain = None
+        # Частицы - массивы фиксированной емкости (numpy, если есть), при переполнении перезаписываются старые
+        self.max_particles = 20000
+        self.particles = NumpyParticleSystem(self.max_particles) if HAS_NUMPY else ParticleSystem(self.max_particles)
+        self.particle_atlas = ParticleAtlas()
         self.floating_texts = []
         self.grab_mode_active = False # НОВАя переменная для мобилок
 
         # === ПРЕСТИЖ ===
         self.prestige = PrestigeManager()
         self.confirmation_dialog = None
+        # === ОФЛАЙН-ПРОГРЕСС ===
+        self.offline_progress = OfflineProgress()
+        self.last_offline_report = None
         # НОВОЕ: Инициализация хранилища и режима захвата
-        self.storage = BrowserStorage()
+        self.storage = storage if storage is not None else BrowserStorage()
         self.grab_mode_active = False  # Переменная для кнопки на мобильных
 
         # === КОНСТАНТЫ БАЗОВОЙ СТОИМОСТИ (ИСПРАВЛЕНО ДЛЯ БАЛАНСА) ===
@@ -194,16 +221,35 @@ class GameController:
         self.start_coin_y = world_height * 0.5
 
         self.spatial_hash = SpatialHash(cell_size=int(150 * self.scale_factor))
+        # Плоский список контактов кадра (переиспользуется) и их число для профилирования
+        self.contacts = []
+        self.last_contact_count = 0
+        # Активные (не спящие) монеты: dict как упорядоченное множество, монеты будят себя сами
+        self.awake_coins = {}
+        # Области-множители (зоны и кратер), по которым считается доход при приземлении
+        self.multiplier_regions = RegionIndex(cell_size=int(200 * self.scale_factor))
+        # Затемнение экрана концовки (см. draw)
+        self._game_over_overlay = None
+        # Запеченный слой спящих монет: рисуются в него при засыпании, стираются при пробуждении
+        self.static_layer = StaticCoinLayer(world_width, world_height)
+        # Очередь отрисовки: все спрайты кадра выводятся пачками через Surface.blits
+        self.render_queue = RenderQueue()
+        # Камера: тряска экрана (и в будущем прокрутка) - смещение вида, а не координат объектов
+        self.camera = Camera(world_height)
+
+        # === ФИЗИЧЕСКИЙ БЭКЕНД ===
+        # "python" - Coin.update по одной монете, "numpy" - пакетный NumpyCoinPhysics,
+        # "auto" - numpy, только если он установлен и лимит монет не ниже порога, где он быстрее
+        self.physics = None
+        physics_backend = choose_backend(physics_backend, self.max_coins)
+        if physics_backend == "numpy":
+            if HAS_NUMPY:
+                self.physics = NumpyCoinPhysics(capacity=self.max_coins)
+            else:
+                print("WARNING: numpy not found, falling back to python physics")
 
         # Загрузка шрифта
-        raw_font_path = self.assets.ui_assets.get("font_name", "Arial")
-        try:
-            if raw_font_path != "Arial" and os.path.exists(raw_font_path):
-                self.game_font = pygame.font.Font(raw_font_path, 20)
-            else:
-                self.game_font = pygame.font.SysFont("Arial", 20)
-        except:
-            self.game_font = pygame.font.SysFont("Arial", 20)
+        self.game_font = fonts.get(self.assets.ui_assets.get("font_name", fonts.SYSTEM_FONT), 20)
 
         self.upgrade_prices = {}
 
@@ -287,9 +333,72 @@ class GameController:
                               scale_factor=self.scale_factor)
             coin.explosion_chance = 0
 
-        self.coins.append(coin)
+        self._add_coin(coin)
         return coin
 
+    def _coin_kind(self, coin):
+        if isinstance(coin, BronzeCoin):
+            return "bronze"
+        elif isinstance(coin, SilverCoin):
+            return "silver"
+        elif isinstance(coin, GoldCoin):
+            return "gold"
+        return None
+
+    def _add_coin(self, coin) -> None:
+        self.coins.append(coin)
+        kind = self._coin_kind(coin)
+        if kind:
+            self.coin_counts[kind] += 1
+        coin.awake_coins = self.awake_coins
+        coin.is_sleeping = False
+        self.awake_coins[coin] = None
+        if self.physics is not None:
+            self.physics.attach(coin)
+        self.spatial_hash.insert(coin)
+        self._fit_spatial_hash()
+
+    def _remove_coin(self, coin) -> None:
+        self.coins.remove(coin)
+        kind = self._coin_kind(coin)
+        if kind:
+            self.coin_counts[kind] -= 1
+        if self.tornado:
+            self.tornado.captured.pop(coin, None)
+        self.awake_coins.pop(coin, None)
+        coin.awake_coins = None
+        self.static_layer.remove(coin)
+        if self.physics is not None:
+            self.physics.detach(coin)
+        self.spatial_hash.remove(coin)
+        self._fit_spatial_hash()
+
+    def _clear_coins(self) -> None:
+        for coin in self.coins:
+            coin.awake_coins = None
+        self.coins.clear()
+        self.coin_counts = {"bronze": 0, "silver": 0, "gold": 0}
+        self.awake_coins.clear()
+        self.static_layer.clear()
+        if self.tornado:
+            self.tornado.captured.clear()
+        if self.physics is not None:
+            self.physics.clear()
+        self.spatial_hash.clear()
+
+    def _fit_spatial_hash(self) -> None:
+        """Подгоняет размер ячейки под радиусы монет: растет сразу, уменьшается при двукратной разнице"""
+        cell_size = SpatialHash.cell_size_for([c.radius for c in self.coins])
+        if cell_size is None:
+            return
+        current = self.spatial_hash.cell_size
+        if cell_size > current or cell_size * 2 < current:
+            self.spatial_hash.rebuild(cell_size)
+            # Запомненные движком ячейки - от старой сетки: без сброса монета, чей новый индекс
+            # совпал со старым, не переедет в свою ячейку
+            if self.physics is not None:
+                self.physics.reset_cells()
+
     def _get_coin_type_string(self, coin) -> str:
         if isinstance(coin, GoldCoin):
             return "gold"
@@ -442,7 +551,7 @@ class GameController:
                 if len(bronze_coins) >= 5 and self.silver_fusions_count < self.max_silver_fusions:
                     target_x = bronze_coins[0].sprite.center_x
                     target_y = bronze_coins[0].sprite.center_y
-                    for i in range(5): self.coins.remove(bronze_coins[i])
+                    for i in range(5): self._remove_coin(bronze_coins[i])
                     self.spawn_coin("silver", x=target_x, y=target_y)
                     if self.sound_manager.merge_sound: self.sound_manager.merge_sound.play()
                     self.silver_fusions_count += 1
@@ -455,7 +564,7 @@ class GameController:
                 if len(silver_coins) >= 3 and self.gold_fusions_count < self.max_gold_fusions:
                     target_x = silver_coins[0].sprite.center_x
                     target_y = silver_coins[0].sprite.center_y
-                    for i in range(3): self.coins.remove(silver_coins[i])
+                    for i in range(3): self._remove_coin(silver_coins[i])
                     self.spawn_coin("gold", x=target_x, y=target_y)
                     if self.sound_manager.merge_sound: self.sound_manager.merge_sound.play()
                     self.gold_fusions_count += 1
@@ -477,6 +586,8 @@ class GameController:
         width = self.width
         height = self.height
 
+        self._store_previous_positions()
+
         if self.game_over_active:
             self.game_over_timer += dt
             if self.game_over_stage == 0:
@@ -515,8 +626,8 @@ class GameController:
                     pass
 
         if not self.game_over_active:
-            self.coins = [c for c in self.coins if
-                          not (hasattr(c, 'lifetime') and c.lifetime is not None and c.lifetime <= 0)]
+            for c in [c for c in self.coins if c.lifetime is not None and c.lifetime <= 0]:
+                self._remove_coin(c)
 
             if self.auto_flip_level >= 1:
                 self.auto_flip_timer += dt
@@ -537,11 +648,12 @@ class GameController:
             if self.tornado_unlocked:
                 if self.tornado:
                     is_alive = self.tornado.update(dt)
-                    for coin in self.coins:
-                        self.tornado.affect_coin(coin, dt)
+                    self._apply_tornado(dt)
                     if not is_alive:
                         self.tornado = None
                         self.tornado_list.clear()
+                        # Раз в жизнь торнадо - по всем монетам: приземляются все летящие,
+                        # а не только захваченные воронкой (как и до перехода на сетку)
                         for coin in self.coins:
                             coin.tornado_hit = False
                             if coin.is_moving:
@@ -600,12 +712,9 @@ class GameController:
                             self.crater.scale = 1.5
                         else:
                             self.crater = None
-                        for coin in self.coins:
-                            dx = impact_x - coin.sprite.center_x
-                            dy = impact_y - coin.sprite.center_y
-                            dist_sq = dx * dx + dy * dy
-                            if dist_sq < (self.meteor_blast_radius * self.meteor_blast_radius):
-                                coin.hit(dx, dy)
+                        for coin in self.spatial_hash.query_radius((impact_x, impact_y),
+                                                                   self.meteor_blast_radius):
+                            coin.hit(impact_x - coin.center_x, impact_y - coin.center_y)
                         self.meteor = None
                         self.create_explosion_particles(impact_x, impact_y)
                         self.shake_timer = 0.8
@@ -636,162 +745,43 @@ class GameController:
                 self.grabbed_coin.sprite.center_y = self.mouse_y
                 self.grabbed_coin.vx = 0
                 self.grabbed_coin.vy = 0
+                if self.physics is None:
+                    self.spatial_hash.move(self.grabbed_coin)
 
-            self.spatial_hash = SpatialHash(cell_size=int(150 * self.scale_factor))
-            for coin in self.coins:
-                self.spatial_hash.add(coin.sprite)
-
-            for coin in self.coins:
-                if coin is self.grabbed_coin: continue
-                if coin.lifetime is not None and coin.lifetime <= 0: continue
-
-                nearby_sprites = self.spatial_hash.get_sprites_near_point((coin.sprite.center_x, coin.sprite.center_y))
-                nearby_coins = []
-                for spr in nearby_sprites:
-                    if hasattr(spr, 'coin') and spr.coin is not coin:
-                        nearby_coins.append(spr.coin)
-
-                coin.update(dt, width, height, nearby_coins)
-
-                outcome = coin.check_land_event()
-
-                # === ЛОГИКА УСПЕХА (Outcome > 0) ===
-                if outcome > 0:
-                    total_multiplier = 1.0
-                    current_combo = self.combo_value if self.combo_unlocked else 1.0
-                    final_value = int(outcome * total_multiplier * current_combo)
-                    self._add_income(final_value)
-
-                    if self.combo_unlocked and outcome > 0:
-                        self.combo_hit_this_second = True
-                        if self.combo_value < self.combo_limit:
-                            self.combo_value += 0.1
-                            if self.combo_value > self.combo_limit:
-                                self.combo_value = self.combo_limit
-
-                    if isinstance(coin, SilverCoin):
-                        if coin.is_crit:
-                            coin.is_crit = False
-                            text_x = coin.sprite.right + 10
-                            text_y = coin.sprite.top - 10
-                            self.create_floating_text(f"x{self.silver_crit_level}", text_x, text_y,
-                                                      (100, 200, 255, 255), coin)
-                            self.create_particles(coin.sprite.center_x, coin.sprite.center_y, (192, 192, 192, 255),
-                                                  coin)
-
-                    if isinstance(coin, LuckyCoin):
-                        if not coin.sound_played:
-                            current_balance = self.balance.get()
-                            profit = int(current_balance * 4)
-                            self._add_income(profit)
-                            lx = coin.sprite.right + 10
-                            ly = coin.sprite.top - 10
-                            self.create_floating_text("x5", lx, ly, (50, 255, 50, 255), coin)
-
-                            if self.sound_manager.lucky_success and not self.sound_manager.muted:
-                                self.sound_manager.lucky_success.play()
-                            coin.sound_played = True
-
-                    # Успех черной монетки
-                    if isinstance(coin, CursedCoin):
-                        if not coin.sound_played:
-                            current_balance = self.balance.get()
-                            profit = int(current_balance * 99)
-                            self._add_income(profit)
-                            cx = coin.sprite.right + 10
-                            cy = coin.sprite.top - 10
-                            self.create_floating_text("x100", cx, cy, (255, 50, 50, 255), coin)
-
-                            if self.sound_manager.cursed_success and not self.sound_manager.muted:
-                                self.sound_manager.cursed_success.play()
-                            coin.sound_played = True
-
-                # === ЛОГИКА НЕУДАЧИ (Вне зависимости от outcome) ===
-                # Проверяем флаг банкротства только для CursedCoin
-                if isinstance(coin, CursedCoin) and coin.bankruptcy_triggered:
-                    # 1. Обнуляем баланс
-                    self.balance.set(0)
-
-                    # 2. Звук провала
-                    if self.sound_manager.cursed_fail and not self.sound_manager.muted:
-                        self.sound_manager.cursed_fail.play()
-
-                    cx_pos, cy_pos = coin.sprite.center_x, coin.sprite.center_y
-
-                    # 3. Эффекты
-                    self.create_explosion_particles(cx_pos, cy_pos)
-                    for c in self.coins:
-                        if c is not coin:
-                            dx = c.sprite.center_x - cx_pos
-                            dy = c.sprite.center_y - cy_pos
-                            dist_sq = dx * dx + dy * dy
-                            if dist_sq > 0:
-                                dist = math.sqrt(dist_sq)
-                                # Базовая сила взрыва
-                                base_force = 2000.0 * self.scale_factor * (
-                                        1.0 - min(dist / (1000.0 * self.scale_factor), 0.5))
-
-                                nx = dx / dist
-                                ny = dy / dist
-
-                                # === УЧЕТ МАССЫ ===
-                                # Тяжелые монеты улетают недалеко
-                                final_force = base_force / c.mass
-
-                                c.vx += nx * final_force
-                                c.vy += ny * final_force
-                                c.is_moving = True
-                                c._select_flying_animation()
-
-                    self.shake_timer = 1.0
-                    self.shake_intensity = 80.0 * self.scale_factor
-
-                    # Сбрасываем флаг, чтобы не сработало дважды
-                    coin.bankruptcy_triggered = False
-                    coin.sound_played = True
-
-                if coin.needs_toss_sound:
-                    c_type = self._get_coin_type_string(coin)
-                    self.sound_manager.play_toss(c_type)
-                    coin.needs_toss_sound = False
+            self._sync_multiplier_regions()
 
-                if coin.landed:
-                    c_type = self._get_coin_type_string(coin)
-                    self.sound_manager.play_land(c_type)
-                    coin.landed = False
+            if self.physics is not None:
+                self._update_coins_batched(dt, width, height)
+            else:
+                # Обновляются только активные монеты, спящие лежат без затрат.
+                # Сетка постоянная: монета перекладывается только при смене ячейки
+                spatial_hash = self.spatial_hash
+                awake_coins = self.awake_coins
+                for coin in list(awake_coins):
+                    if coin is self.grabbed_coin:
+                        # Захваченная монета стоит под курсором, но докручивается
+                        coin.update(dt, width, height)
+                        continue
+                    if coin.lifetime is not None and coin.lifetime <= 0: continue
+
+                    coin.update(dt, width, height)
+                    spatial_hash.move(coin)
+                    self._handle_coin_events(coin)
+                    if coin.update_sleep():
+                        del awake_coins[coin]
+                        self.static_layer.add(coin)
+
+                self._resolve_coin_collisions()
 
             if self.wisp:
-                self.wisp.update(dt, width, height, self.coins, self.grabbed_coin)
+                self.wisp.update(dt, width, height, self.spatial_hash, self.grabbed_coin)
 
             for zone in self.zones:
                 zone.update(dt, width, height)
 
-            for p in self.particles[:]:
-                decay_speed = p.get('decay_speed', 1.0)
-                p['life'] -= dt * decay_speed
-                if 'linked_coin' in p and p['linked_coin'] is not None:
-                    p['offset_x'] += p['vx'] * dt
-                    p['offset_y'] += p['vy'] * dt
-                    p['x'] = p['linked_coin'].sprite.center_x + p['offset_x']
-                    p['y'] = p['linked_coin'].sprite.center_y + p['offset_y']
-                else:
-                    p['x'] += p['vx'] * dt
-                    p['y'] += p['vy'] * dt
-
-                if p['life'] <= 0:
-                    self.particles.remove(p)
-
-            self.ui.update_grab_state(self.has_gold_coin, self.grab_purchased)
-            self.ui.update_explosion_state(self.gold_explosion_unlocked)
-            self.ui.update_wisp_state(self.wisp is not None)
-            self.ui.update_zone_state(has_zone_2=(self.zone_2 is not None), has_zone_5=(self.zone_5 is not None))
-            self.ui.update_tornado_state(self.tornado_unlocked)
-            self.ui.update_meteor_state(self.meteor_unlocked)
-            self.ui.update_combo_unlocked_state(self.combo_unlocked)
+            self.particles.update(dt)
 
-            # === ВАЖНО: Обновление кнопки престижа каждый кадр ===
-            # Это решает проблему, когда кнопка не обновляется при изменении баланса
-            self._update_prestige_ui()
+            self._push_ui_state()
 
             if self.shake_timer > 0:
                 self.shake_timer -= dt
@@ -827,117 +817,293 @@ class GameController:
                 if ft['life'] <= 0:
                     self.floating_texts.remove(ft)
 
-    def draw(self, surface, screen_height) -> None:
+    def _apply_tornado(self, dt: float) -> None:
+        """Поле торнадо только для монет в радиусе затягивания (запрос к сетке)"""
+        tornado = self.tornado
+        # Расстояние торнадо проверяет сам, поэтому точная проверка в сетке не нужна
+        nearby = self.spatial_hash.query_radius((tornado.center_x, tornado.bottom), tornado.pull_radius,
+                                                exact=False)
+        tornado.affect_coins(nearby, dt, self.physics)
+
+    def _sync_multiplier_regions(self) -> None:
+        """Индекс областей-множителей по их текущим позициям (зоны двигаются, кратер появляется и исчезает)"""
+        regions = list(self.zones)
+        if self.crater:
+            regions.append(self.crater)
+        self.multiplier_regions.sync(regions)
+
+    def _store_previous_positions(self) -> None:
+        """Позиции монет до шага симуляции. Спящие не двигаются, их позиция уже совпадает"""
+        if self.physics is not None:
+            self.physics.store_previous_positions()
+            return
+        for coin in self.awake_coins:
+            coin.prev_x = coin.sprite.center_x
+            coin.prev_y = coin.sprite.center_y
+
+    def _update_coins_batched(self, dt: float, width: int, height: int) -> None:
+        """Физика всех монет одним шагом NumpyCoinPhysics, игровая логика - только для активных"""
+        awake_coins = self.awake_coins
+        for coin in self.physics.step(dt, width, height):
+            if coin.lifetime is not None and coin.lifetime <= 0: continue
+            coin.update_gameplay(dt)
+            self._handle_coin_events(coin)
+            if coin.update_sleep():
+                del awake_coins[coin]
+                self.static_layer.add(coin)
+
+        self.last_contact_count = self.physics.last_contact_count
+
+        # Сетка обновляется только для монет, сменивших ячейку
+        spatial_hash = self.spatial_hash
+        for coin in self.physics.cell_changes(spatial_hash.cell_size):
+            spatial_hash.move(coin)
+
+    def _resolve_coin_collisions(self) -> None:
+        """
+        Столкновения лежачих монет: каждая пара один раз, затем все контакты одним проходом.
+        Пары двух спящих монет не проверяются, задетая спящая монета просыпается.
+        """
+        contacts = self.contacts
+        contacts.clear()
+        spatial_hash = self.spatial_hash
+        Coin.collect_contacts(spatial_hash.candidate_pairs_for(self.awake_coins), contacts)
+        Coin.resolve_contacts(contacts)
+        self.last_contact_count = len(contacts)
+
+        for a, b, _, _, _ in contacts:
+            a.wake()
+            b.wake()
+            spatial_hash.move(a)
+            spatial_hash.move(b)
+
+    def _handle_coin_events(self, coin) -> None:
+        outcome = coin.check_land_event()
+
+        # === ЛОГИКА УСПЕХА (Outcome > 0) ===
+        if outcome > 0:
+            total_multiplier = self.multiplier_regions.multiplier_at(coin.center_x, coin.center_y)
+            current_combo = self.combo_value if self.combo_unlocked else 1.0
+            final_value = int(outcome * total_multiplier * current_combo)
+            self._add_income(final_value)
+
+            if self.combo_unlocked and outcome > 0:
+                self.combo_hit_this_second = True
+                if self.combo_value < self.combo_limit:
+                    self.combo_value += 0.1
+                    if self.combo_value > self.combo_limit:
+                        self.combo_value = self.combo_limit
+
+            if isinstance(coin, SilverCoin):
+                if coin.is_crit:
+                    coin.is_crit = False
+                    text_x = coin.sprite.right + 10
+                    text_y = coin.sprite.top - 10
+                    self.create_floating_text(f"x{self.silver_crit_level}", text_x, text_y,
+                                              (100, 200, 255, 255), coin)
+                    self.create_particles(coin.sprite.center_x, coin.sprite.center_y, (192, 192, 192, 255),
+                                          coin)
+
+            if isinstance(coin, LuckyCoin):
+                if not coin.sound_played:
+                    current_balance = self.balance.get()
+                    profit = int(current_balance * 4)
+                    self._add_income(profit)
+                    lx = coin.sprite.right + 10
+                    ly = coin.sprite.top - 10
+                    self.create_floating_text("x5", lx, ly, (50, 255, 50, 255), coin)
+
+                    if self.sound_manager.lucky_success and not self.sound_manager.muted:
+                        self.sound_manager.lucky_success.play()
+                    coin.sound_played = True
+
+            # Успех черной монетки
+            if isinstance(coin, CursedCoin):
+                if not coin.sound_played:
+                    current_balance = self.balance.get()
+                    profit = int(current_balance * 99)
+                    self._add_income(profit)
+                    cx = coin.sprite.right + 10
+                    cy = coin.sprite.top - 10
+                    self.create_floating_text("x100", cx, cy, (255, 50, 50, 255), coin)
+
+                    if self.sound_manager.cursed_success and not self.sound_manager.muted:
+                        self.sound_manager.cursed_success.play()
+                    coin.sound_played = True
+
+        # === ЛОГИКА НЕУДАЧИ (Вне зависимости от outcome) ===
+        # Проверяем флаг банкротства только для CursedCoin
+        if isinstance(coin, CursedCoin) and coin.bankruptcy_triggered:
+            # 1. Обнуляем баланс
+            self.balance.set(0)
+
+            # 2. Звук провала
+            if self.sound_manager.cursed_fail and not self.sound_manager.muted:
+                self.sound_manager.cursed_fail.play()
+
+            cx_pos, cy_pos = coin.sprite.center_x, coin.sprite.center_y
+
+            # 3. Эффекты
+            self.create_explosion_particles(cx_pos, cy_pos)
+            # Сила взрыва не падает ниже половины, так что он задевает все поле - запрос к сетке не нужен
+            for c in self.coins:
+                if c is not coin:
+                    dx = c.sprite.center_x - cx_pos
+                    dy = c.sprite.center_y - cy_pos
+                    dist_sq = dx * dx + dy * dy
+                    if dist_sq > 0:
+                        dist = math.sqrt(dist_sq)
+                        # Базовая сила взрыва
+                        base_force = 2000.0 * self.scale_factor * (
+                                1.0 - min(dist / (1000.0 * self.scale_factor), 0.5))
+
+                        nx = dx / dist
+                        ny = dy / dist
+
+                        # === УЧЕТ МАССЫ ===
+                        # Тяжелые монеты улетают недалеко
+                        final_force = base_force / c.mass
+
+                        c.wake()
+                        c.vx += nx * final_force
+                        c.vy += ny * final_force
+                        c.is_moving = True
+                        c._select_flying_animation()
+
+            self.shake_timer = 1.0
+            self.shake_intensity = 80.0 * self.scale_factor
+
+            # Сбрасываем флаг, чтобы не сработало дважды
+            coin.bankruptcy_triggered = False
+            coin.sound_played = True
+
+        if coin.needs_toss_sound:
+            c_type = self._get_coin_type_string(coin)
+            self.sound_manager.play_toss(c_type)
+            coin.needs_toss_sound = False
+
+        if coin.landed:
+            c_type = self._get_coin_type_string(coin)
+            self.sound_manager.play_land(c_type)
+            coin.landed = False
+
+    def _submit_static_layer(self, queue, camera) -> None:
+        layer = self.static_layer
+        if layer.size != (int(self.width), int(camera.screen_height)):
+            layer.rebuild([c for c in self.coins if c.is_sleeping], self.width, camera.screen_height)
+        # Проснувшиеся монеты стираются из слоя и рисуются поштучно
+        layer.prune(self.awake_coins)
+        layer.submit(queue, camera)
+
+    def _coin_dirty_rect(self, coin, screen_height, back) -> pygame.Rect:
+        """Область монеты с запасом на поворот и тень, между прошлой и текущей позицией"""
+        sprite = coin.sprite
+        # Диагональ повернутой текстуры, тень летящей монеты смещена на 15 px вниз
+        half = int(max(sprite.width, sprite.height) * 0.75) + 2
+        x = sprite.center_x
+        y = screen_height - sprite.center_y
+        rect = pygame.Rect(int(x) - half, int(y) - half, half * 2, half * 2 + 16)
+        if back > 0:
+            px = x + (coin.prev_x - sprite.center_x) * back
+            py = y - (coin.prev_y - sprite.center_y) * back
+            rect.union_ip(pygame.Rect(int(px) - half, int(py) - half, half * 2, half * 2 + 16))
+        return rect
+
+    def get_dirty_rects(self, screen_height, alpha: float = 1.0):
+        """
+        Прямоугольники, которые draw изменит в этом кадре (режим грязных областей).
+        None - нужна полная перерисовка: тряска двигает все поле, концовка затемняет весь экран.
+        """
+        if self.shake_timer > 0 or self.game_over_active:
+            return None
+        layer = self.static_layer
+        if layer.size != (int(self.width), int(screen_height)):
+            return None
+
+        layer.prune(self.awake_coins)
+        rects = layer.pop_changes()
+
+        back = 1.0 - alpha
+        for coin in self.awake_coins:
+            rects.append(self._coin_dirty_rect(coin, screen_height, back))
+
+        for zone in self.zones:
+            rects.append(pygame.Rect(int(zone.left), int(screen_height - zone.top),
+                                     int(zone.width) + 2, int(zone.height) + 2))
+
+        sprites = self.wisp_list + self.explosions + self.tornado_list
+        for sprite in (self.beetle, self.crater, self.meteor):
+            if sprite:
+                sprites.append(sprite)
+        for sprite in sprites:
+            rects.append(sprite.screen_rect(screen_height))
+
+        # Частицы - через камеру. Тряска для кадра выбирается в draw, уже после этого вызова:
+        # запас - текущее смещение камеры плюс амплитуда следующего
+        camera = self.camera
+        camera.screen_height = screen_height
+        pad = max(abs(camera.shake_x), abs(camera.shake_y))
+        if self.shake_timer > 0:
+            pad += self.shake_intensity
+        rects.extend(self.particles.dirty_rects(camera, int(math.ceil(pad))))
+
+        if self.combo_unlocked and self.combo_value > 1.0:
+            # Текст комбо пульсирует и качается - берем область с запасом
+            font_sz = int(40 * self.scale_factor * 1.05)
+            combo_x = 60 * self.scale_factor
+            combo_top = screen_height - (self.height - (60 * self.scale_factor)) - font_sz
+            rects.append(pygame.Rect(int(combo_x) - 10, int(combo_top) - 10, font_sz * 5, font_sz * 2 + 20))
+
+        for ft in self.floating_texts:
+            w, h = self.game_font.size(ft['text'])
+            rects.append(pygame.Rect(int(ft['x']) - 1, int(screen_height - ft['y']) - 1, w + 2, h + 2))
+
+        return rects
+
+    def draw(self, surface, screen_height, alpha: float = 1.0) -> None:
+        """alpha - доля шага симуляции для интерполяции монет (1.0 - текущее состояние)"""
         # --- SHAKE LOGIC ---
+        # Тряска - смещение камеры, координаты объектов не меняются
         if self.shake_timer > 0:
             sx = random.uniform(-self.shake_intensity, self.shake_intensity)
             sy = random.uniform(-self.shake_intensity, self.shake_intensity)
         else:
             sx = 0.0
             sy = 0.0
+        camera = self.camera
+        camera.screen_height = screen_height
+        camera.set_shake(sx, sy)
+
+        queue = self.render_queue
 
         # --- DRAW ZONES ---
         for zone in self.zones:
-            # Apply shake temporarily for logic coordinates if needed,
-            # but zone.draw uses screen coordinates, so we must pass shake manually or handle inside.
-            # Simplest: zone.x/y are logic coords. zone.draw converts to screen.
-            # We pass shake offsets to draw method? Or modify zone.x/y?
-            # Modifying zone.x/y is dangerous (physics).
-            # Let's pass shake to draw if we implemented it, or just ignore shake for zones for simplicity,
-            # OR create a temporary offset.
-            # Actually, in the original code:
-            # zone.x += sx; zone.draw(); zone.x -= sx
-            # We will do the same but via arguments.
-            zone.x += sx
-            zone.y += sy
-            zone.draw(surface, screen_height)
-            zone.x -= sx
-            zone.y -= sy
-
-        # --- DRAW BEETLE ---
-        if self.beetle:
-            self.beetle.center_x += sx
-            self.beetle.center_y += sy
-            self.beetle.draw(surface, screen_height)
-            self.beetle.center_x -= sx
-            self.beetle.center_y -= sy
-
-        # --- DRAW CRATER ---
-        if self.crater:
-            self.crater.center_x += sx
-            self.crater.center_y += sy
-            self.crater.draw(surface, screen_height)
-            self.crater.center_x -= sx
-            self.crater.center_y -= sy
-
-        # --- DRAW COINS (Static then Moving for layering) ---
-        for coin in self.coins:
-            if not coin.is_moving:
-                coin.sprite.center_x += sx
-                coin.sprite.center_y += sy
-                coin.draw(surface, screen_height)
-                coin.sprite.center_x -= sx
-                coin.sprite.center_y -= sy
-
-        for coin in self.coins:
-            if coin.is_moving:
-                coin.sprite.center_x += sx
-                coin.sprite.center_y += sy
-                coin.draw(surface, screen_height)
-                coin.sprite.center_x -= sx
-                coin.sprite.center_y -= sy
-
-        # --- DRAW WISP ---
-        for wisp in self.wisp_list:
-            wisp.center_x += sx
-            wisp.center_y += sy
-            wisp.draw(surface, screen_height)
-            wisp.center_x -= sx
-            wisp.center_y -= sy
-
-        # --- DRAW EXPLOSIONS ---
-        for expl in self.explosions:
-            expl.center_x += sx
-            expl.center_y += sy
-            expl.draw(surface, screen_height)
-            expl.center_x -= sx
-            expl.center_y -= sy
-
-        # --- DRAW TORNADO ---
-        for tornado in self.tornado_list:
-            tornado.center_x += sx
-            tornado.center_y += sy
-            tornado.draw(surface, screen_height)
-            tornado.center_x -= sx
-            tornado.center_y -= sy
-
-        # --- DRAW METEOR ---
+            zone.submit(queue, camera, queue.LAYER_ZONES)
+
+        # --- DRAW BEETLE / CRATER ---
+        for sprite in (self.beetle, self.crater):
+            if sprite:
+                sprite.submit(queue, camera, queue.LAYER_GROUND)
+
+        # --- DRAW COINS ---
+        # Спящие монеты - одним блитом запеченного слоя, остальные (активные) - поштучно.
+        # Лежащие под летящими - за счет слоев очереди, второй проход не нужен
+        self._submit_static_layer(queue, camera)
+        back = 1.0 - alpha
+        for coin in self.awake_coins:
+            coin.submit(queue, camera, back)
+
+        # --- DRAW WISP / EXPLOSIONS / TORNADO / METEOR ---
+        effects = self.wisp_list + self.explosions + self.tornado_list
         if self.meteor:
-            self.meteor.center_x += sx
-            self.meteor.center_y += sy
-            self.meteor.draw(surface, screen_height)
-            self.meteor.center_x -= sx
-            self.meteor.center_y -= sy
+            effects.append(self.meteor)
+        for sprite in effects:
+            sprite.submit(queue, camera, queue.LAYER_EFFECTS)
 
         # --- DRAW PARTICLES ---
-        for p in self.particles:
-            life_ratio = p['life'] / 1.0
-            alpha = min(255, int(255 * life_ratio))
-            if alpha < 0: alpha = 0
-            current_color = (p['color'][0], p['color'][1], p['color'][2], alpha)
-
-            # Logic coords -> Screen coords
-            # Pygame circle takes center (x, y)
-            draw_x = int(p['x'] + sx)
-            draw_y = int(screen_height - (p['y'] + sy))
-
-            # Note: Pygame draw.circle doesn't support alpha on the main surface directly
-            # efficiently without a temp surface. For performance with many particles,
-            # we usually drop alpha or use a pre-rendered surface.
-            # For simplicity here, we draw solid or ignore alpha if it's complex.
-            # Let's try to support alpha via a temp surface if needed, or just solid color for now.
-            # Solid is safer for performance.
-            pygame.draw.circle(surface, current_color[:3], (draw_x, draw_y), int(p['size']))
+        # Мягкие кружки из атласа с настоящим затуханием, вся пачка - одним blits
+        if len(self.particles):
+            queue.submit_batch(self.particles.blits(camera, self.particle_atlas), queue.LAYER_PARTICLES)
 
         # --- DRAW COMBO ---
         if self.combo_unlocked and self.combo_value > 1.0:
@@ -946,15 +1112,8 @@ class GameController:
             pulse = 1.0 + 0.05 * math.sin(time.time() * 5)
             font_sz = int(40 * self.scale_factor * pulse)
 
-            # Reload font with new size (slow but dynamic like original)
-            # Optimization: Cache fonts? For now, simple reload.
-            # Ideally use a font manager.
-            try:
-                combo_font = pygame.font.Font(self.assets.ui_assets.get("font_name"),
-                                              font_sz) if self.assets.ui_assets.get(
-                    "font_name") != "Arial" else pygame.font.SysFont("Arial", font_sz)
-            except:
-                combo_font = pygame.font.SysFont("Arial", font_sz)
+            # Пульсация квантуется до шага 2 px: на все кадры хватает пары закэшированных размеров
+            combo_font = fonts.get_quantized(self.assets.ui_assets.get("font_name"), font_sz)
 
             combo_int = int(self.combo_value)
             color_palette = [
@@ -971,18 +1130,20 @@ class GameController:
                 wobble_y = math.cos(self.combo_stagnation_angle * 2) * 5
                 if int(self.combo_stagnation_angle * 2) % 2 == 0:
                     txt_color = (255, 0, 0, 255)
-                draw_pos_x = combo_x + wobble_x + sx
-                draw_pos_y = combo_y + wobble_y + sy
+                draw_pos_x = combo_x + wobble_x
+                draw_pos_y = combo_y + wobble_y
             else:
-                draw_pos_x = combo_x + sx
-                draw_pos_y = combo_y + sy
+                draw_pos_x = combo_x
+                draw_pos_y = combo_y
 
-            text_surf = combo_font.render(f"x{self.combo_value:.1f}", True, txt_color[:3])
-            # Logic Y -> Screen Y
+            # Logic Y -> Screen Y через камеру (тряска - ее смещение)
             # text_pos logic is left-anchor? Original: anchor_x="left".
             # Pygame blit is top-left.
-            screen_y = screen_height - draw_pos_y - (font_sz / 2)  # Rough centering vertically
-            surface.blit(text_surf, (draw_pos_x, screen_y))
+            screen_x, screen_y = camera.to_screen(draw_pos_x, draw_pos_y)
+            screen_y -= font_sz / 2  # Rough centering vertically
+            # Значение меняется почти каждый кадр: собираем из атласа символов
+            queue.submit_batch(glyphs.blits(combo_font, f"x{self.combo_value:.1f}", (screen_x, screen_y), txt_color),
+                               queue.LAYER_TEXT)
 
         # --- DRAW FLOATING TEXTS ---
         for ft in self.floating_texts:
@@ -992,44 +1153,44 @@ class GameController:
             color = (r, g, b, alpha)
 
             ft_font = self.game_font  # Use default game font for simplicity
-            text_surf = ft_font.render(ft['text'], True, color[:3])
-            text_surf.set_alpha(alpha)
 
             # ft['x'], ft['y'] are logic coordinates
             screen_x = ft['x']
             screen_y = screen_height - ft['y']
 
-            surface.blit(text_surf, (screen_x, screen_y))
+            # Числа ("+1.2K", "x5") - из атласа символов, прозрачность квантуется в нем же
+            queue.submit_batch(glyphs.blits(ft_font, ft['text'], (screen_x, screen_y), color, alpha),
+                               queue.LAYER_TEXT)
 
         # --- DRAW GAME OVER ---
         if self.game_over_active:
             # Transparent overlay
-            overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, int(self.game_over_alpha)))
-            surface.blit(overlay, (0, 0))
+            # Черный слой создается один раз (и при смене размера поля), плавность - через set_alpha
+            overlay = self._game_over_overlay
+            if overlay is None or overlay.get_size() != (int(self.width), int(self.height)):
+                overlay = pygame.Surface((int(self.width), int(self.height)))
+                overlay.fill((0, 0, 0))
+                self._game_over_overlay = overlay
+            overlay.set_alpha(int(self.game_over_alpha))
+            queue.submit(overlay, (0, 0), queue.LAYER_OVERLAY)
 
             text_alpha = int(self.game_over_text_alpha)
             if text_alpha > 255: text_alpha = 255
             if text_alpha < 0: text_alpha = 0
 
             go_font_size = int(60 * self.scale_factor)
-            try:
-                go_font = pygame.font.Font(self.assets.ui_assets.get("font_name"),
-                                           go_font_size) if self.assets.ui_assets.get(
-                    "font_name") != "Arial" else pygame.font.SysFont("Arial", go_font_size)
-            except:
-                go_font = pygame.font.SysFont("Arial", go_font_size)
+            go_font = fonts.get(self.assets.ui_assets.get("font_name"), go_font_size)
 
             if self.game_over_stage >= 1 and self.game_over_stage <= 2:
-                txt = go_font.render("Конец?", True, (255, 255, 255))
-                txt.set_alpha(text_alpha)
+                txt = texts.render(go_font, "Конец?", alpha=text_alpha)
                 rect = txt.get_rect(center=(self.width / 2, self.height / 2))
-                surface.blit(txt, rect)
+                queue.submit(txt, rect, queue.LAYER_OVERLAY)
             elif self.game_over_stage >= 3:
-                txt = go_font.render("Спасибо за игру!", True, (255, 255, 255))
-                txt.set_alpha(text_alpha)
+                txt = texts.render(go_font, "Спасибо за игру!", alpha=text_alpha)
                 rect = txt.get_rect(center=(self.width / 2, self.height / 2))
-                surface.blit(txt, rect)
+                queue.submit(txt, rect, queue.LAYER_OVERLAY)
+
+        queue.flush(surface)
 
     def on_mouse_press(self, x: int, y: int, button: int) -> None:
         if self.game_over_active: return
@@ -1046,19 +1207,19 @@ class GameController:
         if button == pygame.BUTTON_LEFT:
             if x < self.width:
                 clicked_coin = False
-                for coin in self.coins:
+                # Проверяются только монеты под курсором (запрос к сетке), а не все поле
+                for coin in self.spatial_hash.query_point((x, y)):
                     if not coin.is_moving and coin is not self.grabbed_coin:
-                        dx = x - coin.sprite.center_x
-                        dy = y - coin.sprite.center_y
-                        if dx * dx + dy * dy < (coin.radius * coin.radius):
-                            is_special_used = isinstance(coin, (LuckyCoin, CursedCoin)) and getattr(coin, 'is_used',
-                                                                                                    False)
-                            if not is_special_used:
-                                coin.hit(dx, dy)
-                                c_type = self._get_coin_type_string(coin)
-                                self.sound_manager.play_toss(c_type)
-                                clicked_coin = True
-                                break
+                        dx = x - coin.center_x
+                        dy = y - coin.center_y
+                        is_special_used = isinstance(coin, (LuckyCoin, CursedCoin)) and getattr(coin, 'is_used',
+                                                                                                False)
+                        if not is_special_used:
+                            coin.hit(dx, dy)
+                            c_type = self._get_coin_type_string(coin)
+                            self.sound_manager.play_toss(c_type)
+                            clicked_coin = True
+                            break
                 if not clicked_coin and self.beetle and self.beetle.can_be_clicked:
                     dx = x - self.beetle.center_x
                     dy = y - self.beetle.center_y
@@ -1077,40 +1238,39 @@ class GameController:
 
     def on_mouse_press_rmb(self, x: int, y: int) -> None:
         if not self.grab_purchased: return
-        for coin in self.coins:
+        for coin in self.spatial_hash.query_point((x, y)):
             if isinstance(coin, GoldCoin) and not coin.is_moving:
-                dx = x - coin.sprite.center_x
-                dy = y - coin.sprite.center_y
-                if dx * dx + dy * dy < (coin.radius * coin.radius):
-                    self.grabbed_coin = coin
+                self.grabbed_coin = coin
+                coin.wake()
 
-                    # 1. Отключаем торнадо
-                    coin.tornado_hit = False
+                # 1. Отключаем торнадо
+                coin.tornado_hit = False
 
-                    # 2. Переводим в режим "на земле"
-                    coin.is_moving = False
-                    coin.is_grabbed = True
-                    coin.vx = 0
-                    coin.vy = 0
+                # 2. Переводим в режим "на земле"
+                coin.is_moving = False
+                coin.is_grabbed = True
+                coin.vx = 0
+                coin.vy = 0
 
-                    # 3. Восстанавливаем текстуру и размер
-                    face_key = coin.current_face if hasattr(coin, 'current_face') else "heads"
-                    correct_texture = coin.sprites.get(face_key, coin.sprites["heads"])
-                    coin.sprite.texture = correct_texture
-                    coin.sprite.scale = coin.scale
+                # 3. Восстанавливаем текстуру и размер
+                face_key = coin.current_face if hasattr(coin, 'current_face') else "heads"
+                correct_texture = coin.sprites.get(face_key, coin.sprites["heads"])
+                coin.sprite.texture = correct_texture
+                coin.sprite.scale = coin.scale
 
-                    coin.anim = []
+                coin.anim = []
 
-                    self.mouse_x = x
-                    self.mouse_y = y
-                    self.mouse_velocity_history = []
-                    break
+                self.mouse_x = x
+                self.mouse_y = y
+                self.mouse_velocity_history = []
+                break
 
     def on_mouse_release_rmb(self, x: int, y: int) -> None:
         if not self.grabbed_coin: return
         coin = self.grabbed_coin
         self.grabbed_coin = None
         coin.is_grabbed = False
+        coin.wake()
 
         avg_dx = 0
         avg_dy = 0
@@ -1153,28 +1313,24 @@ class GameController:
         base_speed = 100.0 * self.scale_factor
         speed_var = 100.0 * self.scale_factor
 
+        vx, vy, sizes, colors, offset_x, offset_y = [], [], [], [], [], []
+        p_radius = coin.radius * 0.9 if coin is not None else 0.0
         for _ in range(30):
             gray = random.randint(80, 200)
-            base_color = (gray, gray, gray)
             angle = random.uniform(0, 6.28)
             speed = random.uniform(base_speed, base_speed + speed_var)
-            size = random.uniform(base_size, base_size + size_var)
-
-            particle_data = {
-                'x': cx, 'y': cy,
-                'vx': math.cos(angle) * speed, 'vy': math.sin(angle) * speed,
-                'life': 1.0,
-                'color': base_color, 'size': size
-            }
-            if coin is not None:
-                particle_data['linked_coin'] = coin
-                particle_data['decay_speed'] = 2.0
-                p_radius = coin.radius
-                particle_data['offset_x'] = math.cos(angle) * (p_radius * 0.9)
-                particle_data['offset_y'] = math.sin(angle) * (p_radius * 0.9)
-            else:
-                particle_data['decay_speed'] = 1.0
-            self.particles.append(particle_data)
+            vx.append(math.cos(angle) * speed)
+            vy.append(math.sin(angle) * speed)
+            sizes.append(random.uniform(base_size, base_size + size_var))
+            colors.append((gray, gray, gray))
+            # Частицы монеты стартуют с ее края и летят вместе с ней
+            offset_x.append(math.cos(angle) * p_radius)
+            offset_y.append(math.sin(angle) * p_radius)
+        if coin is not None:
+            self.particles.emit(cx, cy, vx, vy, sizes, colors, life=1.0, decay=2.0, coin=coin,
+                                offset_x=offset_x, offset_y=offset_y)
+        else:
+            self.particles.emit(cx, cy, vx, vy, sizes, colors, life=1.0, decay=1.0)
 
     def get_save_path(self):
         import sys
@@ -1223,7 +1379,11 @@ class GameController:
             "tornado_cooldown_level": self.tornado_cooldown_level,
             "combo_unlocked": self.combo_unlocked,
             "combo_limit_level": self.combo_limit_level,
-            "combo_value": self.combo_value
+            "combo_value": self.combo_value,
+            # Для офлайн-прогресса
+            "saved_at": time.time(),
+            "beetle_active": self.beetle is not None,
+            "beetle_respawn_left": max(0.0, self.beetle_respawn_interval - self.beetle_respawn_timer)
         }
 
         # Сохранение Виспа
@@ -1273,7 +1433,7 @@ class GameController:
         if not data: return False
 
         try:
-            self.balance._value = data["balance"]
+            self.balance.set(data["balance"])
             if "prestige" in data:
                 self.prestige.load_data(data["prestige"])
             else:
@@ -1359,7 +1519,7 @@ class GameController:
                 self.zones.append(z)
 
             # Загрузка Монет
-            self.coins.clear()
+            self._clear_coins()
             for c_data in data["coins"]:
                 c_type = c_data["type"]
                 coin_value = 1
@@ -1399,7 +1559,7 @@ class GameController:
                 else:
                     c.land()
                     c.landed = False
-                self.coins.append(c)
+                self._add_coin(c)
 
             self._sync_ui_prices()
 
@@ -1422,13 +1582,52 @@ class GameController:
             self.ui.update_wisp_state(self.wisp is not None)
             self.ui.update_meteor_state(self.meteor_unlocked)
             self.ui.update_zone_state(has_zone_2=(self.zone_2 is not None), has_zone_5=(self.zone_5 is not None))
-            return True
         except Exception as e:
             print(f"DEBUG: Error loading game: {e}")
             return False
 
+        # Сохранение уже применено: ошибка в расчете офлайн-дохода не делает его "битым"
+        try:
+            self._apply_offline_progress(data)
+        except Exception as e:
+            self.last_offline_report = None
+            print(f"DEBUG: Error applying offline progress: {e}")
+        return True
+
+    def _apply_offline_progress(self, data: dict) -> None:
+        """Начисляет доход автофлипа за время между save_game и загрузкой"""
+        self.last_offline_report = None
+        saved_at = data.get("saved_at")
+        if saved_at is None: return
+
+        elapsed = time.time() - saved_at
+        if data.get("beetle_active", False):
+            beetle_delay = 0.0
+        else:
+            beetle_delay = data.get("beetle_respawn_left", self.beetle_respawn_interval)
+
+        flip_coins = []
+        for coin in self.coins:
+            if isinstance(coin, (LuckyCoin, CursedCoin)): continue
+            crit_chance = coin.crit_chance if isinstance(coin, SilverCoin) else None
+            flip_coins.append((coin.value, crit_chance))
+
+        report = self.offline_progress.compute(
+            elapsed, flip_coins, self.auto_flip_level, self.combo_unlocked, self.combo_limit,
+            self.prestige.multiplier, beetle_delay=beetle_delay, stochastic=True)
+        self.last_offline_report = report
+        if report["income"] <= 0: return
+
+        self.prestige.add_income(report["income"])
+        self.balance.add(report["kept"])
+        if report["stolen"] > 0:
+            self.beetle_stash += report["stolen"]
+            # Жук успел прийти, пока игрока не было
+            if not self.beetle:
+                self.spawn_beetle()
+
     def reset_game(self, hard_reset=False) -> bool:
-        self.coins.clear()
+        self._clear_coins()
         self.particles.clear()
         self.zones.clear()
         self.zone_2 = None
@@ -1473,7 +1672,7 @@ class GameController:
         self.silver_fusions_count = 0
         self.gold_fusions_count = 0
 
-        self.balance._value = 0
+        self.balance.set(0)
 
         self.beetle_respawn_interval = random.uniform(240.0, 300.0)
         self.beetle_respawn_timer = 0.0
@@ -1492,6 +1691,7 @@ class GameController:
         self._sync_ui_prices()
 
         self.ui.reset_all_buttons()
+        self._ui_state = None
         self._update_prestige_ui()
 
         self.confirmation_dialog = None
@@ -1561,19 +1761,16 @@ class GameController:
         base_speed = 100.0 * self.scale_factor
         speed_var = 300.0 * self.scale_factor
 
+        vx, vy, sizes, colors = [], [], [], []
         for _ in range(50):
-            red = 255
             green = random.randint(0, 200)
-            color = (red, green, 0, 255)
             angle = random.uniform(0, 6.28)
             speed = random.uniform(base_speed, base_speed + speed_var)
-            size = random.uniform(base_size, base_size + size_var)
-            particle_data = {
-                'x': cx, 'y': cy,
-                'vx': math.cos(angle) * speed, 'vy': math.sin(angle) * speed,
-                'life': 1.0, 'color': color, 'size': size, 'decay_speed': 2.0
-            }
-            self.particles.append(particle_data)
+            vx.append(math.cos(angle) * speed)
+            vy.append(math.sin(angle) * speed)
+            sizes.append(random.uniform(base_size, base_size + size_var))
+            colors.append((255, green, 0))
+        self.particles.emit(cx, cy, vx, vy, sizes, colors, life=1.0, decay=2.0)
 
     def spawn_tornado(self) -> None:
         margin = self.width / 4
@@ -1602,13 +1799,8 @@ class GameController:
             "gold_fusions": self.gold_fusions_count,
             "max_gold_fusions": self.max_gold_fusions
         }
-        for coin in self.coins:
-            if isinstance(coin, BronzeCoin):
-                counts["bronze"] += 1
-            elif isinstance(coin, SilverCoin):
-                counts["silver"] += 1
-            elif isinstance(coin, GoldCoin):
-                counts["gold"] += 1
+        # Счетчики ведутся в _add_coin / _remove_coin - без прохода по всем монетам
+        counts.update(self.coin_counts)
         return counts
 
     def create_fusion_flash(self, cx: float, cy: float, fusion_type: str) -> None:
@@ -1624,16 +1816,14 @@ class GameController:
         base_speed = 400.0 * self.scale_factor
         speed_var = 400.0 * self.scale_factor
 
+        vx, vy, sizes = [], [], []
         for _ in range(50):
             angle = random.uniform(0, 6.28)
             speed = random.uniform(base_speed, base_speed + speed_var)
-            size = random.uniform(base_size, base_size + size_var)
-            particle_data = {
-                'x': cx, 'y': cy,
-                'vx': math.cos(angle) * speed, 'vy': math.sin(angle) * speed,
-                'life': 1, 'color': color, 'size': size, 'decay_speed': 2.5
-            }
-            self.particles.append(particle_data)
+            vx.append(math.cos(angle) * speed)
+            vy.append(math.sin(angle) * speed)
+            sizes.append(random.uniform(base_size, base_size + size_var))
+        self.particles.emit(cx, cy, vx, vy, sizes, [color] * 50, life=1.0, decay=2.5)
 
     def _get_coin_color(self, coin):
         if isinstance(coin, LuckyCoin):
@@ -1665,22 +1855,16 @@ class GameController:
         speed_var = 40.0 * self.scale_factor
 
         for _ in range(2):
-            red_comp = 255
             green_comp = random.randint(0, 100)
-            color = (red_comp, green_comp, 0, 200)
             angle = random.uniform(4.5, 5.0)
             speed = random.uniform(base_speed, base_speed + speed_var)
             size = random.uniform(base_size, base_size + size_var)
             offset_x = random.uniform(-40, 40)
             offset_y = random.uniform(-10, 10)
-            particle_data = {
-                'x': combo_x + spawn_center_offset + offset_x,
-                'y': combo_y + offset_y,
-                'vx': math.cos(angle) * speed,
-                'vy': math.sin(angle) * speed,
-                'life': 0.8, 'color': color, 'size': size, 'decay_speed': 2.0
-            }
-            self.particles.append(particle_data)
+            # Каждая искра из своей точки - пачка из одной частицы
+            self.particles.emit(combo_x + spawn_center_offset + offset_x, combo_y + offset_y,
+                                [math.cos(angle) * speed], [math.sin(angle) * speed], [size],
+                                [(255, green_comp, 0)], life=0.8, decay=2.0)
 
     def _add_income(self, amount: int) -> None:
         if amount <= 0: return
@@ -1734,6 +1918,33 @@ class GameController:
         gain = self.prestige.calculate_gain()
         # Принудительно обновляем кнопку в UI
         self.ui.update_prestige_button(gain, self.prestige.points, self.prestige.multiplier)
+        self._ui_prestige_gain = gain
+
+    def _push_ui_state(self) -> None:
+        """
+        Флаги, счетчики монет и прирост престижа уходят в UI только при изменении,
+        а не каждый кадр (UI пересчитывает лишь зависящие от них кнопки).
+        """
+        state = (self.has_gold_coin, self.grab_purchased, self.gold_explosion_unlocked, self.wisp is not None,
+                 self.zone_2 is not None, self.zone_5 is not None, self.tornado_unlocked, self.meteor_unlocked,
+                 self.combo_unlocked)
+        if state != self._ui_state:
+            self._ui_state = state
+            self.ui.update_grab_state(self.has_gold_coin, self.grab_purchased)
+            self.ui.update_explosion_state(self.gold_explosion_unlocked)
+            self.ui.update_wisp_state(self.wisp is not None)
+            self.ui.update_zone_state(has_zone_2=(self.zone_2 is not None), has_zone_5=(self.zone_5 is not None))
+            self.ui.update_tornado_state(self.tornado_unlocked)
+            self.ui.update_meteor_state(self.meteor_unlocked)
+            self.ui.update_combo_unlocked_state(self.combo_unlocked)
+
+        counts = (self.coin_counts["bronze"], self.coin_counts["silver"])
+        if counts != self._ui_coin_counts:
+            self._ui_coin_counts = counts
+            self.ui.set_coin_counts(self.get_coin_counts())
+
+        if self.prestige.calculate_gain() != self._ui_prestige_gain:
+            self._update_prestige_ui()
 
     def perform_prestige(self):
         if self.prestige.can_prestige():
@@ -1744,7 +1955,7 @@ class GameController:
             self.prestige.reset_run_stats()
 
             # Полный сброс игры
-            self.coins.clear()
+            self._clear_coins()
             self.particles.clear()
             self.zones.clear()
             self.zone_2 = None
@@ -1785,12 +1996,13 @@ class GameController:
             self.combo_limit = self.combo_base_limit
             self.silver_fusions_count = 0
             self.gold_fusions_count = 0
-            self.balance._value = 0
+            self.balance.set(0)
             self.upgrade_prices = {}  # Сброс цен
 
             self.spawn_coin("bronze")
             self._sync_ui_prices()
             self.ui.reset_all_buttons()
+            self._ui_state = None
 
             # Принудительно обновляем UI престижа сразу после сброса
             self._update_prestige_ui()
@@ -0,0 +1,166 @@
+"""
+Headless-режим: GameController без окна, звука и интерфейса.
+Нужен для бенчмарков и массовой симуляции на машине без дисплея -
+update(dt) крутится так быстро, как позволяет процессор, draw не вызывается.
+
+Запуск из корня проекта:
+    python -m logic.controllers.headless [секунд игры] [бэкенд] [монет]
+"""
+import os
+import sys
+import json
+import time
+
+# До инициализации SDL: окно и звуковая карта не нужны
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from logic.assets.sound_manager import SoundManager
+from logic.controllers.game_controller import GameController
+from logic.world.coin_physics import choose_backend
+
+# Размер поля как в main.py (VIRTUAL_WIDTH - PANEL_WIDTH, VIRTUAL_HEIGHT)
+WORLD_WIDTH = 1420
+WORLD_HEIGHT = 1080
+SIM_DT = 1.0 / 60.0
+
+
+class NullUI:
+    """Интерфейс-заглушка: любой вызов (update_button, mark_purchased, ...) ничего не делает"""
+
+    def __getattr__(self, name):
+        return self._noop
+
+    @staticmethod
+    def _noop(*args, **kwargs):
+        return None
+
+
+class NullSoundManager(SoundManager):
+    """Звук-заглушка: все звуки None, mute включен навсегда, микшер не нужен"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.muted = True
+
+    def load_all(self) -> None:
+        pass
+
+    def toggle_mute(self):
+        pass
+
+
+class MemoryStorage:
+    """Сохранение в памяти вместо save.json / localStorage (тот же интерфейс, что у BrowserStorage)"""
+
+    def __init__(self, data=None):
+        self._json = json.dumps(data) if data is not None else None
+
+    def save(self, data_dict):
+        self._json = json.dumps(data_dict, ensure_ascii=True)
+
+    def load(self):
+        if self._json is None:
+            return None
+        return json.loads(self._json)
+
+    def delete(self):
+        self._json = None
+
+
+class StubAssetManager:
+    """
+    Легкие текстуры вместо AssetManager.load_all: без файлов и convert_alpha().
+    Размеры и число кадров как у настоящих спрайтов - от них зависят хитбоксы и длительность полета.
+    """
+
+    COIN_SIZE = 100
+    COIN_FRAMES = 7
+    COIN_DIRECTIONS = ("up", "down", "left", "right", "up_left", "up_right", "down_left", "down_right")
+
+    def __init__(self) -> None:
+        self.bronze_coin_sprites = self._coin_sprites()
+        self.silver_coin_sprites = self._coin_sprites()
+        self.gold_coin_sprites = self._coin_sprites()
+        self.lucky_coin_sprites = self._coin_sprites()
+        self.cursed_coin_sprites = self._coin_sprites()
+
+        self.wisp_sprites = [self._surface(192)] * 20
+        self.beetle_sprites = {d: [self._surface(236, 237)] * 5 for d in ("up", "down", "left", "right")}
+        self.meteor_textures = [self._surface(64)] * 3
+        self.explosion_textures = [self._surface(96)] * 12
+        self.tornado_textures = [self._surface(64)] * 4
+        self.crater_texture = self._surface(192)
+
+        self.ui_assets = {
+            "btn_normal": None,
+            "btn_pressed": None,
+            "btn_disabled": None,
+            "font_name": "Arial"
+        }
+
+    @staticmethod
+    def _surface(width: int, height: int = None) -> pygame.Surface:
+        return pygame.Surface((width, height or width), pygame.SRCALPHA)
+
+    def _coin_sprites(self) -> dict:
+        # Свой кадр на направление: Coin сравнивает первые кадры при смене анимации
+        sprites = {d: [self._surface(self.COIN_SIZE)] * self.COIN_FRAMES for d in self.COIN_DIRECTIONS}
+        sprites["heads"] = self._surface(self.COIN_SIZE)
+        sprites["tails"] = self._surface(self.COIN_SIZE)
+        return sprites
+
+    def load_all(self) -> None:
+        pass
+
+    def load_ui_assets(self) -> None:
+        pass
+
+    def is_loaded(self) -> bool:
+        return True
+
+
+def create_headless_game(physics_backend: str = "auto", world_width: int = WORLD_WIDTH,
+                         world_height: int = WORLD_HEIGHT, scale_factor: float = 1.0,
+                         storage=None) -> GameController:
+    """GameController с заглушками UI, звука и ассетов. Без storage игра начинается с нуля"""
+    # Шрифтам нужен только SDL_ttf, окно не создается
+    if not pygame.font.get_init():
+        pygame.font.init()
+
+    return GameController(StubAssetManager(), NullUI(), NullSoundManager(),
+                          world_width=world_width, world_height=world_height, scale_factor=scale_factor,
+                          physics_backend=physics_backend,
+                          storage=storage if storage is not None else MemoryStorage())
+
+
+def run_headless(game: GameController, seconds: float, dt: float = SIM_DT) -> int:
+    """Шагает симуляцию seconds игровых секунд без отрисовки. Возвращает число шагов"""
+    steps = int(round(seconds / dt))
+    for _ in range(steps):
+        game.update(dt)
+    return steps
+
+
+if __name__ == "__main__":
+    sim_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 60.0
+    backend = sys.argv[2] if len(sys.argv) > 2 else "auto"
+    coin_count = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+
+    # "auto" решается по числу монет замера, а не по игровому лимиту
+    game = create_headless_game(physics_backend=choose_backend(backend, coin_count))
+    game.auto_flip_level = 5
+    # Харнесс меряет и большие количества: лимит игры не должен молча обрезать (и вешать) спавн
+    game.max_coins = max(game.max_coins, coin_count)
+    while len(game.coins) < coin_count:
+        if game.spawn_coin("bronze") is None:
+            raise RuntimeError(f"spawn_coin refused at {len(game.coins)} of {coin_count} coins")
+
+    start = time.perf_counter()
+    steps = run_headless(game, sim_seconds)
+    elapsed = time.perf_counter() - start
+    print(f"{steps} steps ({sim_seconds:.0f} s of game) in {elapsed:.2f} s: "
+          f"{steps / elapsed:.0f} steps/s, {elapsed * 1000.0 / steps:.3f} ms/step, "
+          f"balance {game.balance.get()}, backend {'numpy' if game.physics else 'python'}")
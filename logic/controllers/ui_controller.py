@@ -1,12 +1,16 @@
 import pygame
 import os
 import time  # Импортируем time
+import bisect
 from dataclasses import dataclass
 from typing import Optional, List, Dict
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from localization import get_text
+from logic.assets.font_manager import fonts
+from logic.assets.text_cache import texts
+from logic.assets.glyph_atlas import glyphs
 
 
 # --- Вспомогательные классы ---
@@ -36,6 +40,19 @@ class _UiGroupStub:
 
 
 class UIController:
+    # Флаг состояния игры -> кнопки, которые от него зависят
+    FLAG_BUTTONS = {
+        "_has_gold": ("grab_upgrade",),
+        "_grab_purchased": ("grab_upgrade",),
+        "_explosion_purchased": ("gold_explosion_upgrade",),
+        "_has_wisp": ("wisp_spawn", "wisp_speed", "wisp_size"),
+        "_meteor_unlocked": ("spawn_meteor", "meteor_cooldown_upgrade"),
+        "_has_zone_2": ("spawn_zone_2", "upgrade_zone_2_size", "upgrade_zone_2_mult"),
+        "_has_zone_5": ("spawn_zone_5", "upgrade_zone_5_size", "upgrade_zone_5_mult"),
+        "_has_tornado": ("spawn_tornado", "tornado_cooldown_upgrade"),
+        "_combo_unlocked": ("upgrade_combo_limit",),
+    }
+
     def __init__(self, panel_x: int, panel_width: int, panel_height: int, ui_assets: dict,
                  scale_factor: float = 1.0) -> None:
         self.panel_x = panel_x
@@ -47,22 +64,10 @@ class UIController:
         self._combo_unlocked = False
 
         # --- ШРИФТЫ ---
-        raw_font_path = self.ui_assets.get("font_name", "Arial")
-        try:
-            if raw_font_path != "Arial" and os.path.exists(raw_font_path):
-                self.game_font_path = raw_font_path
-            else:
-                self.game_font_path = None
-        except:
-            self.game_font_path = None
-
-        if self.game_font_path:
-            try:
-                self.base_font = pygame.font.Font(self.game_font_path, 20)
-            except:
-                self.base_font = pygame.font.SysFont("Arial", 20)
-        else:
-            self.base_font = pygame.font.SysFont("Arial", 20)
+        # Тот же ключ, что у main и GameController (системный шрифт - FontManager.SYSTEM_FONT, а не None)
+        self.game_font_path = fonts.resolve(self.ui_assets.get("font_name", fonts.SYSTEM_FONT))
+
+        self.base_font = fonts.get(self.game_font_path, 20)
 
         # --- НАСТРОЙКИ ЛАЙАУТА ---
         self.header_height = int(80 * self.scale_factor)
@@ -154,10 +159,30 @@ class UIController:
             ]),
         ]
 
-        self._enabled = {b.upgrade_id: True
-                         for tab_groups in self.tab_content.values()
-                         for grp in tab_groups
-                         for b in grp.buttons}
+        # Индекс кнопок по upgrade_id (вместо тройных циклов по вкладкам и группам)
+        self._buttons: Dict[str, _UiButtonStub] = {b.upgrade_id: b
+                                                   for tab_groups in self.tab_content.values()
+                                                   for grp in tab_groups
+                                                   for b in grp.buttons}
+        self._enabled = {upgrade_id: True for upgrade_id in self._buttons}
+
+        # === СОСТОЯНИЕ ПО СОБЫТИЯМ ===
+        self._balance = 0
+        self._coin_counts = None
+        # Кнопки, которые надо пересчитать в update (сначала - все)
+        self._dirty_ids = set(self._buttons)
+        # Кнопки, у которых сменились текст, доступность или нажатие - их перерисует панель
+        self._changed_ids = set()
+        # Растет при любом видимом изменении кнопок (для render_key)
+        self._version = 0
+        self._texts_version = 0
+        # Отсортированные (цена, upgrade_id) для поиска пересеченных порогов; None - пересобрать
+        self._thresholds = None
+        self._threshold_costs = []
+        self._ad_state = None
+        self._prestige_state = None
+        self._formatted_value = None
+        self._formatted_text = ""
 
         self._pressed_id: Optional[str] = None
         self._pressed_down_id: Optional[str] = None
@@ -172,6 +197,12 @@ class UIController:
 
         self.scroll_y = 0
 
+        # === ПАНЕЛЬ В СВОЕЙ ПОВЕРХНОСТИ ===
+        self._panel_surface = None
+        # (имя текстуры, ширина, высота) -> отмасштабированная текстура кнопки
+        self._scaled_textures = {}
+        self.invalidate()
+
         # === РАЗМЕРЫ ШРИФТОВ ===
         self.font_size_header = int(38 * self.scale_factor)
         self.font_size_balance = int(36 * self.scale_factor)
@@ -188,6 +219,7 @@ class UIController:
     def mark_ad_watched(self):
         """Вызывается из main, когда награда за рекламу получена."""
         self._last_ad_time = time.time()
+        self._mark_dirty("watch_ad")
 
     def _format_number(self, num: int) -> str:
         if num == 0: return "0"
@@ -200,315 +232,451 @@ class UIController:
         formatted_val = f"{temp_num:.1f}{suffixes[magnitude]}"
         return formatted_val
 
+    def _formatted_balance(self, balance_value: int) -> str:
+        """_format_number для баланса с запоминанием последнего значения (вызывается каждый кадр)"""
+        if balance_value != self._formatted_value:
+            self._formatted_value = balance_value
+            self._formatted_text = self._format_number(balance_value)
+        return self._formatted_text
+
+    # === СОСТОЯНИЕ КНОПОК ПО СОБЫТИЯМ ===
+    # Кнопки не опрашиваются каждый кадр: изменение (баланс, флаги игры, счетчики монет,
+    # таймер рекламы, язык) помечает только затронутые кнопки, а update пересчитывает их.
+
+    def _mark_dirty(self, *upgrade_ids) -> None:
+        self._dirty_ids.update(upgrade_ids)
+
+    def _mark_all_dirty(self) -> None:
+        self._dirty_ids.update(self._buttons)
+        self._thresholds = None
+
+    def _set_button_state(self, b, title: str, enabled: Optional[bool] = None) -> None:
+        """Единственное место, где меняются текст и доступность: изменения видит панель"""
+        if enabled is None:
+            enabled = self._enabled.get(b.upgrade_id, True)
+        if b.title != title or self._enabled.get(b.upgrade_id) != enabled:
+            b.title = title
+            self._enabled[b.upgrade_id] = enabled
+            self._changed_ids.add(b.upgrade_id)
+            self._version += 1
+
+    def _set_flag(self, name: str, value) -> None:
+        if getattr(self, name) != value:
+            setattr(self, name, value)
+            self._mark_dirty(*self.FLAG_BUTTONS[name])
+
+    def on_balance_changed(self, old: int, new: int) -> None:
+        """
+        Подписчик Balance: пересчитываются только кнопки, чей порог цены баланс пересек
+        (доступность меняется, только если цена в (min, max] старого и нового баланса).
+        """
+        self._balance = new
+        thresholds = self._thresholds
+        if thresholds is None:
+            thresholds = sorted((b.base_cost, b.upgrade_id) for b in self._buttons.values() if b.base_cost > 0)
+            self._thresholds = thresholds
+            self._threshold_costs = [cost for cost, _ in thresholds]
+        low, high = (old, new) if old < new else (new, old)
+        costs = self._threshold_costs
+        start = bisect.bisect_right(costs, low)
+        end = bisect.bisect_right(costs, high)
+        for i in range(start, end):
+            self._dirty_ids.add(thresholds[i][1])
+
+    def set_coin_counts(self, coin_counts: dict) -> None:
+        old = self._coin_counts or {}
+        self._coin_counts = coin_counts
+        if old.get('bronze') != coin_counts.get('bronze'):
+            self._mark_dirty("fuse_to_silver")
+        if old.get('silver') != coin_counts.get('silver'):
+            self._mark_dirty("fuse_to_gold")
+
     def update_button(self, upgrade_id: str, cost: int, level: int = 0, name: str = None) -> None:
         if upgrade_id == "prestige": return
-        for tab_groups in self.tab_content.values():
-            for grp in tab_groups:
-                for b in grp.buttons:
-                    if b.upgrade_id == upgrade_id:
-                        b.base_cost = cost
-                        b.level = level
-                        if name is not None: b.base_name = name
-                        display_name = get_text(b.base_name)
-                        price_str = self._format_number(cost)
-                        if b.upgrade_id in ["new_game", "finish_game"]:
-                            b.title = display_name
-                            return
-                        if b.is_one_time:
-                            if not b.is_purchased: b.title = f"{display_name} ({price_str})"
-                        else:
-                            if level > 0:
-                                b.title = f"{display_name} ({level}) ({price_str})"
-                            else:
-                                b.title = f"{display_name} ({price_str})"
-                        return
+        b = self._buttons.get(upgrade_id)
+        if b is None: return
+        if b.base_cost != cost:
+            self._thresholds = None
+        b.base_cost = cost
+        b.level = level
+        if name is not None: b.base_name = name
+        self._mark_dirty(upgrade_id)
+        display_name = get_text(b.base_name)
+        price_str = self._format_number(cost)
+        if b.upgrade_id in ["new_game", "finish_game"]:
+            self._set_button_state(b, display_name)
+            return
+        if b.is_one_time:
+            if not b.is_purchased: self._set_button_state(b, f"{display_name} ({price_str})")
+        else:
+            if level > 0:
+                self._set_button_state(b, f"{display_name} ({level}) ({price_str})")
+            else:
+                self._set_button_state(b, f"{display_name} ({price_str})")
 
     def update_grab_state(self, has_gold: bool, purchased: bool) -> None:
-        self._has_gold = has_gold
-        self._grab_purchased = purchased
+        self._set_flag("_has_gold", has_gold)
+        self._set_flag("_grab_purchased", purchased)
 
     def update_explosion_state(self, purchased: bool) -> None:
-        self._explosion_purchased = purchased
+        self._set_flag("_explosion_purchased", purchased)
 
     def update_wisp_state(self, has_wisp: bool) -> None:
-        self._has_wisp = has_wisp
+        self._set_flag("_has_wisp", has_wisp)
 
     def update_meteor_state(self, unlocked: bool) -> None:
-        self._meteor_unlocked = unlocked
+        self._set_flag("_meteor_unlocked", unlocked)
 
     def update_zone_state(self, has_zone_2=None, has_zone_5=None) -> None:
-        if has_zone_2 is not None: self._has_zone_2 = has_zone_2
-        if has_zone_5 is not None: self._has_zone_5 = has_zone_5
+        if has_zone_2 is not None: self._set_flag("_has_zone_2", has_zone_2)
+        if has_zone_5 is not None: self._set_flag("_has_zone_5", has_zone_5)
 
     def update_tornado_state(self, unlocked: bool):
-        self._has_tornado = unlocked
+        self._set_flag("_has_tornado", unlocked)
 
     def set_button_disabled(self, upgrade_id: str, title: str) -> None:
-        for tab_groups in self.tab_content.values():
-            for grp in tab_groups:
-                for b in grp.buttons:
-                    if b.upgrade_id == upgrade_id:
-                        b.title = title
-                        self._enabled[upgrade_id] = False
-                        return
-
-    def update(self, balance_value: int, coin_counts=None) -> None:
+        b = self._buttons.get(upgrade_id)
+        if b is not None:
+            self._set_button_state(b, title, False)
+            self._mark_dirty(upgrade_id)
+
+    def update(self, balance_value: Optional[int] = None, coin_counts=None) -> None:
+        """
+        Пересчет помеченных кнопок. Баланс приходит через on_balance_changed, счетчики монет -
+        через set_coin_counts, но их можно передать и сюда (тогда сравниваются с прошлыми).
+        Если ничего не менялось, работы почти нет.
+        """
+        if balance_value is not None and balance_value != self._balance:
+            self.on_balance_changed(self._balance, balance_value)
+        if coin_counts is not None:
+            self.set_coin_counts(coin_counts)
+
+        # Таймер рекламы - единственное, что меняется само по себе: раз в секунду
         current_time = time.time()
+        elapsed = current_time - self._last_ad_time
+        ad_state = int(self._ad_cooldown - elapsed) if elapsed < self._ad_cooldown else None
+        if ad_state != self._ad_state:
+            self._ad_state = ad_state
+            self._mark_dirty("watch_ad")
 
-        for tab_groups in self.tab_content.values():
-            for grp in tab_groups:
-                for b in grp.buttons:
-                    btn_name = get_text(b.base_name)
-                    price_str = self._format_number(b.base_cost)
-
-                    if b.upgrade_id == "new_game":
-                        self._enabled[b.upgrade_id] = True
-                        b.title = btn_name
-                        continue
-
-                    if b.upgrade_id == "prestige": continue
-
-                    if b.upgrade_id == "exit_to_menu":
-                        self._enabled[b.upgrade_id] = True
-                        b.title = btn_name
-                        continue
-
-                    if b.max_level > 0 and b.level >= b.max_level:
-                        b.title = f"{btn_name} ({get_text('status_max')})"
-                        self._enabled[b.upgrade_id] = False
-                        continue
-
-                    if b.is_purchased:
-                        b.title = f"{btn_name} ({get_text('status_purchased')})"
-                        self._enabled[b.upgrade_id] = False
-                        continue
-
-                    enabled = False
-
-                    if b.upgrade_id == "buy_victory":
-                        enabled = balance_value >= b.base_cost
-                        b.title = f"{btn_name} ({price_str})"
-                    elif b.upgrade_id == "upgrade_combo_limit":
-                        enabled = self._combo_unlocked and (balance_value >= b.base_cost)
-                        if b.level > 0:
-                            b.title = f"{btn_name} ({b.level}) ({price_str})"
-                        else:
-                            b.title = f"{btn_name} ({price_str})"
-                    elif b.upgrade_id == "tornado_cooldown_upgrade":
-                        if not self._has_tornado:
-                            enabled = False
-                            b.title = f"{btn_name} ({price_str})"
-                        else:
-                            enabled = b.level < b.max_level and balance_value >= b.base_cost
-                            if b.level > 0:
-                                b.title = f"{btn_name} ({b.level}) ({price_str})"
-                            else:
-                                b.title = f"{btn_name} ({price_str})"
-                    elif b.upgrade_id == "watch_ad":
-                        # === ЛОГИКА ТАЙМЕРА РЕКЛАМЫ ===
-                        elapsed = current_time - self._last_ad_time
-                        if elapsed < self._ad_cooldown:
-                            remaining = int(self._ad_cooldown - elapsed)
-                            mins = remaining // 60
-                            secs = remaining % 60
-                            b.title = f"{btn_name} ({mins:02d}:{secs:02d})"
-                            enabled = False
-                        else:
-                            b.title = f"{btn_name} (+10%)"
-                            enabled = True
-
-                    elif b.upgrade_id == "meteor_cooldown_upgrade":
-                        if not self._meteor_unlocked:
-                            enabled = False
-                            b.title = f"{btn_name} ({price_str})"
-                        else:
-                            enabled = b.level < b.max_level and balance_value >= b.base_cost
-                            if b.level > 0:
-                                b.title = f"{btn_name} ({b.level}) ({price_str})"
-                            else:
-                                b.title = f"{btn_name} ({price_str})"
-                    elif b.upgrade_id == "spawn_tornado":
-                        if self._has_tornado:
-                            b.title = f"{btn_name} ({get_text('status_purchased')})"
-                            enabled = False
-                        else:
-                            enabled = balance_value >= b.base_cost
-                            b.title = f"{btn_name} ({price_str})"
-                    elif b.upgrade_id == "spawn_meteor":
-                        if self._meteor_unlocked:
-                            b.title = f"{btn_name} ({get_text('status_purchased')})"
-                            enabled = False
-                        else:
-                            enabled = balance_value >= b.base_cost
-                            b.title = f"{btn_name} ({price_str})"
-                    elif b.upgrade_id == "grab_upgrade":
-                        if self._has_gold and not b.is_purchased: enabled = balance_value >= b.base_cost
-                        b.title = f"{btn_name} ({price_str})"
-                    elif b.upgrade_id == "gold_explosion_upgrade":
-                        enabled = (not self._explosion_purchased) and (balance_value >= b.base_cost)
-                        b.title = f"{btn_name} ({price_str})"
-                    elif b.upgrade_id == "wisp_spawn":
-                        if self._has_wisp:
-                            b.title = f"{btn_name} ({get_text('status_purchased')})"
-                            enabled = False
-                        else:
-                            enabled = balance_value >= b.base_cost
-                            b.title = f"{btn_name} ({price_str})"
-                    elif "wisp" in b.upgrade_id and b.upgrade_id != "wisp_spawn":
-                        enabled = self._has_wisp and (balance_value >= b.base_cost)
-                        if b.level > 0:
-                            b.title = f"{btn_name} ({b.level}) ({price_str})"
-                        else:
-                            b.title = f"{btn_name} ({price_str})"
-                    elif b.upgrade_id == "spawn_zone_2":
-                        if self._has_zone_2:
-                            b.title = f"{btn_name} ({get_text('status_purchased')})"
-                            enabled = False
-                        else:
-                            enabled = balance_value >= b.base_cost
-                            b.title = f"{btn_name} ({price_str})"
-                    elif b.upgrade_id == "spawn_zone_5":
-                        if self._has_zone_5:
-                            b.title = f"{btn_name} ({get_text('status_purchased')})"
-                            enabled = False
-                        else:
-                            enabled = balance_value >= b.base_cost
-                            b.title = f"{btn_name} ({price_str})"
-                    elif "upgrade_zone_2" in b.upgrade_id:
-                        enabled = self._has_zone_2 and (balance_value >= b.base_cost)
-                        if b.level > 0:
-                            b.title = f"{btn_name} ({b.level}) ({price_str})"
-                        else:
-                            b.title = f"{btn_name} ({price_str})"
-                    elif "upgrade_zone_5" in b.upgrade_id:
-                        enabled = self._has_zone_5 and (balance_value >= b.base_cost)
-                        if b.level > 0:
-                            b.title = f"{btn_name} ({b.level}) ({price_str})"
-                        else:
-                            b.title = f"{btn_name} ({price_str})"
-                    elif b.upgrade_id == "fuse_to_silver":
-                        if coin_counts and coin_counts.get('bronze', 0) >= 5:
-                            enabled = True
-                            b.title = f"{btn_name} (5->1)"
-                        else:
-                            enabled = False
-                            needed = 5 - coin_counts.get('bronze', 0) if coin_counts else 5
-                            b.title = f"{btn_name} ({get_text('status_fuse_need')} {needed})"
-                    elif b.upgrade_id == "fuse_to_gold":
-                        if coin_counts and coin_counts.get('silver', 0) >= 3:
-                            enabled = True
-                            b.title = f"{btn_name} (3->1)"
-                        else:
-                            enabled = False
-                            needed = 3 - coin_counts.get('silver', 0) if coin_counts else 3
-                            b.title = f"{btn_name} ({get_text('status_fuse_need')} {needed})"
-                    else:
-                        enabled = balance_value >= b.base_cost
-                        if not b.is_one_time and b.level > 0:
-                            b.title = f"{btn_name} ({b.level}) ({price_str})"
-                        else:
-                            b.title = f"{btn_name} ({price_str})"
-
-                    self._enabled[b.upgrade_id] = enabled
-
-    def draw(self, surface, screen_height, balance_value: int) -> None:
-        pygame.draw.rect(surface, (200, 200, 200), (self.panel_x, 0, self.panel_width, self.panel_height))
-        header_rect = pygame.Rect(self.panel_x, 0, self.panel_width, self.header_height)
-        tabs_rect = pygame.Rect(self.panel_x, self.header_height, self.panel_width, self.tab_bar_height)
+        if not self._dirty_ids:
+            return
+        dirty = self._dirty_ids
+        self._dirty_ids = set()
+        for upgrade_id in dirty:
+            b = self._buttons.get(upgrade_id)
+            if b is None or b.upgrade_id == "prestige":
+                continue
+            title, enabled = self._evaluate_button(b, current_time)
+            self._set_button_state(b, title, enabled)
+
+    def _evaluate_button(self, b, current_time: float) -> tuple:
+        """(текст, доступность) кнопки по текущему состоянию"""
+        balance_value = self._balance
+        coin_counts = self._coin_counts
+        btn_name = get_text(b.base_name)
+        price_str = self._format_number(b.base_cost)
+
+        if b.upgrade_id == "new_game":
+            return btn_name, True
+
+        if b.upgrade_id == "exit_to_menu":
+            return btn_name, True
+
+        if b.max_level > 0 and b.level >= b.max_level:
+            return f"{btn_name} ({get_text('status_max')})", False
+
+        if b.is_purchased:
+            return f"{btn_name} ({get_text('status_purchased')})", False
+
+        enabled = False
+
+        if b.upgrade_id == "buy_victory":
+            enabled = balance_value >= b.base_cost
+            title = f"{btn_name} ({price_str})"
+        elif b.upgrade_id == "upgrade_combo_limit":
+            enabled = self._combo_unlocked and (balance_value >= b.base_cost)
+            if b.level > 0:
+                title = f"{btn_name} ({b.level}) ({price_str})"
+            else:
+                title = f"{btn_name} ({price_str})"
+        elif b.upgrade_id == "tornado_cooldown_upgrade":
+            if not self._has_tornado:
+                enabled = False
+                title = f"{btn_name} ({price_str})"
+            else:
+                enabled = b.level < b.max_level and balance_value >= b.base_cost
+                if b.level > 0:
+                    title = f"{btn_name} ({b.level}) ({price_str})"
+                else:
+                    title = f"{btn_name} ({price_str})"
+        elif b.upgrade_id == "watch_ad":
+            # === ЛОГИКА ТАЙМЕРА РЕКЛАМЫ ===
+            elapsed = current_time - self._last_ad_time
+            if elapsed < self._ad_cooldown:
+                remaining = int(self._ad_cooldown - elapsed)
+                mins = remaining // 60
+                secs = remaining % 60
+                title = f"{btn_name} ({mins:02d}:{secs:02d})"
+                enabled = False
+            else:
+                title = f"{btn_name} (+10%)"
+                enabled = True
 
-        pygame.draw.rect(surface, (50, 50, 50), header_rect)
+        elif b.upgrade_id == "meteor_cooldown_upgrade":
+            if not self._meteor_unlocked:
+                enabled = False
+                title = f"{btn_name} ({price_str})"
+            else:
+                enabled = b.level < b.max_level and balance_value >= b.base_cost
+                if b.level > 0:
+                    title = f"{btn_name} ({b.level}) ({price_str})"
+                else:
+                    title = f"{btn_name} ({price_str})"
+        elif b.upgrade_id == "spawn_tornado":
+            if self._has_tornado:
+                title = f"{btn_name} ({get_text('status_purchased')})"
+                enabled = False
+            else:
+                enabled = balance_value >= b.base_cost
+                title = f"{btn_name} ({price_str})"
+        elif b.upgrade_id == "spawn_meteor":
+            if self._meteor_unlocked:
+                title = f"{btn_name} ({get_text('status_purchased')})"
+                enabled = False
+            else:
+                enabled = balance_value >= b.base_cost
+                title = f"{btn_name} ({price_str})"
+        elif b.upgrade_id == "grab_upgrade":
+            if self._has_gold and not b.is_purchased: enabled = balance_value >= b.base_cost
+            title = f"{btn_name} ({price_str})"
+        elif b.upgrade_id == "gold_explosion_upgrade":
+            enabled = (not self._explosion_purchased) and (balance_value >= b.base_cost)
+            title = f"{btn_name} ({price_str})"
+        elif b.upgrade_id == "wisp_spawn":
+            if self._has_wisp:
+                title = f"{btn_name} ({get_text('status_purchased')})"
+                enabled = False
+            else:
+                enabled = balance_value >= b.base_cost
+                title = f"{btn_name} ({price_str})"
+        elif "wisp" in b.upgrade_id and b.upgrade_id != "wisp_spawn":
+            enabled = self._has_wisp and (balance_value >= b.base_cost)
+            if b.level > 0:
+                title = f"{btn_name} ({b.level}) ({price_str})"
+            else:
+                title = f"{btn_name} ({price_str})"
+        elif b.upgrade_id == "spawn_zone_2":
+            if self._has_zone_2:
+                title = f"{btn_name} ({get_text('status_purchased')})"
+                enabled = False
+            else:
+                enabled = balance_value >= b.base_cost
+                title = f"{btn_name} ({price_str})"
+        elif b.upgrade_id == "spawn_zone_5":
+            if self._has_zone_5:
+                title = f"{btn_name} ({get_text('status_purchased')})"
+                enabled = False
+            else:
+                enabled = balance_value >= b.base_cost
+                title = f"{btn_name} ({price_str})"
+        elif "upgrade_zone_2" in b.upgrade_id:
+            enabled = self._has_zone_2 and (balance_value >= b.base_cost)
+            if b.level > 0:
+                title = f"{btn_name} ({b.level}) ({price_str})"
+            else:
+                title = f"{btn_name} ({price_str})"
+        elif "upgrade_zone_5" in b.upgrade_id:
+            enabled = self._has_zone_5 and (balance_value >= b.base_cost)
+            if b.level > 0:
+                title = f"{btn_name} ({b.level}) ({price_str})"
+            else:
+                title = f"{btn_name} ({price_str})"
+        elif b.upgrade_id == "fuse_to_silver":
+            if coin_counts and coin_counts.get('bronze', 0) >= 5:
+                enabled = True
+                title = f"{btn_name} (5->1)"
+            else:
+                enabled = False
+                needed = 5 - coin_counts.get('bronze', 0) if coin_counts else 5
+                title = f"{btn_name} ({get_text('status_fuse_need')} {needed})"
+        elif b.upgrade_id == "fuse_to_gold":
+            if coin_counts and coin_counts.get('silver', 0) >= 3:
+                enabled = True
+                title = f"{btn_name} (3->1)"
+            else:
+                enabled = False
+                needed = 3 - coin_counts.get('silver', 0) if coin_counts else 3
+                title = f"{btn_name} ({get_text('status_fuse_need')} {needed})"
+        else:
+            enabled = balance_value >= b.base_cost
+            if not b.is_one_time and b.level > 0:
+                title = f"{btn_name} ({b.level}) ({price_str})"
+            else:
+                title = f"{btn_name} ({price_str})"
 
-        head_font = pygame.font.Font(self.game_font_path,
-                                     self.font_size_header) if self.game_font_path else pygame.font.SysFont("Arial",
-                                                                                                            self.font_size_header)
-        title_surf = head_font.render(get_text("ui_upgrades"), True, (200, 200, 200))
-        surface.blit(title_surf, (self.panel_x + self.padding, 2))
+        return title, enabled
 
-        formatted_balance = self._format_number(balance_value)
-        bal_font = pygame.font.Font(self.game_font_path,
-                                    self.font_size_balance) if self.game_font_path else pygame.font.SysFont("Arial",
-                                                                                                            self.font_size_balance)
-        bal_surf = bal_font.render(f"{get_text('ui_balance')}: {formatted_balance}", True, (255, 255, 255))
-        bal_rect = bal_surf.get_rect(midleft=(self.panel_x + 20, self.header_height - 20))
-        surface.blit(bal_surf, bal_rect)
+    def get_panel_rect(self) -> pygame.Rect:
+        return pygame.Rect(self.panel_x, 0, self.panel_width, self.panel_height)
 
-        self._draw_tab_bar(surface, tabs_rect)
+    def render_key(self, balance_value: int) -> tuple:
+        """Все, от чего зависит картинка панели: если ключ не сменился, панель перерисовывать не нужно"""
+        return (self._formatted_balance(balance_value), self.active_tab_index, self.scroll_y,
+                self._pressed_id, self._version, self._texts_version)
 
+    def draw(self, surface, screen_height, balance_value: int) -> None:
+        """
+        Панель живет в своей поверхности (retained mode): перерисовываются только части,
+        у которых сменилось состояние, а на экран панель выводится одним блитом.
+        """
+        panel = self._panel_surface
+        if panel is None or panel.get_size() != (self.panel_width, self.panel_height):
+            panel = pygame.Surface((self.panel_width, self.panel_height))
+            self._panel_surface = panel
+            self.invalidate()
+
+        header_rect = pygame.Rect(0, 0, self.panel_width, self.header_height)
+        tabs_rect = pygame.Rect(0, self.header_height, self.panel_width, self.tab_bar_height)
+
+        # === ШАПКА ===
+        header_key = (self._texts_version, self._formatted_balance(balance_value))
+        if header_key != self._header_key:
+            self._draw_header(panel, header_rect, header_key[1])
+            self._header_key = header_key
+
+        # === ВКЛАДКИ ===
+        tabs_key = (self.active_tab_index, self._texts_version)
+        if tabs_key != self._tabs_key:
+            # Ширина вкладки дробная: щели при округлении - цвета фона панели, как раньше
+            panel.fill((200, 200, 200), tabs_rect)
+            self._draw_tab_bar(panel, tabs_rect)
+            self._tabs_key = tabs_key
+
+        # === СОДЕРЖИМОЕ ===
+        # Смена вкладки, прокрутки или заголовков групп сдвигает все кнопки - перерисовка целиком,
+        # иначе перерисовываются только кнопки, о чьем изменении (текст, доступность, нажатие) сообщили
+        layout_key = (self.active_tab_index, self.scroll_y, self._texts_version)
+        if layout_key != self._layout_key:
+            self._draw_content(panel, self.tab_content.get(self.active_tab_index, []))
+            self._layout_key = layout_key
+        elif self._changed_ids:
+            content_rect = self._content_rect()
+            for upgrade_id in self._changed_ids:
+                y_slot = self._button_slots.get(upgrade_id)
+                if y_slot is not None:
+                    self._draw_button(panel, self._buttons[upgrade_id], y_slot, content_rect, clear=True)
+        self._changed_ids.clear()
+
+        surface.blit(panel, (self.panel_x, 0))
+
+    def invalidate(self) -> None:
+        """Перерисовать панель целиком при следующем draw"""
+        self._header_key = None
+        self._tabs_key = None
+        self._layout_key = None
+        self._button_slots = {}
+
+    def _content_rect(self) -> pygame.Rect:
         content_start_y = self.header_height + self.tab_bar_height
-        content_height = self.panel_height - content_start_y
-        clip_rect = pygame.Rect(self.panel_x, content_start_y, self.panel_width, content_height)
-        surface.set_clip(clip_rect)
+        return pygame.Rect(0, content_start_y, self.panel_width, self.panel_height - content_start_y)
 
-        current_draw_y = content_start_y - self.scroll_y
+    def _draw_header(self, panel, header_rect, formatted_balance: str) -> None:
+        title, balance_label = get_text("ui_upgrades"), get_text("ui_balance")
+        pygame.draw.rect(panel, (50, 50, 50), header_rect)
 
-        group_font = pygame.font.Font(self.game_font_path,
-                                      self.font_size_group) if self.game_font_path else pygame.font.SysFont("Arial",
-                                                                                                            self.font_size_group)
-        btn_font = pygame.font.Font(self.game_font_path,
-                                    self.font_size_button) if self.game_font_path else pygame.font.SysFont("Arial",
-                                                                                                           self.font_size_button)
+        head_font = fonts.get(self.game_font_path, self.font_size_header)
+        title_surf = texts.render(head_font, title, (200, 200, 200))
+        panel.blit(title_surf, (self.padding, 2))
 
-        groups = self.tab_content.get(self.active_tab_index, [])
+        bal_font = fonts.get(self.game_font_path, self.font_size_balance)
+        # Подпись - из кэша текста, само число меняется постоянно - из атласа символов
+        bal_surf = texts.render(bal_font, f"{balance_label}: ")
+        bal_rect = bal_surf.get_rect(midleft=(20, self.header_height - 20))
+        panel.blit(bal_surf, bal_rect)
+        glyphs.draw(panel, bal_font, formatted_balance, bal_rect.topright)
+
+    def _draw_content(self, panel, groups) -> None:
+        content_rect = self._content_rect()
+        panel.set_clip(content_rect)
+        panel.fill((200, 200, 200), content_rect)
+
+        self._button_slots = {}
+        current_draw_y = content_rect.y - self.scroll_y
+        group_font = fonts.get(self.game_font_path, self.font_size_group)
 
         for grp in groups:
             # === ЦЕНТРИРОВАНИЕ ЗАГОЛОВКА ГРУППЫ ===
-            grp_surf = group_font.render(grp.title, True, (30, 30, 30))
-            grp_rect = grp_surf.get_rect(centerx=self.panel_x + self.panel_width // 2, y=current_draw_y + 10)
-            surface.blit(grp_surf, grp_rect)
+            grp_surf = texts.render(group_font, grp.title, (30, 30, 30))
+            grp_rect = grp_surf.get_rect(centerx=self.panel_width // 2, y=current_draw_y + 10)
+            panel.blit(grp_surf, grp_rect)
 
-            pygame.draw.line(surface, (180, 180, 180), (self.panel_x + self.padding, current_draw_y + 35),
-                             (self.panel_x + self.panel_width - self.padding, current_draw_y + 35), 1)
+            pygame.draw.line(panel, (180, 180, 180), (self.padding, current_draw_y + 35),
+                             (self.panel_width - self.padding, current_draw_y + 35), 1)
 
             current_draw_y += self.group_header_height
 
             for b in grp.buttons:
-                if current_draw_y > content_start_y + content_height: break
-
-                enabled = self._enabled.get(b.upgrade_id, True)
-                is_pressed = (self._pressed_id == b.upgrade_id)
-                y_draw = current_draw_y + (6 if is_pressed else 0)
-
-                texture_to_draw = None
-                if self.ui_assets["btn_normal"]:
-                    if not enabled:
-                        texture_to_draw = self.ui_assets["btn_disabled"]
-                    elif is_pressed:
-                        texture_to_draw = self.ui_assets["btn_pressed"]
-                    else:
-                        texture_to_draw = self.ui_assets["btn_normal"]
-
-                btn_w = self.panel_width - (self.padding * 2)
-
-                if texture_to_draw:
-                    scaled_tex = pygame.transform.scale(texture_to_draw, (btn_w, self.btn_height))
-                    surface.blit(scaled_tex, (self.panel_x + self.padding, y_draw))
-                else:
-                    fill = (255, 255, 255) if enabled else (150, 150, 150)
-                    pygame.draw.rect(surface, fill, (self.panel_x + self.padding, y_draw, btn_w, self.btn_height))
-                    pygame.draw.rect(surface, (50, 50, 50),
-                                     (self.panel_x + self.padding, y_draw, btn_w, self.btn_height), 1)
-
-                color = (50, 50, 50) if enabled else (180, 180, 180)
-                text_surf = btn_font.render(b.title, True, color)
-
-                # === ЦЕНТРИРОВАНИЕ ТЕКСТА КНОПКИ ===
-                text_rect = text_surf.get_rect()
-                btn_center_x = (self.panel_x + self.padding) + (btn_w // 2)
-                btn_center_y = y_draw + (self.btn_height // 2)
-                text_rect.center = (btn_center_x, btn_center_y)
-                surface.blit(text_surf, text_rect)
-
+                if current_draw_y > content_rect.bottom: break
+                self._button_slots[b.upgrade_id] = current_draw_y
+                self._draw_button(panel, b, current_draw_y, content_rect)
                 current_draw_y += self.btn_height + self.btn_gap
 
             current_draw_y += 20
-        surface.set_clip(None)
+        panel.set_clip(None)
+
+    def _draw_button(self, panel, b, y_slot, content_rect, clear: bool = False) -> None:
+        enabled = self._enabled.get(b.upgrade_id, True)
+        is_pressed = self._pressed_id == b.upgrade_id
+        btn_w = self.panel_width - (self.padding * 2)
+        # Нажатая кнопка смещена вниз на 6 px: место под нее - слот плюс смещение (меньше зазора)
+        slot_rect = pygame.Rect(self.padding, y_slot, btn_w, self.btn_height + 6)
+        if clear:
+            panel.set_clip(content_rect.clip(slot_rect))
+            panel.fill((200, 200, 200), slot_rect)
+
+        y_draw = y_slot + (6 if is_pressed else 0)
+
+        texture_to_draw = None
+        if self.ui_assets["btn_normal"]:
+            if not enabled:
+                texture_to_draw = "btn_disabled"
+            elif is_pressed:
+                texture_to_draw = "btn_pressed"
+            else:
+                texture_to_draw = "btn_normal"
+
+        if texture_to_draw:
+            panel.blit(self._scaled_button_texture(texture_to_draw, btn_w, self.btn_height), (self.padding, y_draw))
+        else:
+            fill = (255, 255, 255) if enabled else (150, 150, 150)
+            pygame.draw.rect(panel, fill, (self.padding, y_draw, btn_w, self.btn_height))
+            pygame.draw.rect(panel, (50, 50, 50), (self.padding, y_draw, btn_w, self.btn_height), 1)
+
+        btn_font = fonts.get(self.game_font_path, self.font_size_button)
+        color = (50, 50, 50) if enabled else (180, 180, 180)
+        text_surf = texts.render(btn_font, b.title, color)
+
+        # === ЦЕНТРИРОВАНИЕ ТЕКСТА КНОПКИ ===
+        text_rect = text_surf.get_rect()
+        text_rect.center = (self.padding + (btn_w // 2), y_draw + (self.btn_height // 2))
+        panel.blit(text_surf, text_rect)
+
+        if clear:
+            panel.set_clip(None)
+
+    def _scaled_button_texture(self, name: str, width: int, height: int) -> pygame.Surface:
+        """Текстура кнопки, отмасштабированная один раз на размер"""
+        key = (name, width, height)
+        scaled = self._scaled_textures.get(key)
+        if scaled is None:
+            scaled = pygame.transform.scale(self.ui_assets[name], (width, height))
+            self._scaled_textures[key] = scaled
+        return scaled
 
-    # Остальные методы без изменений (_draw_tab_bar, hit_test, etc...)
     def _draw_tab_bar(self, surface, rect):
         tab_w = self.panel_width / len(self.tabs)
-        tab_font = pygame.font.Font(self.game_font_path,
-                                    self.font_size_tab) if self.game_font_path else pygame.font.SysFont("Arial",
-                                                                                                        self.font_size_tab)
+        tab_font = fonts.get(self.game_font_path, self.font_size_tab)
 
         for i, tab in enumerate(self.tabs):
             x = rect.x + i * tab_w
@@ -522,7 +690,7 @@ class UIController:
             pygame.draw.rect(surface, bg_color, (x, rect.y, tab_w, rect.height))
             pygame.draw.rect(surface, (100, 100, 100), (x, rect.y, tab_w, rect.height), 1)
 
-            text_surf = tab_font.render(tab.title, True, text_color)
+            text_surf = texts.render(tab_font, tab.title, text_color)
             text_rect = text_surf.get_rect(center=(x + tab_w / 2, rect.y + rect.height / 2))
             surface.blit(text_surf, text_rect)
 
@@ -557,31 +725,38 @@ class UIController:
         if clicked_tab_index is not None:
             self.active_tab_index = clicked_tab_index
             self.scroll_y = 0
-            self._pressed_id = None
+            self._set_pressed(None)
             self._pressed_down_id = None
             return
 
         upgrade_id = self._hit_test_buttons(x, y)
         if upgrade_id is None:
-            self._pressed_id = None
+            self._set_pressed(None)
             self._pressed_down_id = None
             return
 
         if not self._enabled.get(upgrade_id, True):
-            self._pressed_id = None
+            self._set_pressed(None)
             self._pressed_down_id = None
             return
 
-        self._pressed_id = upgrade_id
+        self._set_pressed(upgrade_id)
         self._pressed_down_id = upgrade_id
 
+    def _set_pressed(self, upgrade_id: Optional[str]) -> None:
+        if upgrade_id != self._pressed_id:
+            # Перерисовать нужно и отпущенную, и нажатую кнопку
+            if self._pressed_id is not None: self._changed_ids.add(self._pressed_id)
+            if upgrade_id is not None: self._changed_ids.add(upgrade_id)
+            self._pressed_id = upgrade_id
+
     def on_mouse_release(self, x: int, y: int) -> Optional[str]:
         released_over_id = self._hit_test_buttons(x, y)
         clicked_id: Optional[str] = None
         if self._pressed_down_id is not None and released_over_id == self._pressed_down_id:
             if self._enabled.get(self._pressed_down_id, True):
                 clicked_id = self._pressed_down_id
-        self._pressed_id = None
+        self._set_pressed(None)
         self._pressed_down_id = None
         return clicked_id
 
@@ -601,14 +776,11 @@ class UIController:
         if self.scroll_y > max_scroll: self.scroll_y = max_scroll
 
     def mark_purchased(self, upgrade_id: str) -> None:
-        for tab_groups in self.tab_content.values():
-            for grp in tab_groups:
-                for b in grp.buttons:
-                    if b.upgrade_id == upgrade_id:
-                        b.is_purchased = True
-                        b.title = f"{get_text(b.base_name)} ({b.purchased_text})"
-                        self._enabled[upgrade_id] = False
-                        return
+        b = self._buttons.get(upgrade_id)
+        if b is not None:
+            b.is_purchased = True
+            self._set_button_state(b, f"{get_text(b.base_name)} ({b.purchased_text})", False)
+            self._mark_dirty(upgrade_id)
 
     def reload_texts(self):
         self.tabs[0].title = get_text("tab_coins")
@@ -626,34 +798,32 @@ class UIController:
             for i, grp in enumerate(groups):
                 if i < len(grp_keys_list): grp.title = get_text(grp_keys_list[i])
 
+        # Смена языка: все тексты кнопок собираются заново
+        self._texts_version += 1
+        self._mark_all_dirty()
+        if self._prestige_state is not None:
+            self.update_prestige_button(*self._prestige_state)
+
     def update_prestige_button(self, gain: int, total_points: int, multiplier: float):
-        btn = None
-        for groups in self.tab_content.values():
-            for grp in groups:
-                for b in grp.buttons:
-                    if b.upgrade_id == "prestige":
-                        btn = b
-                        break
+        # Запоминаем для reload_texts: игра присылает кнопку престижа только при смене прироста
+        self._prestige_state = (gain, total_points, multiplier)
+        btn = self._buttons.get("prestige")
 
         if btn:
             if gain > 0:
                 gain_str = self._format_number(gain)
-                btn.title = f"{get_text('btn_prestige')} (+{gain_str})"
-                self._enabled["prestige"] = True
+                self._set_button_state(btn, f"{get_text('btn_prestige')} (+{gain_str})", True)
             else:
-                btn.title = get_text("prestige_need")
-                self._enabled["prestige"] = False
+                self._set_button_state(btn, get_text("prestige_need"), False)
 
     def update_combo_unlocked_state(self, unlocked: bool):
-        self._combo_unlocked = unlocked
+        self._set_flag("_combo_unlocked", unlocked)
 
     def reset_all_buttons(self):
-        for tab_groups in self.tab_content.values():
-            for grp in tab_groups:
-                for b in grp.buttons:
-                    b.is_purchased = False
-                    b.level = 0
-                    b.title = get_text(b.base_name)
+        for b in self._buttons.values():
+            b.is_purchased = False
+            b.level = 0
+            self._set_button_state(b, get_text(b.base_name), True)
 
         self._has_gold = False
         self._grab_purchased = False
@@ -664,11 +834,10 @@ class UIController:
         self._meteor_unlocked = False
         self._has_tornado = False
         self._combo_unlocked = False
-
-        for key in self._enabled: self._enabled[key] = True
+        self._mark_all_dirty()
 
     def cancel_press(self):
-        self._pressed_id = None
+        self._set_pressed(None)
         self._pressed_down_id = None
 
     def get_pressed_button_id(self) -> str:
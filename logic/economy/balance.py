@@ -1,13 +1,27 @@
 class Balance:
     def __init__(self) -> None:
         self._value = 0
+        # Подписчики listener(old, new) - вызываются только при реальном изменении значения
+        self._listeners = []
+
+    def subscribe(self, listener) -> None:
+        self._listeners.append(listener)
+
+    def _changed(self, old: int) -> None:
+        if old != self._value:
+            for listener in self._listeners:
+                listener(old, self._value)
 
     def add(self, amount: int) -> None:
+        old = self._value
         self._value += max(0, amount)
+        self._changed(old)
 
     def set(self, amount: int) -> None:
         """Устанавливает точное значение баланса"""
+        old = self._value
         self._value = max(0, amount)
+        self._changed(old)
 
     def get(self) -> int:
         return self._value
@@ -20,5 +34,7 @@ class Balance:
             return True
         if not self.can_spend(amount):
             return False
+        old = self._value
         self._value -= amount
-        return True
\ No newline at end of file
+        self._changed(old)
+        return True
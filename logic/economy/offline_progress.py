@@ -0,0 +1,108 @@
+import math
+import random
+
+
+class OfflineProgress:
+    """
+    Доход за время отсутствия игрока без покадровой симуляции.
+    Пока игрока нет, монеты подбрасывает только автофлип, поэтому ожидаемый доход
+    считается формулой от числа подбрасываний - время счета не зависит от длины отсутствия.
+    """
+
+    # Те же константы, что в GameController / SilverCoin
+    HEADS_CHANCE = 0.5
+    SILVER_CRIT_MULTIPLIER = 5
+    COMBO_STEP = 0.1
+    BEETLE_THEFT = 0.75
+    # Стохастическая поправка ограничена этим числом стандартных отклонений
+    MAX_SIGMA = 2.0
+
+    def __init__(self, rng: random.Random = None):
+        self.rng = rng or random
+
+    @staticmethod
+    def auto_flip_interval(auto_flip_level: int):
+        """Интервал автофлипа как в GameController.update, None - автофлип не куплен"""
+        if auto_flip_level < 1:
+            return None
+        return max(1.0, 5.0 - (auto_flip_level - 1) * 0.3)
+
+    @classmethod
+    def flip_moments(cls, value: float, crit_chance: float = None):
+        """Первый и второй моменты дохода от одного подбрасывания монеты (crit_chance - для серебра)"""
+        if crit_chance is None:
+            mean = cls.HEADS_CHANCE * value
+            mean_sq = cls.HEADS_CHANCE * value * value
+        else:
+            crit_value = value * cls.SILVER_CRIT_MULTIPLIER
+            mean = cls.HEADS_CHANCE * (crit_chance * crit_value + (1 - crit_chance) * value)
+            mean_sq = cls.HEADS_CHANCE * (crit_chance * crit_value ** 2 + (1 - crit_chance) * value ** 2)
+        return mean, mean_sq
+
+    @classmethod
+    def expected_combo(cls, combo_limit: float, interval: float) -> float:
+        """
+        Средний множитель комбо на удачном броске.
+        Серия растет на COMBO_STEP с каждой удачей и сбрасывается, если за секунду удачи не было:
+        при интервале 1 с она переживает бросок с вероятностью HEADS_CHANCE, при 2 с и больше - никогда.
+        Стационарное распределение длины серии - геометрическое, обрезанное на пределе комбо.
+        """
+        survive = cls.HEADS_CHANCE * max(0.0, min(1.0, 2.0 - interval))
+        steps = int(math.ceil((combo_limit - 1.0) / cls.COMBO_STEP - 1e-9))
+        if steps <= 0 or survive <= 0:
+            return 1.0
+
+        weights = [survive ** k for k in range(steps)]
+        weights.append(survive ** steps / (1.0 - survive))
+        total = sum(weights)
+        expected = 0.0
+        for k, weight in enumerate(weights):
+            expected += weight * min(1.0 + k * cls.COMBO_STEP, combo_limit)
+        return expected / total
+
+    def compute(self, elapsed: float, flip_coins: list, auto_flip_level: int,
+                combo_unlocked: bool, combo_limit: float, prestige_multiplier: float,
+                beetle_delay: float = None, stochastic: bool = False) -> dict:
+        """
+        flip_coins - список (value, crit_chance или None) монет, которые может подбросить автофлип.
+        beetle_delay - через сколько секунд появится жук (0 - уже на поле, None - не появится).
+        """
+        report = {"seconds": max(0.0, elapsed), "flips": 0, "income": 0, "kept": 0, "stolen": 0}
+        interval = self.auto_flip_interval(auto_flip_level)
+        if elapsed <= 0 or interval is None or not flip_coins:
+            return report
+
+        flips = int(elapsed // interval)
+        report["flips"] = flips
+        if flips == 0:
+            return report
+
+        # Автофлип выбирает монету равновероятно
+        mean = 0.0
+        mean_sq = 0.0
+        for value, crit_chance in flip_coins:
+            m1, m2 = self.flip_moments(value, crit_chance)
+            mean += m1
+            mean_sq += m2
+        mean /= len(flip_coins)
+        mean_sq /= len(flip_coins)
+
+        combo = self.expected_combo(combo_limit, interval) if combo_unlocked else 1.0
+        scale = combo * prestige_multiplier
+        income = flips * mean * scale
+
+        if stochastic:
+            sigma = math.sqrt(max(0.0, flips * (mean_sq - mean * mean))) * scale
+            z = max(-self.MAX_SIGMA, min(self.MAX_SIGMA, self.rng.gauss(0.0, 1.0)))
+            income = max(0.0, income + z * sigma)
+
+        # Жук ворует свою долю с момента появления и до возвращения игрока
+        stolen = 0.0
+        if beetle_delay is not None and beetle_delay < elapsed:
+            share = (elapsed - max(0.0, beetle_delay)) / elapsed
+            stolen = income * share * self.BEETLE_THEFT
+
+        report["income"] = int(income)
+        report["stolen"] = int(stolen)
+        report["kept"] = report["income"] - report["stolen"]
+        return report
@@ -1,10 +1,63 @@
 from logic.assets.sprite_pygame import PygameSprite
+from logic.world.coin_physics import PhysicsField
+from logic.assets.rotation_cache import RotationCache
 import random
 import math
 import pygame
 
 
+class CoinSprite(PygameSprite):
+    """Спрайт монеты: позиция может жить в массивах векторного движка"""
+    _body = None
+
+    center_x = PhysicsField("x")
+    center_y = PhysicsField("y")
+
+    def _apply_scale(self):
+        super()._apply_scale()
+        # Движку нужны полуразмеры для отскоков от стен
+        if self._body is not None:
+            self._body.engine.set_half_extents(self._body, self._width_cache, self._height_cache)
+
+
 class Coin:
+    # Ссылка на слот NumpyCoinPhysics (None - физика считается в Coin.update)
+    _body = None
+
+    vx = PhysicsField()
+    vy = PhysicsField()
+    angle = PhysicsField()
+    angular_velocity = PhysicsField()
+    mass = PhysicsField()
+    radius = PhysicsField()
+    spin_friction = PhysicsField()
+    tornado_exit_time = PhysicsField()
+    wisp_immunity_timer = PhysicsField()
+    is_moving = PhysicsField()
+    tornado_hit = PhysicsField()
+    is_grabbed = PhysicsField()
+    is_fading = PhysicsField()
+    is_sleeping = PhysicsField()
+    prev_x = PhysicsField()
+    prev_y = PhysicsField()
+
+    # Сколько кадров покоя подряд, прежде чем монета уснет
+    SLEEP_FRAMES = 10
+
+    # Общий для всех монет кэш поворотов лежачих монет
+    rotation_cache = RotationCache()
+    # Тени летящих монет по радиусу (радиусов всего несколько - по типам монет)
+    _shadow_cache = {}
+
+    # Позиция монеты - это позиция ее спрайта (так монету можно класть в SpatialHash напрямую)
+    @property
+    def center_x(self):
+        return self.sprite.center_x
+
+    @property
+    def center_y(self):
+        return self.sprite.center_y
+
     def __init__(
             self,
             x: float,
@@ -20,9 +73,12 @@ class Coin:
         self.world_scale = scale_factor
         self.is_grabbed = False
 
-        self.sprite = PygameSprite()
+        self.sprite = CoinSprite()
         self.sprite.center_x = x
         self.sprite.center_y = y
+        # Позиция до последнего шага симуляции (для интерполяции отрисовки)
+        self.prev_x = x
+        self.prev_y = y
 
         # По умолчанию орел
         self.sprite.texture = sprites["heads"]
@@ -82,7 +138,14 @@ class Coin:
         self.MAX_SPEED = 2500.0 * self.world_scale
         self.MAX_ANGULAR_VELOCITY = 25.0
 
-    def update(self, dt: float, width: int, height: int, nearby_coins: list) -> None:
+        # === СОН ===
+        # Спящая монета не обновляется, пока ее не разбудят (клик, удар, торнадо, взрыв, сосед)
+        self.is_sleeping = False
+        self.rest_frames = 0
+        # Реестр активных монет контроллера (dict как упорядоченное множество)
+        self.awake_coins = None
+
+    def update(self, dt: float, width: int, height: int, nearby_coins: list = ()) -> None:
         if self.is_grabbed:
             self.angle += self.angular_velocity * dt
             if abs(self.angular_velocity) > 0.01:
@@ -92,14 +155,8 @@ class Coin:
             return
 
         # --- Угасание ---
-        if self.lifetime is not None and self.lifetime > 0:
-            self.lifetime -= dt
-            if self.lifetime <= self.fade_duration:
-                self.is_fading = True
-                ratio = max(0, self.lifetime / self.fade_duration)
-                self.sprite.alpha = int(255 * ratio)
-            if self.lifetime <= 0:
-                return
+        if not self._update_fade(dt):
+            return
 
         if self.wisp_immunity_timer > 0:
             self.wisp_immunity_timer -= dt
@@ -127,19 +184,7 @@ class Coin:
             self._clamp_speed()
             self._handle_wall_bounce(width, height)
 
-            # Динамическая смена анимации (ТОРНАДО)
-            if self.tornado_hit:
-                self._update_flying_direction_dynamic()
-
-            # Анимация
-            self.anim_timer += dt
-            if self.anim_timer >= self.anim_speed:
-                self.anim_timer = 0
-                self.anim_index += 1
-                if self.anim and self.anim_index < len(self.anim):
-                    self.sprite.texture = self.anim[self.anim_index]
-                else:
-                    self.land()
+            self._update_flight_animation(dt)
 
         # === ЗЕМЛЯ ===
         else:
@@ -174,6 +219,66 @@ class Coin:
 
             self.check_land_event()
 
+    def update_gameplay(self, dt: float) -> None:
+        """
+        Игровая часть update без физики.
+        Используется с NumpyCoinPhysics: движение, трение и стены он уже посчитал пакетно.
+        """
+        if not self._update_fade(dt):
+            return
+        if self.is_moving:
+            self._update_flight_animation(dt)
+
+    def _update_fade(self, dt: float) -> bool:
+        """Тикает время жизни. Возвращает False, если монета уже исчезла"""
+        if self.lifetime is not None and self.lifetime > 0:
+            self.lifetime -= dt
+            if self.lifetime <= self.fade_duration:
+                self.is_fading = True
+                ratio = max(0, self.lifetime / self.fade_duration)
+                self.sprite.alpha = int(255 * ratio)
+            if self.lifetime <= 0:
+                return False
+        return True
+
+    def _update_flight_animation(self, dt: float) -> None:
+        # Динамическая смена анимации (ТОРНАДО)
+        if self.tornado_hit:
+            self._update_flying_direction_dynamic()
+
+        # Анимация
+        self.anim_timer += dt
+        if self.anim_timer >= self.anim_speed:
+            self.anim_timer = 0
+            self.anim_index += 1
+            if self.anim and self.anim_index < len(self.anim):
+                self.sprite.texture = self.anim[self.anim_index]
+            else:
+                self.land()
+
+    # === СОН ===
+    def wake(self) -> None:
+        self.rest_frames = 0
+        if self.is_sleeping:
+            self.is_sleeping = False
+            if self.awake_coins is not None:
+                self.awake_coins[self] = None
+
+    def update_sleep(self) -> bool:
+        """Считает кадры покоя. True - монета только что уснула"""
+        if (self.is_moving or self.is_grabbed or self.tornado_hit or self.is_fading
+                or self.vx or self.vy or self.angular_velocity
+                or self.lifetime is not None
+                or self.wisp_immunity_timer > 0 or self.tornado_exit_time > 0):
+            self.rest_frames = 0
+            return False
+
+        self.rest_frames += 1
+        if self.rest_frames >= self.SLEEP_FRAMES:
+            self.is_sleeping = True
+            return True
+        return False
+
     def land(self) -> None:
         # Если мы в торнадо, не приземляемся, а продолжаем анимацию
         if self.tornado_hit:
@@ -206,8 +311,7 @@ class Coin:
             if not self.is_grabbed:
                 shadow_scale = 1.15
                 shadow_radius = int(self.radius * shadow_scale)
-                shadow_surf = pygame.Surface((shadow_radius * 2, shadow_radius * 2), pygame.SRCALPHA)
-                pygame.draw.circle(shadow_surf, (0, 0, 0, 60), (shadow_radius, shadow_radius), shadow_radius)
+                shadow_surf = self._get_shadow(shadow_radius)
 
                 offset = 15
                 shadow_center_y = (screen_height - self.sprite.center_y) + offset
@@ -218,13 +322,59 @@ class Coin:
             self.sprite.draw(surface, screen_height)
 
         else:
-            # ЗЕМЛЯ (Вращение)
-            base_texture = self.sprite.texture
-            angle_degrees = math.degrees(self.angle)
-            rotated_texture = pygame.transform.rotate(base_texture, angle_degrees)
+            # ЗЕМЛЯ (Вращение): готовый поворот из кэша, без нового rotate каждый кадр
+            rotated_texture = self.get_ground_texture()
             rect = rotated_texture.get_rect()
             rect.center = (self.sprite.center_x, screen_height - self.sprite.center_y)
-            surface.blit(rotated_texture, rect)
+            if self.sprite.alpha < 255:
+                # Текстура общая (кэш поворотов): прозрачность только на время блита
+                old_alpha = rotated_texture.get_alpha()
+                rotated_texture.set_alpha(self.sprite.alpha)
+                surface.blit(rotated_texture, rect)
+                rotated_texture.set_alpha(old_alpha)
+            else:
+                surface.blit(rotated_texture, rect)
+
+    def submit(self, queue, camera, back: float = 0.0) -> None:
+        """
+        То же, что draw, но через очередь: лежащие монеты - слой RESTING, летящие - SHADOWS + FLYING.
+        back - доля отката к предыдущей позиции (интерполяция), сама монета не сдвигается.
+        """
+        sprite = self.sprite
+        x = sprite.center_x
+        y = sprite.center_y
+        if back > 0:
+            x += (self.prev_x - x) * back
+            y += (self.prev_y - y) * back
+
+        if self.is_moving:
+            if not self.is_grabbed:
+                shadow_radius = int(self.radius * 1.15)
+                screen_x, screen_y = camera.to_screen(x, y)
+                queue.submit(self._get_shadow(shadow_radius),
+                             (int(screen_x - shadow_radius), int(screen_y + 15 - shadow_radius)),
+                             queue.LAYER_SHADOWS)
+            sprite.submit(queue, camera, queue.LAYER_FLYING, (x, y))
+        else:
+            rotated_texture = self.get_ground_texture()
+            rect = rotated_texture.get_rect()
+            rect.center = camera.to_screen(x, y)
+            # Прозрачность затухания применит очередь на время блита - общую текстуру не копируем
+            queue.submit(rotated_texture, rect, queue.LAYER_RESTING, alpha=sprite.alpha)
+
+    def get_ground_texture(self) -> pygame.Surface:
+        """Текстура лежачей монеты, повернутая на ее угол (общая, из кэша поворотов)"""
+        return self.rotation_cache.get(self.sprite, self.angle)
+
+    @classmethod
+    def _get_shadow(cls, shadow_radius: int) -> pygame.Surface:
+        """Тень нужного радиуса: рисуется один раз, дальше общая для всех монет"""
+        shadow_surf = cls._shadow_cache.get(shadow_radius)
+        if shadow_surf is None:
+            shadow_surf = pygame.Surface((shadow_radius * 2, shadow_radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(shadow_surf, (0, 0, 0, 60), (shadow_radius, shadow_radius), shadow_radius)
+            cls._shadow_cache[shadow_radius] = shadow_surf
+        return shadow_surf
 
     def hit_by_coin(self, source_coin, nx, ny) -> None:
         # === ФИЗИКА МАССЫ (ИМПУЛЬС) ===
@@ -240,6 +390,7 @@ class Coin:
 
         push_force = base_push / self.mass
 
+        self.wake()
         self.vx = nx * push_force
         self.vy = ny * push_force
 
@@ -254,6 +405,7 @@ class Coin:
         # Защита для спец-монет
         if hasattr(self, 'is_used') and self.is_used: return
 
+        self.wake()
         self.is_moving = True
         self.vx = 0
         self.vy = 0.0
@@ -334,71 +486,96 @@ class Coin:
             self.anim_index = 0
 
     def _handle_collisions(self, nearby_coins):
+        """Старый путь: столкновения одной монеты с соседями (пара решается с обеих сторон)"""
         for other in nearby_coins:
-            if other is self: continue
+            if other is self or other is None: continue
             # ИСПРАВЛЕНО: Если другая монетка летит - мы её не трогаем (физика только для лежачих)
             if other.is_moving: continue
-
-            # Проверка на None (безопасность)
-            if other is None: continue
-
-            dx = self.sprite.center_x - other.sprite.center_x
-            dy = self.sprite.center_y - other.sprite.center_y
-            dist_sq = dx * dx + dy * dy
-            min_dist = self.radius + other.radius
-
-            if dist_sq < (min_dist * min_dist) and dist_sq > 0:
-                dist = math.sqrt(dist_sq)
-                overlap = min_dist - dist
-                nx = dx / dist
-                ny = dy / dist
-
-                # === НОВОЕ: МАССА (РАЗДЕЛЕНИЕ) ===
-                total_mass = self.mass + other.mass
-                # Легкую монету отталкивает сильнее
-                ratio_self = other.mass / total_mass
-                ratio_other = self.mass / total_mass
-
-                # 1. Раздвигаем
-                max_instant_sep = 2.0
-                sep_mag = min(overlap * 0.5, max_instant_sep)
-                self.sprite.center_x += sep_mag * nx * ratio_self
-                self.sprite.center_y += sep_mag * ny * ratio_self
-                other.sprite.center_x -= sep_mag * nx * ratio_other
-                other.sprite.center_y -= sep_mag * ny * ratio_other
-
-                # 2. Импульс отталкивания
-                stiffness = 4.8
-                push = overlap * stiffness
-
-                # Сила толчка зависит от массы того, кто толкает? Или просто упругость?
-                # Упругая деформация:
-                self.vx += (nx * push * ratio_self) / self.mass
-                self.vy += (ny * push * ratio_self) / self.mass
-                other.vx -= (nx * push * ratio_other) / other.mass
-                other.vy -= (ny * push * ratio_other) / other.mass
-
-                # 3. ФИЗИКА ВРАЩЕНИЯ
-                dvx = self.vx - other.vx
-                dvy = self.vy - other.vy
-                tx = -ny
-                ty = nx
-                vel_along_tangent = dvx * tx + dvy * ty
-                spin_impulse = vel_along_tangent * 0.01
-
-                self.angular_velocity += spin_impulse
-                other.angular_velocity -= spin_impulse
-
-                impact_speed = math.sqrt(dvx ** 2 + dvy ** 2)
-
-                if impact_speed < 40.0:
-                    self.angular_velocity *= 0.5
-                    other.angular_velocity *= 0.5
-
-                self.angular_velocity = max(-self.MAX_ANGULAR_VELOCITY,
-                                            min(self.MAX_ANGULAR_VELOCITY, self.angular_velocity))
-                other.angular_velocity = max(-self.MAX_ANGULAR_VELOCITY,
-                                             min(self.MAX_ANGULAR_VELOCITY, other.angular_velocity))
+            contact = self._make_contact(self, other)
+            if contact is not None:
+                self._resolve_contact(*contact)
+
+    # === СТОЛКНОВЕНИЯ ПАРАМИ ===
+    @staticmethod
+    def _make_contact(a, b):
+        """Контакт (a, b, nx, ny, overlap) или None, если монеты не пересекаются"""
+        dx = a.sprite.center_x - b.sprite.center_x
+        dy = a.sprite.center_y - b.sprite.center_y
+        dist_sq = dx * dx + dy * dy
+        min_dist = a.radius + b.radius
+
+        if dist_sq < (min_dist * min_dist) and dist_sq > 0:
+            dist = math.sqrt(dist_sq)
+            return (a, b, dx / dist, dy / dist, min_dist - dist)
+        return None
+
+    @staticmethod
+    def collect_contacts(pairs, contacts: list) -> list:
+        """
+        Узкая фаза: каждая пара-кандидат (из SpatialHash.candidate_pairs) проверяется один раз.
+        Физика только для лежачих монет. Контакты дописываются в плоский список contacts.
+        """
+        make_contact = Coin._make_contact
+        for a, b in pairs:
+            if a.is_moving or b.is_moving: continue
+            contact = make_contact(a, b)
+            if contact is not None:
+                contacts.append(contact)
+        return contacts
+
+    @staticmethod
+    def resolve_contacts(contacts: list) -> None:
+        """Разделение, импульс и вращение для всех контактов за один проход"""
+        resolve = Coin._resolve_contact
+        for contact in contacts:
+            resolve(*contact)
+
+    @staticmethod
+    def _resolve_contact(a, b, nx, ny, overlap):
+        # === НОВОЕ: МАССА (РАЗДЕЛЕНИЕ) ===
+        total_mass = a.mass + b.mass
+        # Легкую монету отталкивает сильнее
+        ratio_a = b.mass / total_mass
+        ratio_b = a.mass / total_mass
+
+        # 1. Раздвигаем
+        max_instant_sep = 2.0
+        sep_mag = min(overlap * 0.5, max_instant_sep)
+        a.sprite.center_x += sep_mag * nx * ratio_a
+        a.sprite.center_y += sep_mag * ny * ratio_a
+        b.sprite.center_x -= sep_mag * nx * ratio_b
+        b.sprite.center_y -= sep_mag * ny * ratio_b
+
+        # 2. Импульс отталкивания
+        stiffness = 4.8
+        push = overlap * stiffness
+
+        # Упругая деформация:
+        a.vx += (nx * push * ratio_a) / a.mass
+        a.vy += (ny * push * ratio_a) / a.mass
+        b.vx -= (nx * push * ratio_b) / b.mass
+        b.vy -= (ny * push * ratio_b) / b.mass
+
+        # 3. ФИЗИКА ВРАЩЕНИЯ
+        dvx = a.vx - b.vx
+        dvy = a.vy - b.vy
+        tx = -ny
+        ty = nx
+        vel_along_tangent = dvx * tx + dvy * ty
+        spin_impulse = vel_along_tangent * 0.01
+
+        a.angular_velocity += spin_impulse
+        b.angular_velocity -= spin_impulse
+
+        impact_speed = math.sqrt(dvx ** 2 + dvy ** 2)
+
+        if impact_speed < 40.0:
+            a.angular_velocity *= 0.5
+            b.angular_velocity *= 0.5
+
+        max_av = a.MAX_ANGULAR_VELOCITY
+        a.angular_velocity = max(-max_av, min(max_av, a.angular_velocity))
+        b.angular_velocity = max(-max_av, min(max_av, b.angular_velocity))
 
     def _clamp_speed(self):
         current_speed_sq = self.vx * self.vx + self.vy * self.vy
@@ -0,0 +1,526 @@
+"""
+Векторный физический движок монет (structure-of-arrays на NumPy).
+
+Физическое состояние всех монет лежит в плоских массивах numpy, а объекты Coin
+остаются тонкими "видами" на свой слот: поля vx, vy, angle, center_x и т.д.
+читаются и пишутся прямо в массивы через дескриптор PhysicsField.
+Без движка (обычный путь Coin.update) поля хранятся в __dict__ монеты как раньше.
+"""
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+
+def choose_backend(physics_backend: str, max_coins: int) -> str:
+    """
+    "auto" -> "numpy" только если numpy есть и монет может быть не меньше
+    NumpyCoinPhysics.AUTO_MIN_COINS, иначе "python". Явный выбор возвращается как есть.
+    """
+    if physics_backend != "auto":
+        return physics_backend
+    if HAS_NUMPY and max_coins >= NumpyCoinPhysics.AUTO_MIN_COINS:
+        return "numpy"
+    return "python"
+
+
+class PhysicsField:
+    """
+    Дескриптор физического поля монеты.
+    Если монета привязана к движку (obj._body не None) - значение живет в массиве движка,
+    иначе - в обычном __dict__ объекта.
+    """
+
+    def __init__(self, array_name: str = None):
+        self.array_name = array_name
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        if self.array_name is None:
+            self.array_name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        body = obj._body
+        if body is None:
+            return obj.__dict__[self.name]
+        return body.engine.arrays[self.array_name][body.slot].item()
+
+    def __set__(self, obj, value):
+        body = obj._body
+        if body is None:
+            obj.__dict__[self.name] = value
+        else:
+            body.engine.arrays[self.array_name][body.slot] = value
+
+
+class CoinBody:
+    """Ссылка монеты на ее слот в массивах движка (слот меняется при удалении соседей)"""
+    __slots__ = ("engine", "slot")
+
+    def __init__(self, engine, slot: int):
+        self.engine = engine
+        self.slot = slot
+
+
+class NumpyCoinPhysics:
+    """
+    Пакетная физика монет: интегрирование, трение, ограничение скорости,
+    отскоки от стен и столкновения лежачих монет - одними операциями над массивами.
+    Игровая логика (анимация, приземление, выигрыш) остается в Coin.update_gameplay
+    и вызывается только для монет, которым она нужна в этом кадре.
+    """
+
+    # Поле монеты -> имя массива в движке
+    COIN_FIELDS = {
+        "vx": "vx", "vy": "vy",
+        "angle": "angle", "angular_velocity": "angular_velocity",
+        "mass": "mass", "radius": "radius",
+        "spin_friction": "spin_friction",
+        "tornado_exit_time": "tornado_exit_time",
+        "wisp_immunity_timer": "wisp_immunity_timer",
+        "is_moving": "is_moving", "tornado_hit": "tornado_hit",
+        "is_grabbed": "is_grabbed", "is_fading": "is_fading",
+        "is_sleeping": "is_sleeping",
+        "prev_x": "prev_x", "prev_y": "prev_y",
+    }
+    SPRITE_FIELDS = {"center_x": "x", "center_y": "y"}
+    BOOL_ARRAYS = ("is_moving", "tornado_hit", "is_grabbed", "is_fading", "is_sleeping")
+
+    # Константы те же, что в Coin.update / Coin._handle_collisions
+    GROUND_FRICTION = 0.93
+    TORNADO_EXIT_FRICTION = 0.985
+    TORNADO_GROUND_FRICTION = 0.96
+    AIR_FRICTION = 0.995
+    STOP_SPEED = 0.5
+    LIFTOFF_SPEED = 30.0
+    MAX_SEPARATION = 2.0
+    STIFFNESS = 4.8
+    MAX_ANGULAR_VELOCITY = 25.0
+
+    # С какого числа монет пакетный шаг обгоняет Coin.update по одной монете
+    # (python -m logic.controllers.headless 10 <backend> N: 200 монет - 1.1..1.4 мс против 1.3,
+    # 250 - 1.5..2.6 против 1.5..1.8, 300 - 3.1..3.7 против 1.8). Ниже - накладные расходы numpy дороже
+    AUTO_MIN_COINS = 250
+
+    def __init__(self, capacity: int = 256) -> None:
+        if not HAS_NUMPY:
+            raise RuntimeError("NumpyCoinPhysics requires numpy")
+        self.count = 0
+        self.capacity = 0
+        self.coins = []  # Монеты в порядке слотов
+        self.arrays = {}
+        self.last_contact_count = 0
+        self._grow(max(1, capacity))
+
+    # --- Управление слотами ---
+    def _all_array_names(self):
+        names = set(self.COIN_FIELDS.values()) | set(self.SPRITE_FIELDS.values())
+        names.update(("half_w", "half_h", "max_speed", "cell_x", "cell_y"))
+        return names
+
+    def _grow(self, new_capacity: int) -> None:
+        for name in self._all_array_names():
+            dtype = np.bool_ if name in self.BOOL_ARRAYS else np.float64
+            new_arr = np.zeros(new_capacity, dtype=dtype)
+            old_arr = self.arrays.get(name)
+            if old_arr is not None:
+                new_arr[:self.count] = old_arr[:self.count]
+            self.arrays[name] = new_arr
+        self.capacity = new_capacity
+
+    def attach(self, coin) -> None:
+        if coin._body is not None:
+            return
+        if self.count >= self.capacity:
+            self._grow(self.capacity * 2)
+
+        slot = self.count
+        arrays = self.arrays
+        for field, array_name in self.COIN_FIELDS.items():
+            arrays[array_name][slot] = coin.__dict__[field]
+        sprite = coin.sprite
+        for field, array_name in self.SPRITE_FIELDS.items():
+            arrays[array_name][slot] = sprite.__dict__[field]
+        arrays["half_w"][slot] = sprite.width / 2
+        arrays["half_h"][slot] = sprite.height / 2
+        arrays["max_speed"][slot] = coin.MAX_SPEED
+        # NaN - ячейка еще не известна, первый cell_changes вернет монету
+        arrays["cell_x"][slot] = np.nan
+        arrays["cell_y"][slot] = np.nan
+
+        body = CoinBody(self, slot)
+        coin._body = body
+        sprite._body = body
+        self.coins.append(coin)
+        self.count += 1
+
+    def detach(self, coin) -> None:
+        body = coin._body
+        if body is None or body.engine is not self:
+            return
+
+        # Возвращаем значения в __dict__, чтобы монета жила дальше и без движка
+        slot = body.slot
+        arrays = self.arrays
+        coin._body = None
+        coin.sprite._body = None
+        for field, array_name in self.COIN_FIELDS.items():
+            coin.__dict__[field] = arrays[array_name][slot].item()
+        for field, array_name in self.SPRITE_FIELDS.items():
+            coin.sprite.__dict__[field] = arrays[array_name][slot].item()
+
+        # Swap-remove: последний слот переезжает на место удаленного
+        last = self.count - 1
+        if slot != last:
+            for arr in arrays.values():
+                arr[slot] = arr[last]
+            moved = self.coins[last]
+            moved._body.slot = slot
+            self.coins[slot] = moved
+        self.coins.pop()
+        self.count -= 1
+
+    def clear(self) -> None:
+        for coin in self.coins[::-1]:
+            self.detach(coin)
+
+    def set_half_extents(self, body: CoinBody, width: float, height: float) -> None:
+        """Вызывается спрайтом монеты при смене текстуры/масштаба"""
+        self.arrays["half_w"][body.slot] = width / 2
+        self.arrays["half_h"][body.slot] = height / 2
+
+    def slots_of(self, coins) -> "np.ndarray":
+        """Индексы слотов для списка привязанных к движку монет"""
+        return np.fromiter((coin._body.slot for coin in coins), dtype=np.intp, count=len(coins))
+
+    def reset_cells(self) -> None:
+        """Забыть запомненные ячейки (после SpatialHash.rebuild с другим размером ячейки)"""
+        n = self.count
+        self.arrays["cell_x"][:n] = np.nan
+        self.arrays["cell_y"][:n] = np.nan
+
+    def cell_changes(self, cell_size: float) -> list:
+        """Монеты, сменившие ячейку сетки размера cell_size с прошлого вызова"""
+        n = self.count
+        if n == 0:
+            return []
+        arrays = self.arrays
+        cx = np.floor(arrays["x"][:n] / cell_size)
+        cy = np.floor(arrays["y"][:n] / cell_size)
+        changed = np.flatnonzero((cx != arrays["cell_x"][:n]) | (cy != arrays["cell_y"][:n]))
+        if changed.size == 0:
+            return []
+        arrays["cell_x"][changed] = cx[changed]
+        arrays["cell_y"][changed] = cy[changed]
+        coins = self.coins
+        return [coins[i] for i in changed.tolist()]
+
+    def store_previous_positions(self) -> None:
+        """Запоминает позиции перед шагом - для интерполяции отрисовки"""
+        n = self.count
+        self.arrays["prev_x"][:n] = self.arrays["x"][:n]
+        self.arrays["prev_y"][:n] = self.arrays["y"][:n]
+
+    # --- Шаг симуляции ---
+    def step(self, dt: float, width: float, height: float) -> list:
+        """
+        Пакетный физический шаг для всех неспящих монет.
+        Возвращает список активных монет (не спят и не захвачены) -
+        им в этом кадре нужна игровая логика и проверка сна.
+        """
+        n = self.count
+        if n == 0:
+            self.last_contact_count = 0
+            return []
+
+        a = self.arrays
+        x = a["x"][:n]
+        y = a["y"][:n]
+        vx = a["vx"][:n]
+        vy = a["vy"][:n]
+        angle = a["angle"][:n]
+        av = a["angular_velocity"][:n]
+        moving = a["is_moving"][:n]
+        tornado_hit = a["tornado_hit"][:n]
+        grabbed = a["is_grabbed"][:n]
+        wisp_timer = a["wisp_immunity_timer"][:n]
+        exit_time = a["tornado_exit_time"][:n]
+        sleeping = a["is_sleeping"][:n]
+
+        free = ~grabbed & ~sleeping
+
+        # --- Таймеры ---
+        timed = wisp_timer > 0
+        if timed.any():
+            wisp_timer[timed] = np.maximum(wisp_timer[timed] - dt, 0.0)
+
+        # --- Захваченные: не двигаются, но докручиваются с затуханием (как в Coin.update) ---
+        if grabbed.any():
+            angle[grabbed] += av[grabbed] * dt
+            held_spin = grabbed & (np.abs(av) > 0.01)
+            av[held_spin] *= 0.90
+            av[grabbed & ~held_spin] = 0.0
+
+        # --- Торнадо: переход в полет ---
+        lift = free & ~moving & tornado_hit & ((vx * vx + vy * vy) > self.LIFTOFF_SPEED ** 2)
+        lift_idx = np.flatnonzero(lift)
+        if lift_idx.size:
+            moving[lift_idx] = True
+            for i in lift_idx:
+                self.coins[i]._select_flying_animation()
+
+        fly = free & moving
+        ground = free & ~moving
+
+        # --- Полет ---
+        if fly.any():
+            x[fly] += vx[fly] * dt
+            y[fly] += vy[fly] * dt
+            air = fly & ~tornado_hit
+            vx[air] *= self.AIR_FRICTION
+            vy[air] *= self.AIR_FRICTION
+            self._clamp_speed(fly)
+            self._wall_bounce(fly, width, height)
+
+        # --- Земля ---
+        if ground.any():
+            exiting = ground & (exit_time > 0)
+            friction = np.where(exiting, self.TORNADO_EXIT_FRICTION, self.GROUND_FRICTION)
+            friction[tornado_hit] = self.TORNADO_GROUND_FRICTION
+            exit_time[exiting] -= dt
+
+            vx[ground] *= friction[ground]
+            vy[ground] *= friction[ground]
+            vx[ground & (np.abs(vx) < self.STOP_SPEED)] = 0.0
+            vy[ground & (np.abs(vy) < self.STOP_SPEED)] = 0.0
+
+            x[ground] += vx[ground] * dt
+            y[ground] += vy[ground] * dt
+
+            angle[ground] += av[ground] * dt
+            spinning = ground & (np.abs(av) > 0.01)
+            av[spinning] *= a["spin_friction"][:n][spinning]
+            av[ground & ~spinning] = 0.0
+
+            # Захваченная монета не двигается сама, но расталкивает соседей;
+            # спящие участвуют только как соседи активных
+            self._resolve_collisions(~moving & ~sleeping, ~moving & sleeping)
+            self._wall_bounce(ground & ~tornado_hit, width, height)
+        else:
+            self.last_contact_count = 0
+
+        # Столкновения могли разбудить спящих соседей
+        active = np.flatnonzero(~grabbed & ~sleeping)
+        coins = self.coins
+        return [coins[i] for i in active]
+
+    def _clamp_speed(self, mask) -> None:
+        n = self.count
+        vx = self.arrays["vx"][:n]
+        vy = self.arrays["vy"][:n]
+        max_speed = self.arrays["max_speed"][:n]
+        speed_sq = vx * vx + vy * vy
+        over = mask & (speed_sq > max_speed * max_speed)
+        if over.any():
+            ratio = max_speed[over] / np.sqrt(speed_sq[over])
+            vx[over] *= ratio
+            vy[over] *= ratio
+
+    def _wall_bounce(self, mask, width: float, height: float) -> None:
+        if not mask.any():
+            return
+        n = self.count
+        a = self.arrays
+        x = a["x"][:n]
+        y = a["y"][:n]
+        vx = a["vx"][:n]
+        vy = a["vy"][:n]
+        hw = a["half_w"][:n]
+        hh = a["half_h"][:n]
+
+        direction = np.sign(vx)
+
+        hit_left = mask & (x - hw < 0)
+        hit_right = mask & ~hit_left & (x + hw > width)
+        hit_bottom = mask & (y - hh < 0)
+        hit_top = mask & ~hit_bottom & (y + hh > height)
+
+        x[hit_left] = hw[hit_left]
+        x[hit_right] = width - hw[hit_right]
+        vx[hit_left | hit_right] *= -0.5
+        y[hit_bottom] = hh[hit_bottom]
+        y[hit_top] = height - hh[hit_top]
+        vy[hit_bottom | hit_top] *= -0.5
+
+        spin = (hit_left | hit_right | hit_bottom | hit_top) & (np.abs(vx) > 10)
+        if spin.any():
+            a["angular_velocity"][:n][spin] += 1.5 * direction[spin]
+
+    # --- Столкновения ---
+    def _candidate_pairs(self, idx, resting):
+        """
+        Broadphase на сортировке по ячейкам сетки: каждая пара кандидатов один раз.
+        idx - активные монеты: между собой смотрим свою ячейку (только соседей дальше
+        по порядку) и 4 ячейки "вперед".
+        resting - спящие монеты: для них отдельная сортировка, и каждая активная монета
+        ищет в ней все 9 соседних ячеек. Пары "спящая - спящая" не строятся вовсе.
+        """
+        a = self.arrays
+        both = np.concatenate((idx, resting))
+        cell = max(2.0 * float(a["radius"][both].max()), 1.0)
+
+        # Сдвиг делает индексы ячеек неотрицательными, span разделяет столбцы
+        cx = np.floor(a["x"][both] / cell).astype(np.int64) + 2
+        cy = np.floor(a["y"][both] / cell).astype(np.int64) + 2
+        span = int(cy.max()) + 3
+        keys = cx * span + cy
+        active_keys = keys[:idx.size]
+        resting_keys = keys[idx.size:]
+
+        order = np.argsort(active_keys, kind="stable")
+        sorted_keys = active_keys[order]
+        positions = np.arange(order.size)
+
+        first_parts = []
+        second_parts = []
+
+        def collect(query_keys, offsets, table, table_order, skip_self):
+            for ox, oy in offsets:
+                target = query_keys + (ox * span + oy)
+                start = np.searchsorted(table, target, side="left")
+                end = np.searchsorted(table, target, side="right")
+                if skip_self and ox == 0 and oy == 0:
+                    start = np.maximum(start, positions + 1)
+                counts = np.maximum(end - start, 0)
+                total = int(counts.sum())
+                if total == 0:
+                    continue
+                first = np.repeat(positions, counts)
+                shift = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+                second = np.repeat(start, counts) + shift
+                first_parts.append(idx[order[first]])
+                second_parts.append(table_order[second])
+
+        collect(sorted_keys, ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)), sorted_keys, idx[order], True)
+        if resting.size:
+            resting_order = np.argsort(resting_keys, kind="stable")
+            collect(sorted_keys, [(ox, oy) for ox in (-1, 0, 1) for oy in (-1, 0, 1)],
+                    resting_keys[resting_order], resting[resting_order], False)
+
+        if not first_parts:
+            return None, None
+        return np.concatenate(first_parts), np.concatenate(second_parts)
+
+    def _resolve_collisions(self, active, resting) -> None:
+        """
+        active - монеты, которые сейчас двигаются (или захвачены и расталкивают соседей),
+        resting - спящие монеты на земле: проверяются только рядом с активными
+        """
+        self.last_contact_count = 0
+        idx = np.flatnonzero(active)
+        if idx.size == 0:
+            return
+
+        n = self.count
+        a = self.arrays
+
+        # Спящие берем только из рамки вокруг активных: остальная доска в broadphase не попадает
+        near = np.flatnonzero(resting)
+        if near.size:
+            reach = 2.0 * float(a["radius"][:n].max())
+            x_act = a["x"][idx]
+            y_act = a["y"][idx]
+            xs = a["x"][near]
+            ys = a["y"][near]
+            inside = ((xs > x_act.min() - reach) & (xs < x_act.max() + reach)
+                      & (ys > y_act.min() - reach) & (ys < y_act.max() + reach))
+            near = near[inside]
+        if idx.size + near.size < 2:
+            return
+
+        i, j = self._candidate_pairs(idx, near)
+        if i is None:
+            return
+
+        sleeping = a["is_sleeping"][:n]
+
+        x = a["x"][:n]
+        y = a["y"][:n]
+        vx = a["vx"][:n]
+        vy = a["vy"][:n]
+        av = a["angular_velocity"][:n]
+        mass = a["mass"][:n]
+        radius = a["radius"][:n]
+
+        dx = x[i] - x[j]
+        dy = y[i] - y[j]
+        dist_sq = dx * dx + dy * dy
+        min_dist = radius[i] + radius[j]
+        hit = (dist_sq < min_dist * min_dist) & (dist_sq > 0)
+        if not hit.any():
+            return
+
+        i = i[hit]
+        j = j[hit]
+        dx = dx[hit]
+        dy = dy[hit]
+        min_dist = min_dist[hit]
+        self.last_contact_count = int(i.size)
+
+        # Задетые спящие монеты просыпаются (wake() вернет их в реестр контроллера)
+        woken = np.unique(np.concatenate((i[sleeping[i]], j[sleeping[j]])))
+        for k in woken.tolist():
+            self.coins[k].wake()
+
+        dist = np.sqrt(dist_sq[hit])
+        overlap = min_dist - dist
+        nx = dx / dist
+        ny = dy / dist
+
+        mi = mass[i]
+        mj = mass[j]
+        total_mass = mi + mj
+        ratio_i = mj / total_mass
+        ratio_j = mi / total_mass
+
+        # 1. Раздвигаем
+        sep = np.minimum(overlap * 0.5, self.MAX_SEPARATION)
+        np.add.at(x, i, sep * nx * ratio_i)
+        np.add.at(y, i, sep * ny * ratio_i)
+        np.add.at(x, j, -sep * nx * ratio_j)
+        np.add.at(y, j, -sep * ny * ratio_j)
+
+        # 2. Импульс отталкивания
+        push = overlap * self.STIFFNESS
+        dvx_i = nx * push * ratio_i / mi
+        dvy_i = ny * push * ratio_i / mi
+        dvx_j = -nx * push * ratio_j / mj
+        dvy_j = -ny * push * ratio_j / mj
+
+        # 3. Вращение (по скоростям после толчка, как в Coin._handle_collisions)
+        rel_vx = (vx[i] + dvx_i) - (vx[j] + dvx_j)
+        rel_vy = (vy[i] + dvy_i) - (vy[j] + dvy_j)
+        spin_impulse = (rel_vx * -ny + rel_vy * nx) * 0.01
+
+        np.add.at(vx, i, dvx_i)
+        np.add.at(vy, i, dvy_i)
+        np.add.at(vx, j, dvx_j)
+        np.add.at(vy, j, dvy_j)
+        np.add.at(av, i, spin_impulse)
+        np.add.at(av, j, -spin_impulse)
+
+        slow = np.sqrt(rel_vx * rel_vx + rel_vy * rel_vy) < 40.0
+        if slow.any():
+            damp = np.ones(n)
+            np.multiply.at(damp, i[slow], 0.5)
+            np.multiply.at(damp, j[slow], 0.5)
+            av *= damp
+
+        touched = np.concatenate((i, j))
+        av[touched] = np.clip(av[touched], -self.MAX_ANGULAR_VELOCITY, self.MAX_ANGULAR_VELOCITY)
@@ -194,8 +194,14 @@ class Beetle(PygameSprite):
         if self.is_dying and self.color[3] <= 0:
             return
 
-        # Применяем прозрачность
-        self._image.set_alpha(self.color[3])
+        # Применяем прозрачность (на время отрисовки, текстура общая)
+        self.alpha = self.color[3]
 
         # Рисуем через родительский класс
-        super().draw(surface, screen_height)
\ No newline at end of file
+        super().draw(surface, screen_height)
+
+    def submit(self, queue, camera, layer, center=None) -> None:
+        if self.is_dying and self.color[3] <= 0:
+            return
+        self.alpha = self.color[3]
+        super().submit(queue, camera, layer, center)
\ No newline at end of file
@@ -1,6 +1,7 @@
 import pygame
 import math
 import random
+from logic.assets.font_manager import fonts
 
 class MultiplyZone:
     """
@@ -25,7 +26,11 @@ class MultiplyZone:
         self.color = color
 
         # Шрифт для отрисовки
-        self.font = pygame.font.SysFont("arial", 16, bold=True)
+        self.font = fonts.get(fonts.SYSTEM_FONT, 16, bold=True)
+
+        # Готовая поверхность зоны и параметры, с которыми она нарисована
+        self._surface = None
+        self._surface_key = None
 
     def update(self, dt: float, screen_width: int, screen_height: int) -> None:
         # Движение
@@ -71,8 +76,21 @@ class MultiplyZone:
         draw_x = self.x - self.width / 2
         draw_y = screen_height - (self.y + self.height / 2)
 
-        # Создаем временную поверхность для прозрачности
-        temp_surface = pygame.Surface((int(self.width), int(self.height)), pygame.SRCALPHA)
+        # Рисуем готовую поверхность на главном экране
+        surface.blit(self._get_surface(), (draw_x, draw_y))
+
+    def submit(self, queue, camera, layer) -> None:
+        surface = self._get_surface()
+        queue.submit(surface, camera.top_left(self.x, self.y, self.width, self.height), layer)
+
+    def _get_surface(self):
+        """Поверхность зоны перерисовывается только при смене размера, множителя или цвета"""
+        key = (int(self.width), int(self.height), self.multiplier, self.color)
+        if self._surface_key == key:
+            return self._surface
+
+        # Поверхность с прозрачностью
+        temp_surface = pygame.Surface((key[0], key[1]), pygame.SRCALPHA)
 
         # Заполняем цветом (прозрачность 25/255)
         fill_color = (self.color[0], self.color[1], self.color[2], 25)
@@ -87,8 +105,9 @@ class MultiplyZone:
         text_rect = text_surf.get_rect(center=(self.width / 2, self.height / 2))
         temp_surface.blit(text_surf, text_rect)
 
-        # Рисуем временную поверхность на главном экране
-        surface.blit(temp_surface, (draw_x, draw_y))
+        self._surface = temp_surface
+        self._surface_key = key
+        return temp_surface
 
     def check_collision(self, coin) -> bool:
         """Проверяет, находится ли центр монетки внутри зоны"""
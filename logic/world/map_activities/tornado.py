@@ -2,6 +2,11 @@ import pygame
 import math
 from logic.assets.sprite_pygame import PygameSprite
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class Tornado(PygameSprite):
     def __init__(self, x: float, y: float, textures: list, sound, scale: float = 1.0, world_scale: float = 1.0,
@@ -37,6 +42,9 @@ class Tornado(PygameSprite):
 
         self.fade_duration = 0.5
 
+        # Монеты, которые сейчас в воронке (tornado_hit выставлен этим торнадо)
+        self.captured = {}
+
     def update(self, dt: float) -> bool:
         self.timer += dt
 
@@ -58,6 +66,68 @@ class Tornado(PygameSprite):
             return False
         return True
 
+    def affect_coins(self, candidates, dt, physics=None) -> None:
+        """
+        Поле торнадо для всех монет разом.
+        candidates - монеты из пространственного запроса по pull_radius; к ним добавляются
+        ранее захваченные (их нужно отпустить, если они вылетели из воронки).
+        С NumpyCoinPhysics силы считаются одним векторным проходом по массивам движка.
+        """
+        coins = list(candidates)
+        seen = set(coins)
+        for coin in self.captured:
+            if coin not in seen:
+                coins.append(coin)
+        if not coins:
+            return
+
+        if physics is not None and np is not None:
+            self._affect_coins_vectorized(coins, dt, physics)
+        else:
+            for coin in coins:
+                self.affect_coin(coin, dt)
+
+        self.captured = {coin: None for coin in coins if coin.tornado_hit}
+
+    def _affect_coins_vectorized(self, coins, dt, physics) -> None:
+        a = physics.arrays
+        slots = physics.slots_of(coins)
+
+        dx = self.center_x - a["x"][slots]
+        dy = self.bottom - a["y"][slots]
+        dist_sq = dx * dx + dy * dy
+        free = a["wisp_immunity_timer"][slots] <= 0
+        inside = free & (dist_sq < self.pull_radius * self.pull_radius)
+
+        # --- Затягивание ---
+        pulled = slots[inside]
+        if pulled.size:
+            dist = np.sqrt(dist_sq[inside])
+            dist[dist == 0] = 0.001
+            nx = dx[inside] / dist
+            ny = dy[inside] / dist
+
+            progress = 1.0 - (dist / self.pull_radius)
+            # Тяжелые монеты всасываются медленнее (сила делится на массу)
+            mass_factor = 1.0 / a["mass"][pulled]
+            pull_force = self.pull_strength * progress * mass_factor
+            spin_force = self.spin_strength * progress * mass_factor
+
+            a["vx"][pulled] += (nx * pull_force - ny * spin_force) * dt
+            a["vy"][pulled] += (ny * pull_force + nx * spin_force) * dt
+            a["tornado_hit"][pulled] = True
+
+            # Спящие монеты в воронке просыпаются
+            for k in np.flatnonzero(inside & a["is_sleeping"][slots]).tolist():
+                coins[k].wake()
+
+        # --- Вылетевшие из воронки ---
+        released = slots[free & ~inside & a["tornado_hit"][slots]]
+        if released.size:
+            a["tornado_hit"][released] = False
+            a["vx"][released] *= 0.8
+            a["vy"][released] *= 0.8
+
     def affect_coin(self, coin, dt):
         if not hasattr(coin, 'vx'): return
         if coin.wisp_immunity_timer > 0: return
@@ -86,6 +156,7 @@ class Tornado(PygameSprite):
             pull_force = self.pull_strength * progress * mass_factor
             spin_force = self.spin_strength * progress * mass_factor
 
+            coin.wake()
             coin.vx += (nx * pull_force - ny * spin_force) * dt
             coin.vy += (ny * pull_force + nx * spin_force) * dt
 
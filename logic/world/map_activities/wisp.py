@@ -37,7 +37,7 @@ class Wisp(PygameSprite):
         else:
             self.radius = 10
 
-    def update(self, dt: float, width: int, height: int, coins: list, grabbed_coin) -> None:
+    def update(self, dt: float, width: int, height: int, spatial_hash, grabbed_coin) -> None:
         # 1. Движение
         self.center_x += self.vx * dt
         self.center_y += self.vy * dt
@@ -76,7 +76,11 @@ class Wisp(PygameSprite):
             self.texture = self.textures[self.anim_index]
 
         # 4. Столкновение с монетками
-        self._handle_coin_collisions(coins, grabbed_coin)
+        # Ячейка сетки не меньше двух радиусов самой большой монеты, так что
+        # радиус огонька + половина ячейки покрывает все монеты, которых он может коснуться
+        reach = self.radius + spatial_hash.cell_size / 2
+        nearby = spatial_hash.query_radius((self.center_x, self.center_y), reach)
+        self._handle_coin_collisions(nearby, grabbed_coin)
 
     def _handle_coin_collisions(self, coins: list, grabbed_coin) -> None:
         for coin in coins:
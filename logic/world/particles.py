@@ -0,0 +1,313 @@
+"""
+Частицы (искры, дым, вспышки слияния, огонь комбо).
+
+Вместо списка словарей - плоские массивы (structure-of-arrays) фиксированной емкости:
+позиция, скорость, жизнь, скорость угасания, размер, цвет и индекс монеты, за которой частица летит.
+Умершие частицы убираются swap-remove (на место дыры переезжает живая из хвоста),
+при переполнении перезаписываются самые старые (в ParticleSystem - слоты по кругу).
+NumpyParticleSystem обновляет все частицы операциями над массивами numpy,
+ParticleSystem - то же самое на списках, если numpy нет.
+"""
+import pygame
+
+from logic.world.coin_physics import np, HAS_NUMPY
+
+
+class ParticleSystem:
+    """Частицы на параллельных списках (без numpy). Интерфейс тот же, что у NumpyParticleSystem"""
+
+    FIELDS = ("x", "y", "vx", "vy", "offset_x", "offset_y", "life", "decay", "size", "link", "birth")
+
+    def __init__(self, capacity: int = 20000):
+        self.capacity = capacity
+        self.count = 0
+        # Монеты, за которыми летят частицы (link - индекс в этом списке, -1 - частица свободная)
+        self.links = []
+        self._link_ids = {}
+        self._serial = 0
+        # Следующий слот на перезапись при переполнении
+        self._ring = 0
+        self._init_storage()
+
+    def _init_storage(self):
+        for name in self.FIELDS:
+            setattr(self, name, [])
+        self.color = []
+
+    def __len__(self):
+        return self.count
+
+    def _link_id(self, coin) -> int:
+        if coin is None:
+            return -1
+        link = self._link_ids.get(coin)
+        if link is None:
+            link = len(self.links)
+            self.links.append(coin)
+            self._link_ids[coin] = link
+        return link
+
+    def emit(self, x, y, vx, vy, sizes, colors, life: float, decay: float, coin=None, offset_x=None, offset_y=None):
+        """
+        Выпускает пачку частиц из точки (x, y). vx, vy, sizes, colors - списки одинаковой длины.
+        Частицы с монетой (coin) летят за ней: позиция = центр монеты + offset, offset растет со скоростью.
+        """
+        link = self._link_id(coin)
+        n = len(vx)
+        if offset_x is None:
+            offset_x = [0.0] * n
+            offset_y = [0.0] * n
+        for i in range(n):
+            slot = self._take_slot()
+            values = (x, y, vx[i], vy[i], offset_x[i], offset_y[i], life, decay, sizes[i], link, self._serial)
+            self._serial += 1
+            for name, value in zip(self.FIELDS, values):
+                column = getattr(self, name)
+                if slot == len(column):
+                    column.append(value)
+                else:
+                    column[slot] = value
+            if slot == len(self.color):
+                self.color.append(tuple(colors[i][:3]))
+            else:
+                self.color[slot] = tuple(colors[i][:3])
+
+    def _take_slot(self) -> int:
+        if self.count < self.capacity:
+            self.count += 1
+            return self.count - 1
+        # Переполнение: слоты перезаписываются по кругу. Swap-remove перемешивает порядок,
+        # так что это "примерно самые старые", зато без поиска минимума birth на каждую частицу
+        slot = self._ring % self.capacity
+        self._ring = slot + 1
+        return slot
+
+    def update(self, dt: float) -> None:
+        links = self.links
+        x, y, vx, vy = self.x, self.y, self.vx, self.vy
+        ox, oy, life, decay, link = self.offset_x, self.offset_y, self.life, self.decay, self.link
+        for i in range(self.count):
+            life[i] -= dt * decay[i]
+            if link[i] >= 0:
+                ox[i] += vx[i] * dt
+                oy[i] += vy[i] * dt
+                sprite = links[link[i]].sprite
+                x[i] = sprite.center_x + ox[i]
+                y[i] = sprite.center_y + oy[i]
+            else:
+                x[i] += vx[i] * dt
+                y[i] += vy[i] * dt
+
+        # Swap-remove умерших: с конца, чтобы переехавшая из хвоста частица уже была проверена
+        columns = [getattr(self, name) for name in self.FIELDS] + [self.color]
+        i = self.count - 1
+        while i >= 0:
+            if life[i] <= 0:
+                last = self.count - 1
+                for column in columns:
+                    column[i] = column[last]
+                    column.pop()
+                self.count -= 1
+            i -= 1
+        self._drop_links()
+
+    def _drop_links(self) -> None:
+        # Монеты без живых частиц больше не нужны (иначе список ссылок рос бы бесконечно)
+        if self.links and not any(link >= 0 for link in self.link):
+            self.links = []
+            self._link_ids = {}
+
+    def blits(self, camera, atlas) -> list:
+        """(полоса атласа, экранная позиция, клетка) на каждую частицу - для RenderQueue.submit_batch"""
+        to_screen = camera.to_screen
+        max_radius = atlas.MAX_RADIUS
+        areas = atlas.areas
+        strips = {}
+        result = []
+        for i in range(self.count):
+            radius = min(int(self.size[i]), max_radius)
+            if radius < 1:
+                continue
+            key = atlas.color_key(self.color[i])
+            strip = strips.get(key)
+            if strip is None:
+                strip = strips[key] = atlas.strip(key)
+            sx, sy = to_screen(self.x[i], self.y[i])
+            # Центр кружка в клетке - (radius + 1, radius + 1)
+            result.append((strip, (int(sx) - radius - 1, int(sy) - radius - 1),
+                           areas[radius][atlas.alpha_level(self.life[i])]))
+        return result
+
+    def dirty_rects(self, camera, pad: int = 0) -> list:
+        """
+        Экранные прямоугольники частиц (для режима грязных областей) - через камеру, как в blits.
+        pad - запас на тряску: кадр может нарисоваться с другим смещением камеры
+        """
+        to_screen = camera.to_screen
+        rects = []
+        for i in range(self.count):
+            size = int(self.size[i]) + 1 + pad
+            sx, sy = to_screen(self.x[i], self.y[i])
+            rects.append(pygame.Rect(int(sx) - size, int(sy) - size, size * 2, size * 2))
+        return rects
+
+    def clear(self) -> None:
+        self.count = 0
+        self._ring = 0
+        self.links = []
+        self._link_ids = {}
+        self._init_storage()
+
+
+class NumpyParticleSystem(ParticleSystem):
+    """Частицы в массивах numpy: обновление, удаление и подготовка к отрисовке - пакетно"""
+
+    FLOAT_FIELDS = ("x", "y", "vx", "vy", "offset_x", "offset_y", "life", "decay", "size")
+
+    def __init__(self, capacity: int = 20000):
+        if not HAS_NUMPY:
+            raise RuntimeError("NumpyParticleSystem requires numpy")
+        super().__init__(capacity)
+
+    def _init_storage(self):
+        capacity = self.capacity
+        for name in self.FLOAT_FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float64))
+        self.link = np.full(capacity, -1, dtype=np.intp)
+        self.birth = np.zeros(capacity, dtype=np.int64)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+
+    def _take_slots(self, n: int) -> "np.ndarray":
+        free = min(n, self.capacity - self.count)
+        slots = np.arange(self.count, self.count + free)
+        self.count += free
+        if free < n:
+            # Переполнение: перезаписываются самые старые частицы
+            # (только среди уже живших: у только что выданных слотов birth еще старый)
+            alive = self.count - free
+            extra = min(n - free, alive)
+            oldest = np.argpartition(self.birth[:alive], extra - 1)[:extra]
+            slots = np.concatenate((slots, oldest))
+        return slots
+
+    def emit(self, x, y, vx, vy, sizes, colors, life: float, decay: float, coin=None, offset_x=None, offset_y=None):
+        n = len(vx)
+        if n == 0:
+            return
+        slots = self._take_slots(n)
+        n = len(slots)
+        self.x[slots] = x
+        self.y[slots] = y
+        self.vx[slots] = vx[:n]
+        self.vy[slots] = vy[:n]
+        if offset_x is None:
+            self.offset_x[slots] = 0.0
+            self.offset_y[slots] = 0.0
+        else:
+            self.offset_x[slots] = offset_x[:n]
+            self.offset_y[slots] = offset_y[:n]
+        self.life[slots] = life
+        self.decay[slots] = decay
+        self.size[slots] = sizes[:n]
+        self.color[slots] = [c[:3] for c in colors[:n]]
+        self.link[slots] = self._link_id(coin)
+        self.birth[slots] = np.arange(self._serial, self._serial + n)
+        self._serial += n
+
+    def update(self, dt: float) -> None:
+        n = self.count
+        if n == 0:
+            return
+        life = self.life[:n]
+        life -= dt * self.decay[:n]
+
+        vx = self.vx[:n]
+        vy = self.vy[:n]
+        link = self.link[:n]
+        linked = link >= 0
+        if self.links and linked.any():
+            # Свободные частицы летят сами, привязанные - смещение от центра своей монеты
+            idx = np.flatnonzero(linked)
+            self.offset_x[idx] += vx[idx] * dt
+            self.offset_y[idx] += vy[idx] * dt
+            coin_x = np.fromiter((c.sprite.center_x for c in self.links), dtype=np.float64, count=len(self.links))
+            coin_y = np.fromiter((c.sprite.center_y for c in self.links), dtype=np.float64, count=len(self.links))
+            self.x[idx] = coin_x[link[idx]] + self.offset_x[idx]
+            self.y[idx] = coin_y[link[idx]] + self.offset_y[idx]
+            free = np.flatnonzero(~linked)
+            self.x[free] += vx[free] * dt
+            self.y[free] += vy[free] * dt
+        else:
+            self.x[:n] += vx * dt
+            self.y[:n] += vy * dt
+
+        self._compact()
+        self._drop_links()
+
+    def _compact(self) -> None:
+        """Swap-remove умерших: дыры в начале заполняются живыми частицами из хвоста"""
+        n = self.count
+        dead = np.flatnonzero(self.life[:n] <= 0)
+        if dead.size == 0:
+            return
+        new_count = n - dead.size
+        holes = dead[dead < new_count]
+        if holes.size:
+            tail = np.arange(new_count, n)
+            tail_alive = tail[self.life[new_count:n] > 0]
+            for name in self.FLOAT_FIELDS:
+                column = getattr(self, name)
+                column[holes] = column[tail_alive]
+            self.link[holes] = self.link[tail_alive]
+            self.birth[holes] = self.birth[tail_alive]
+            self.color[holes] = self.color[tail_alive]
+        self.link[new_count:n] = -1
+        self.count = new_count
+
+    def _drop_links(self) -> None:
+        if self.links and not (self.link[:self.count] >= 0).any():
+            self.links = []
+            self._link_ids = {}
+
+    def blits(self, camera, atlas) -> list:
+        n = self.count
+        if n == 0:
+            return []
+        radius = np.minimum(self.size[:n].astype(np.intp), atlas.MAX_RADIUS)
+        visible = np.flatnonzero(radius >= 1)
+        if visible.size < n:
+            radius = radius[visible]
+        else:
+            visible = slice(0, n)
+
+        levels = atlas.ALPHA_LEVELS
+        level = np.clip((self.life[visible] * levels).astype(np.intp), 0, levels - 1)
+        left = (self.x[visible] + camera.offset_x).astype(np.intp) - radius - 1
+        top = (camera.screen_height - (self.y[visible] + camera.offset_y)).astype(np.intp) - radius - 1
+
+        # Квантование цвета как в ParticleAtlas.color_key, упакованное в одно число
+        step = atlas.COLOR_STEP
+        quantized = np.minimum((self.color[visible].astype(np.intp) // step) * step + step // 2, 255)
+        packed = (quantized[:, 0] << 16) | (quantized[:, 1] << 8) | quantized[:, 2]
+        keys, strip_index = np.unique(packed, return_inverse=True)
+        strips = [atlas.strip((key >> 16, (key >> 8) & 255, key & 255)) for key in keys.tolist()]
+
+        areas = atlas.areas
+        return [(strips[k], (x, y), areas[r][lv])
+                for k, x, y, r, lv in zip(strip_index.tolist(), left.tolist(), top.tolist(),
+                                          radius.tolist(), level.tolist())]
+
+    def dirty_rects(self, camera, pad: int = 0) -> list:
+        n = self.count
+        if n == 0:
+            return []
+        size = self.size[:n].astype(np.intp) + 1 + pad
+        left = (self.x[:n] + camera.offset_x).astype(np.intp) - size
+        top = (camera.screen_height - (self.y[:n] + camera.offset_y)).astype(np.intp) - size
+        return [pygame.Rect(l, t, s * 2, s * 2) for l, t, s in zip(left.tolist(), top.tolist(), size.tolist())]
+
+    def clear(self) -> None:
+        self.count = 0
+        self.links = []
+        self._link_ids = {}
+        self.link[:] = -1
@@ -12,6 +12,10 @@ from logic.assets.sound_manager import SoundManager
 from logic.controllers.ui_controller import UIController
 from logic.controllers.game_controller import GameController
 from logic.assets.sprite_pygame import PygameSprite
+from logic.assets.dirty_rects import DirtyRectTracker
+from logic.assets.output_scaler import OutputScaler
+from logic.assets.font_manager import fonts
+from logic.assets.text_cache import texts
 
 import localization
 import yandex_helper
@@ -24,6 +28,21 @@ WORLD_WIDTH = VIRTUAL_WIDTH - PANEL_WIDTH
 FPS = 60
 TITLE = "COINS"
 
+# Фиксированный шаг симуляции: физика не зависит от FPS отрисовки
+SIM_HZ = 60
+SIM_DT = 1.0 / SIM_HZ
+
+# "python" - по одной монете, "numpy" - пакетная физика,
+# "auto" - numpy, если доступен и монет может быть много (см. NumpyCoinPhysics.AUTO_MIN_COINS)
+PHYSICS_BACKEND = "auto"
+
+# Перерисовывать и выводить на экран только изменившиеся области (в игре; меню всегда целиком)
+DIRTY_RECTS = True
+
+# Вывод холста в окно (см. OutputScaler): "smooth", "nearest", "sdl_scaled", "smooth_on_resize".
+# В браузере окно всегда 1920x1080 - совпадает с холстом, и кадр рисуется прямо в дисплей в любом режиме
+OUTPUT_SCALER = "smooth"
+
 STATE_MENU = 0
 STATE_GAME = 1
 
@@ -201,13 +220,9 @@ def render_gradient_text(text, font, outline_color):
 
 
 def draw_text_outline(surf, text, font, color, outline_color, x, y):
-    for dx in [-1, 0, 1]:
-        for dy in [-1, 0, 1]:
-            if dx != 0 or dy != 0:
-                txt = font.render(text, True, outline_color)
-                surf.blit(txt, (x + dx, y + dy))
-    txt = font.render(text, True, color)
-    surf.blit(txt, (x, y))
+    # Обводка собирается один раз в кэше текста, в кадре - один блит
+    txt = texts.render(font, text, color, outline=outline_color)
+    surf.blit(txt, (x - 1, y - 1))
 
 
 async def main():
@@ -221,19 +236,19 @@ async def main():
     yandex_helper.initialize_environment()
 
     # Screen setup
-    if platform.system() == "Emscripten":
-        screen_width = 1920
-        screen_height = 1080
-        screen = pygame.display.set_mode((screen_width, screen_height))
+    is_web = platform.system() == "Emscripten"
+    if is_web:
+        window_size = (1920, 1080)
     else:
         info = pygame.display.Info()
-        screen_width = int(info.current_w * 0.8)
-        screen_height = int(info.current_h * 0.8)
-        screen = pygame.display.set_mode((screen_width, screen_height), pygame.RESIZABLE)
+        window_size = (int(info.current_w * 0.8), int(info.current_h * 0.8))
+
+    scaler = OutputScaler(OUTPUT_SCALER, (VIRTUAL_WIDTH, VIRTUAL_HEIGHT), window_size, resizable=not is_web)
+    screen_width, screen_height = scaler.window_size
 
     pygame.display.set_caption(TITLE)
 
-    canvas = pygame.Surface((VIRTUAL_WIDTH, VIRTUAL_HEIGHT))
+    canvas = scaler.canvas
     clock = pygame.time.Clock()
 
     print("Initializing Managers...")
@@ -244,47 +259,20 @@ async def main():
     sound_manager = SoundManager()
     sound_manager.load_all()
 
-    font_path = asset_manager.ui_assets.get("font_name", "Arial")
-    try:
-        if font_path != "Arial" and os.path.exists(font_path):
-            main_font = pygame.font.Font(font_path, 20)
-            title_font = pygame.font.Font(font_path, 40)
-            logo_font = pygame.font.Font(font_path, 90)
-        else:
-            main_font = pygame.font.SysFont("Arial", 20)
-            title_font = pygame.font.SysFont("Arial", 40)
-            logo_font = pygame.font.SysFont("Arial", 90)
-    except:
-        main_font = pygame.font.SysFont("Arial", 20)
-        title_font = pygame.font.SysFont("Arial", 40)
-        logo_font = pygame.font.SysFont("Arial", 90)
-
-    try:
-        prestige_font = pygame.font.Font(font_path, 32) if font_path != "Arial" and os.path.exists(
-            font_path) else pygame.font.SysFont("Arial", 32)
-        help_font = pygame.font.Font(font_path, 24) if font_path != "Arial" and os.path.exists(
-            font_path) else pygame.font.SysFont("Arial", 24)
-        dialog_font = pygame.font.Font(font_path, 28) if font_path != "Arial" and os.path.exists(
-            font_path) else pygame.font.SysFont("Arial", 28)
-    except:
-        prestige_font = pygame.font.SysFont("Arial", 32)
-        help_font = pygame.font.SysFont("Arial", 24)
-        dialog_font = pygame.font.SysFont("Arial", 28)
+    font_path = asset_manager.ui_assets.get("font_name", fonts.SYSTEM_FONT)
+    main_font = fonts.get(font_path, 20)
+    title_font = fonts.get(font_path, 40)
+    logo_font = fonts.get(font_path, 90)
+    prestige_font = fonts.get(font_path, 32)
+    help_font = fonts.get(font_path, 24)
+    dialog_font = fonts.get(font_path, 28)
 
     # FIX: Pre-render heavy assets
     logo_surf = render_gradient_text("COINS", logo_font, (0, 0, 0))
     menu_overlay = pygame.Surface((VIRTUAL_WIDTH, VIRTUAL_HEIGHT), pygame.SRCALPHA)
     menu_overlay.fill((0, 0, 0, 50))
-
-    # FIX: Pre-render menu buttons text
-    # We create a small cache for text
-    text_cache = {}
-
-    def get_cached_text(text, font, color=(255, 255, 255)):
-        key = (text, color)
-        if key not in text_cache:
-            text_cache[key] = font.render(text, True, color)
-        return text_cache[key]
+    dialog_overlay = pygame.Surface((VIRTUAL_WIDTH, VIRTUAL_HEIGHT), pygame.SRCALPHA)
+    dialog_overlay.fill((0, 0, 0, 38))
 
     scale_factor = 1.0
     ui = UIController(
@@ -294,7 +282,8 @@ async def main():
 
     game = GameController(
         asset_manager=asset_manager, ui_controller=ui, sound_manager=sound_manager,
-        world_width=WORLD_WIDTH, world_height=VIRTUAL_HEIGHT, scale_factor=scale_factor
+        world_width=WORLD_WIDTH, world_height=VIRTUAL_HEIGHT, scale_factor=scale_factor,
+        physics_backend=PHYSICS_BACKEND
     )
 
     game.is_mobile_device = yandex_helper.is_mobile()
@@ -355,6 +344,15 @@ async def main():
     last_drag_y = 0
     potential_click = False
 
+    # Накопленное, но еще не просимулированное время
+    sim_accumulator = 0.0
+
+    # Грязные области: что изменилось с прошлого кадра
+    dirty_tracker = DirtyRectTracker((VIRTUAL_WIDTH, VIRTUAL_HEIGHT))
+    last_frame_key = None
+    last_ui_key = None
+    last_hud_key = None
+
     while running:
         dt = clock.tick(FPS) / 1000.0
         if dt > 0.1: dt = 0.1
@@ -393,7 +391,6 @@ async def main():
                         elif btn_lang_rect.collidepoint(vmx, vmy):
                             localization.toggle_language()
                             ui.reload_texts()
-                            text_cache.clear()  # Clear cache on lang change
                         elif btn_sound_rect.collidepoint(vmx, vmy):
                             sound_manager.toggle_mute()
 
@@ -432,7 +429,6 @@ async def main():
                         elif game_lang_rect.collidepoint(vmx, vmy):
                             localization.toggle_language()
                             ui.reload_texts()
-                            text_cache.clear()
                         elif vmx > WORLD_WIDTH:
                             ui.on_mouse_press(vmx, vmy)
                             pressed_id = ui.get_pressed_button_id()
@@ -558,18 +554,27 @@ async def main():
 
             elif event.type == pygame.VIDEORESIZE:
                 if platform.system() != "Emscripten":
-                    screen_width = event.w
-                    screen_height = event.h
-                    screen = pygame.display.set_mode((screen_width, screen_height), pygame.RESIZABLE)
-
-        # UPDATE
-        if state == STATE_MENU:
-            for c in menu_coins:
-                c.update(dt, VIRTUAL_WIDTH, VIRTUAL_HEIGHT)
-            _handle_menu_collisions(menu_coins)
-        elif state == STATE_GAME:
-            game.update(dt)
-            ui.update(game.balance.get(), game.get_coin_counts())
+                    scaler.set_window_size((event.w, event.h))
+                    screen_width, screen_height = scaler.window_size
+                    canvas = scaler.canvas
+                dirty_tracker.request_full()
+
+        # UPDATE (симуляция фиксированными шагами SIM_DT, остаток ждет следующего кадра)
+        sim_accumulator += dt
+        while sim_accumulator >= SIM_DT:
+            sim_accumulator -= SIM_DT
+            if state == STATE_MENU:
+                for c in menu_coins:
+                    c.update(SIM_DT, VIRTUAL_WIDTH, VIRTUAL_HEIGHT)
+                _handle_menu_collisions(menu_coins)
+            elif state == STATE_GAME:
+                game.update(SIM_DT)
+        # Доля шага между двумя последними состояниями - для интерполяции отрисовки
+        sim_alpha = sim_accumulator / SIM_DT
+
+        if state == STATE_GAME:
+            # Баланс, флаги и счетчики монет приходят в UI событиями: тут пересчитываются только помеченные кнопки
+            ui.update()
             if yandex_helper.check_and_reset_reward():
                 reward_amount = max(1000, int(game.balance.get() * 0.1))
                 game.balance.add(reward_amount)
@@ -577,8 +582,40 @@ async def main():
                 ui.mark_ad_watched()
             yandex_helper.show_interstitial_ad()
 
+        # === ГРЯЗНЫЕ ОБЛАСТИ ===
+        # None - полная перерисовка, [] - на экране ничего не изменилось
+        dirty = None
+        frame_key = (state, active_dialog)
+        if frame_key != last_frame_key:
+            dirty_tracker.request_full()
+            last_frame_key = frame_key
+            last_ui_key = None
+            last_hud_key = None
+        if DIRTY_RECTS and state == STATE_GAME and not active_dialog:
+            rects = game.get_dirty_rects(VIRTUAL_HEIGHT, sim_alpha)
+            if rects is not None:
+                ui_key = ui.render_key(game.balance.get())
+                if ui_key != last_ui_key:
+                    rects.append(ui.get_panel_rect())
+                    last_ui_key = ui_key
+                hud_key = (localization.current_lang, sound_manager.muted, game.prestige.points,
+                           round(game.prestige.multiplier, 1), game.grab_purchased, game.grab_mode_active,
+                           game_lang_rect.collidepoint(vmx, vmy), game_mute_rect.collidepoint(vmx, vmy))
+                if hud_key != last_hud_key:
+                    # Кнопки языка/звука/захвата и строка престижа в левом верхнем углу
+                    rects.append(pygame.Rect(game_lang_rect.x - 120, 0, VIRTUAL_WIDTH - game_lang_rect.x + 120,
+                                             game_btn_margin * 2 + game_btn_h))
+                    rects.append(pygame.Rect(0, 0, WORLD_WIDTH // 2, 80))
+                    last_hud_key = hud_key
+            dirty = dirty_tracker.collect(rects)
+        else:
+            dirty_tracker.collect(None)
+
         # DRAW
-        canvas.fill((255, 255, 255))
+        if dirty:
+            canvas.set_clip(DirtyRectTracker.clip_for(dirty))
+        if dirty != []:
+            canvas.fill((255, 255, 255))
 
         if state == STATE_MENU:
             sorted_coins = sorted(menu_coins, key=lambda c: c.is_moving)
@@ -597,8 +634,7 @@ async def main():
                     color = (100, 100, 100) if rect.collidepoint(vmx, vmy) else (50, 50, 50)
                     pygame.draw.rect(canvas, color, rect, border_radius=5)
                     pygame.draw.rect(canvas, (200, 200, 200), rect, 2, border_radius=5)
-                    # FIX: Use cached text
-                    txt_surf = get_cached_text(text, main_font)
+                    txt_surf = texts.render(main_font, text)
                     txt_rect = txt_surf.get_rect(center=rect.center)
                     canvas.blit(txt_surf, txt_rect)
 
@@ -610,7 +646,7 @@ async def main():
                     color = (70, 70, 70) if rect.collidepoint(vmx, vmy) else (50, 50, 50)
                     pygame.draw.rect(canvas, color, rect, border_radius=5)
                     pygame.draw.rect(canvas, (150, 150, 150), rect, 2, border_radius=5)
-                    txt_surf = get_cached_text(text, main_font)
+                    txt_surf = texts.render(main_font, text)
                     txt_rect = txt_surf.get_rect(center=rect.center)
                     canvas.blit(txt_surf, txt_rect)
             else:
@@ -633,11 +669,11 @@ async def main():
                     if "\n" in line:
                         parts = line.split("\n")
                         for part in parts:
-                            l_surf = help_font.render(part, True, (200, 200, 200))
+                            l_surf = texts.render(help_font, part, (200, 200, 200))
                             canvas.blit(l_surf, (help_x + 20, text_y))
                             text_y += 25
                     else:
-                        l_surf = help_font.render(line, True, (200, 200, 200))
+                        l_surf = texts.render(help_font, line, (200, 200, 200))
                         canvas.blit(l_surf, (help_x + 20, text_y))
                     text_y += 25
                 canvas.set_clip(None)
@@ -649,11 +685,11 @@ async def main():
                 close_rect = pygame.Rect(help_x + help_w - close_btn_size - 10, help_y + 10, close_btn_size,
                                          close_btn_size)
                 pygame.draw.rect(canvas, (200, 50, 50), close_rect, border_radius=5)
-                x_surf = main_font.render(localization.get_text("btn_close"), True, (255, 255, 255))
+                x_surf = texts.render(main_font, localization.get_text("btn_close"))
                 canvas.blit(x_surf, x_surf.get_rect(center=close_rect.center))
 
-        elif state == STATE_GAME:
-            game.draw(canvas, VIRTUAL_HEIGHT)
+        elif state == STATE_GAME and dirty != []:
+            game.draw(canvas, VIRTUAL_HEIGHT, sim_alpha)
             ui.draw(canvas, VIRTUAL_HEIGHT, game.balance.get())
 
             lang_key = "lang_" + localization.current_lang
@@ -661,7 +697,7 @@ async def main():
             lang_color = (80, 80, 80) if game_lang_rect.collidepoint(vmx, vmy) else (60, 60, 60)
             pygame.draw.rect(canvas, lang_color, game_lang_rect, border_radius=5)
             pygame.draw.rect(canvas, (150, 150, 150), game_lang_rect, 2, border_radius=5)
-            lang_surf = main_font.render(lang_text, True, (255, 255, 255))
+            lang_surf = texts.render(main_font, lang_text)
             canvas.blit(lang_surf, lang_surf.get_rect(center=game_lang_rect.center))
 
             sound_state_key = "sound_on" if not sound_manager.muted else "sound_off"
@@ -669,7 +705,7 @@ async def main():
             sound_color = (80, 80, 80) if game_mute_rect.collidepoint(vmx, vmy) else (60, 60, 60)
             pygame.draw.rect(canvas, sound_color, game_mute_rect, border_radius=5)
             pygame.draw.rect(canvas, (150, 150, 150), game_mute_rect, 2, border_radius=5)
-            sound_surf = main_font.render(sound_text, True, (255, 255, 255))
+            sound_surf = texts.render(main_font, sound_text)
             canvas.blit(sound_surf, sound_surf.get_rect(center=game_mute_rect.center))
 
             pres_template = localization.get_text("prestige_level_text")
@@ -680,9 +716,7 @@ async def main():
                 pass  # Skip debug logic for performance
 
             if active_dialog:
-                overlay = pygame.Surface((VIRTUAL_WIDTH, VIRTUAL_HEIGHT), pygame.SRCALPHA)
-                overlay.fill((0, 0, 0, 38))
-                canvas.blit(overlay, (0, 0))
+                canvas.blit(dialog_overlay, (0, 0))
 
                 dialog_w, dialog_h = 500, 250
                 dialog_x = (VIRTUAL_WIDTH - dialog_w) // 2
@@ -695,10 +729,10 @@ async def main():
                 else:
                     title = localization.get_text("dialog_new_game_title")
                     text = localization.get_text("dialog_new_game_text")
-                title_surf = dialog_font.render(title, True, (255, 255, 255))
+                title_surf = texts.render(dialog_font, title)
                 title_rect = title_surf.get_rect(center=(dialog_x + dialog_w // 2, dialog_y + 40))
                 canvas.blit(title_surf, title_rect)
-                text_surf = dialog_font.render(text, True, (200, 200, 200))
+                text_surf = texts.render(dialog_font, text, (200, 200, 200))
                 text_rect = text_surf.get_rect(center=(dialog_x + dialog_w // 2, dialog_y + 100))
                 canvas.blit(text_surf, text_rect)
                 btn_w_d, btn_h_d = 120, 50
@@ -707,14 +741,14 @@ async def main():
                 btn_close_d = pygame.Rect(dialog_x + dialog_w - 40, dialog_y + 10, 30, 30)
                 yes_color = (50, 150, 50) if not btn_yes.collidepoint(vmx, vmy) else (70, 200, 70)
                 pygame.draw.rect(canvas, yes_color, btn_yes, border_radius=5)
-                yes_txt = main_font.render(localization.get_text("dialog_yes"), True, (255, 255, 255))
+                yes_txt = texts.render(main_font, localization.get_text("dialog_yes"))
                 canvas.blit(yes_txt, yes_txt.get_rect(center=btn_yes.center))
                 no_color = (150, 50, 50) if not btn_no.collidepoint(vmx, vmy) else (200, 70, 70)
                 pygame.draw.rect(canvas, no_color, btn_no, border_radius=5)
-                no_txt = main_font.render(localization.get_text("dialog_no"), True, (255, 255, 255))
+                no_txt = texts.render(main_font, localization.get_text("dialog_no"))
                 canvas.blit(no_txt, no_txt.get_rect(center=btn_no.center))
                 pygame.draw.rect(canvas, (200, 50, 50), btn_close_d, border_radius=5)
-                x_surf = main_font.render("X", True, (255, 255, 255))
+                x_surf = texts.render(main_font, "X")
                 canvas.blit(x_surf, x_surf.get_rect(center=btn_close_d.center))
 
             if game.grab_purchased and game.is_mobile_device:
@@ -722,12 +756,15 @@ async def main():
                 grab_color = (0, 150, 0) if game.grab_mode_active else (80, 80, 80)
                 pygame.draw.rect(canvas, grab_color, grab_btn_rect, border_radius=5)
                 txt = "GRAB: ON" if game.grab_mode_active else "GRAB: OFF"
-                grab_txt = main_font.render(txt, True, (255, 255, 255))
+                grab_txt = texts.render(main_font, txt)
                 canvas.blit(grab_txt, grab_txt.get_rect(center=grab_btn_rect.center))
 
         # SCREEN BLIT
-        pygame.transform.smoothscale(canvas, (screen_width, screen_height), screen)
-        pygame.display.flip()
+        if dirty is None:
+            scaler.present()
+        elif dirty:
+            canvas.set_clip(None)
+            scaler.present(dirty)
 
         await asyncio.sleep(0)
 